@@ -0,0 +1,208 @@
+#! python
+# ===============LICENSE_START=======================================================
+# metadata-flatten-extractor Apache-2.0
+# ===================================================================================
+# Copyright (C) 2017-2020 AT&T Intellectual Property. All rights reserved.
+# ===================================================================================
+# This software file is distributed by AT&T
+# under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# This file is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+# -*- coding: utf-8 -*-
+
+
+# pluggable output compression (gzip, optional zstd and lz4) chosen by file suffix, with parallel gzip for large outputs
+
+import io
+import os
+import gzip
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_codecs = {"gzip": {'suffix': ".gz", 'level': 9}}   # name -> {'suffix': file suffix, 'level': default level}
+
+try:
+    import zstandard
+    _codecs["zstd"] = {'suffix': ".zst", 'level': 3}
+except ImportError:
+    pass
+
+try:
+    import lz4.frame
+    _codecs["lz4"] = {'suffix': ".lz4", 'level': 0}
+except ImportError:
+    pass
+
+BLOCK_SIZE = 1 << 22   # bytes of input per independently compressed gzip member (parallel gzip)
+
+
+def available_codecs():
+    """Return the names of installed compression codecs (``gzip`` is always available)"""
+    return list(_codecs.keys())
+
+
+def suffix(codec):
+    """Return the file suffix of a compression codec
+
+    :param codec: (str): codec name, one of ``available_codecs()``
+    :return: str.  The suffix (e.g. ``.gz``)
+    """
+    if codec not in _codecs:
+        raise ValueError(f"Compression codec '{codec}' is not installed (available: {available_codecs()})")
+    return _codecs[codec]['suffix']
+
+
+def codec_for_path(path_file):
+    """Return the compression codec of a file by its suffix
+
+    :param path_file: (str): Path for file
+    :return: str.  The codec name or ``None`` for uncompressed files; raises ``ValueError`` for known but
+        uninstalled codecs
+    """
+    for codec, suffix_codec in [("gzip", ".gz"), ("zstd", ".zst"), ("lz4", ".lz4")]:
+        if path_file.endswith(suffix_codec):
+            suffix(codec)   # verify installed
+            return codec
+    return None
+
+
+def supports_append(path_file):
+    """Return whether new data can be appended to a (compressed) file in place (uncompressed or gzip members)"""
+    return codec_for_path(path_file) in [None, "gzip"]
+
+
+def options(run_options):
+    """Resolve compression options for ``open_write`` from run options (``compression_level``, ``compression_threads``)
+
+    :param run_options: (dict): specific runtime information
+    :return: dict.  ``level`` (int or None for the codec default) and ``threads`` (int, ``0`` resolved to all cores)
+    """
+    if run_options is None:
+        run_options = {}
+    level = run_options.get("compression_level")
+    threads = int(run_options.get("compression_threads", 1))
+    if threads < 1:
+        threads = os.cpu_count() or 1
+    return {'level': None if level is None else int(level), 'threads': threads}
+
+
+class CompressedWriter(io.BufferedIOBase):
+    """Binary output stream that compresses with the codec of its file suffix; with more than one thread, gzip
+    output is written as independently compressed members of ``BLOCK_SIZE`` input bytes (still a valid gzip file)
+    and zstd uses its own worker threads
+    """
+    def __init__(self, path_file, level=None, threads=1, append=False):
+        """Open a compressed output file
+
+        :param path_file: (str): Path for destination file (``.gz``, ``.zst``, ``.lz4``, or uncompressed)
+        :param level: (int): compression level (None for the codec default)
+        :param threads: (int): number of compression threads (gzip and zstd)
+        :param append: (bool): append to an existing file (uncompressed or gzip only)
+        """
+        super().__init__()
+        self._codec = codec_for_path(path_file)
+        if append and not supports_append(path_file):
+            raise ValueError(f"Appending to '{path_file}' is not supported for codec '{self._codec}'")
+        if self._codec is not None and level is None:
+            level = _codecs[self._codec]['level']
+        self._level = level
+        self._pool = None
+        self._rawfile = None
+        mode = 'ab' if append else 'wb'
+        if self._codec is None:
+            self._outfile = open(path_file, mode)
+        elif self._codec == "gzip" and threads > 1:
+            self._outfile = open(path_file, mode)
+            self._pool = ThreadPoolExecutor(threads)   # zlib releases the GIL while compressing
+            self._num_window = 2 * threads
+            self._pending = deque()
+            self._buffer = bytearray()
+            self._num_members = 0
+        elif self._codec == "gzip":
+            self._outfile = gzip.GzipFile(path_file, mode, compresslevel=level)
+        elif self._codec == "zstd":
+            self._rawfile = open(path_file, mode)
+            self._outfile = zstandard.ZstdCompressor(level=level, threads=threads if threads > 1 else 0).stream_writer(self._rawfile)
+        else:
+            self._outfile = lz4.frame.open(path_file, mode, compression_level=level)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed file")
+        if self._pool is None:
+            return self._outfile.write(data)
+        self._buffer += data
+        while len(self._buffer) >= BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:BLOCK_SIZE]))
+            del self._buffer[:BLOCK_SIZE]
+        return len(data)
+
+    def _submit(self, block):
+        """Queue a block for compression as one gzip member, writing finished members in order"""
+        self._pending.append(self._pool.submit(gzip.compress, block, self._level, mtime=0))
+        self._num_members += 1
+        while len(self._pending) > self._num_window:   # bound memory of queued blocks
+            self._outfile.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._pool is not None:
+                if len(self._buffer) or not self._num_members:   # at least one member, even if empty
+                    self._submit(bytes(self._buffer))
+                while self._pending:
+                    self._outfile.write(self._pending.popleft().result())
+                self._pool.shutdown()
+            self._outfile.close()
+            if self._rawfile is not None and not self._rawfile.closed:
+                self._rawfile.close()
+        finally:
+            super().close()
+
+
+def open_write(path_file, level=None, threads=1, append=False):
+    """Open a binary output stream compressed by file suffix (see ``CompressedWriter``)"""
+    return CompressedWriter(path_file, level=level, threads=threads, append=append)
+
+
+def open_read(path_file):
+    """Open a binary input stream decompressed by file suffix
+
+    :param path_file: (str): Path for source file (``.gz``, ``.zst``, ``.lz4``, or uncompressed)
+    :return: file.  Binary file object
+    """
+    codec = codec_for_path(path_file)
+    if codec == "gzip":
+        return gzip.open(path_file, 'rb')   # also reads multiple members
+    if codec == "zstd":
+        return zstandard.open(path_file, 'rb')
+    if codec == "lz4":
+        return lz4.frame.open(path_file, 'rb')
+    return open(path_file, 'rb')
+
+
+def read_bytes(path_file):
+    """Read the full (decompressed) contents of a file
+
+    :param path_file: (str): Path for source file (compressed by suffix or uncompressed)
+    :return: bytes.  The raw file contents
+    """
+    codec = codec_for_path(path_file)
+    if codec is not None and codec != "gzip":
+        with open_read(path_file) as infile:
+            return infile.read()
+    with open(path_file, 'rb') as infile:
+        raw_data = infile.read()
+    return gzip.decompress(raw_data) if codec == "gzip" else raw_data
@@ -22,8 +22,6 @@ import pkgutil
 import importlib
 
 from os import path
-import json
-import gzip
 
 import logging
 import warnings
@@ -31,22 +29,30 @@ from sys import stdout as STDOUT
 
 import pandas as pd
 
+from contentai_metadata_flatten import json_backend
+from contentai_metadata_flatten import compression
+
 class Generate():
     PATH_DATA = path.join(path.dirname(path.dirname(__file__)), 'data')
     BASE_PREFIX = "flatten_"
 
-    def __init__(self, path_destination, generator="unknown", format=".csv", universal=False, logger=None):
+    def __init__(self, path_destination, generator="unknown", format=".csv", universal=False, incremental=False,
+                 self_compressed=False, logger=None):
         """Construct new generator instance
 
         :param path_destination: (str): Path (directory) for output file
         :param generator: (str): Name of the generator (from derived class)
         :param format: (str): File extension for output
         :param universal: (bool): Flag for universal (True, single file) output or independent (False) files
+        :param incremental: (bool): Flag for outputs that can be appended to in place (with ``incremental`` run option)
+        :param self_compressed: (bool): Flag for formats with their own compression (no compressed file suffix)
         """
         super().__init__()
         self._format = format
         self._generator = generator
         self._universal = universal
+        self._incremental = incremental
+        self._self_compressed = self_compressed
         self._path_destination = path_destination
 
         if logger is None:
@@ -58,6 +64,14 @@ class Generate():
     def is_universal(self):
         return self._universal
 
+    @property
+    def is_incremental(self):
+        return self._incremental
+
+    @property
+    def is_self_compressed(self):
+        return self._self_compressed
+
     @staticmethod
     def known_types():
         """Return the output types for this generator
@@ -65,6 +79,16 @@ class Generate():
         """
         return None
 
+    @staticmethod
+    def is_available():
+        """Return whether the dependencies of this generator are installed (otherwise it is not registered)"""
+        return True
+
+    @staticmethod
+    def is_default():
+        """Return whether this generator runs without being selected by name (otherwise it is opt-in)"""
+        return True
+
     def get_output_path(self, name_parser):
         if self._universal:
             return path.join(self._path_destination, self._generator + self._format)
@@ -73,37 +97,41 @@ class Generate():
     def json_load(self, path_file):
         """Helper to read dict object from JSON
 
-        :param path_file: (str): Path for source file (can be gzipped)
+        :param path_file: (str): Path for source file (can be compressed)
         :return: dict.  The loaded dict or an empty dict (`{}`) on error
         """
         if path.exists(path_file):
-            if path_file.endswith(".gz"):
-                infile = gzip.open(path_file, 'rt')
-            else:
-                infile = open(path_file, 'rt')
             try:
-                return json.load(infile)
-            except json.decoder.JSONDecodeError as e:
+                return json_backend.loads(compression.read_bytes(path_file))
+            except ValueError as e:   # includes decode errors for JSON and unicode
                 return {}
-            except UnicodeDecodeError as e:
-                return {}
-            if infile:
-                infile.close()
         return {}
 
-    def json_save(self, path_file, dict_source=None, pretty_print=False):
+    def open_output(self, path_file, run_options=None, append=False):
+        """Helper to open a binary output stream, compressed by file suffix with the codec options in run options
+
+        :param path_file: (str): Path for destination file
+        :param run_options: (dict): specific runtime information (``compression_level``, ``compression_threads``)
+        :param append: (bool): append to an existing file (see ``compression.supports_append``)
+        :return: file.  Binary file object
+        """
+        return compression.open_write(path_file, append=append, **compression.options(run_options))
+
+    def json_save(self, path_file, dict_source=None, pretty_print=False, run_options=None):
         """Helper to write dict object to json
 
         :param path_file: (str): Path for destination file
         :param dict_source: (dict): The dictionary to write to JSON
         :param pretty_print: (bool): Write out in more human-readable format
+        :param run_options: (dict): specific runtime information (for compression options)
         :return: bool.  Sueccess of operation and non-empty dictionary.
         """
         if dict_source is not None:
-            outfile = gzip.open(path_file, 'wt') if path_file.endswith(".gz") else open(path_file, 'wt')
-            json.dump(dict_source, outfile, indent=4 if pretty_print else None)
-            if outfile:
-                outfile.close()
+            with self.open_output(path_file, run_options) as outfile:
+                if pretty_print:
+                    outfile.write(json_backend.dumps(dict_source, pretty_print=pretty_print))
+                else:   # long arrays (e.g. frames) are encoded and written in chunks
+                    json_backend.dump_stream(dict_source, outfile)
             return True
         return False
 
@@ -114,18 +142,19 @@ _modules = []
 for module_finder, extractor_name, _ in pkgutil.iter_modules(__path__):
     generator_module = module_finder.find_module(extractor_name).load_module()
     generator_obj = getattr(generator_module, "Generator")   # get class template
-    if generator_obj is not None:
-        _modules.append({'obj':generator_obj, 'types':generator_obj.known_types(), 'name':extractor_name})
+    if generator_obj is not None and generator_obj.is_available():
+        _modules.append({'obj':generator_obj, 'types':generator_obj.known_types(), 'name':extractor_name, 
+                         'default':generator_obj.is_default()})
 
 def get_by_type(type_list=None):
     """Get parsers with a specific filter for type.
 
-    :param type_list: (list) list of tag type required in output (e.g. ['csv', 'json']) (default=None or all available)
+    :param type_list: (list) list of tag type required in output (e.g. ['csv', 'json']) (default=None or all default generators)
     :return list: list of raw "Parser()" classes that are instantiated with input file paths
     """
     local_list = []
     if type_list is None:
-        local_list = [local_obj for local_obj in _modules]
+        local_list = [local_obj for local_obj in _modules if local_obj['default']]
     else:
         if type(type_list) != list:
             type_list = [type_list]
@@ -136,12 +165,12 @@ def get_by_type(type_list=None):
 def get_by_name(name_limit=None):
     """Get parsers with a specific filter for name.
     
-    :param name_limit: (str) list of tag type required in output (e.g. 'flattened_csv') (default=None or all available)
+    :param name_limit: (str) list of tag type required in output (e.g. 'flattened_csv') (default=None or all default generators)
     :return list: list of raw "Parser()" classes that are instantiated with input file paths
     """
     local_list = []
     if name_limit is None:
-        local_list = [local_obj for local_obj in _modules]
+        local_list = [local_obj for local_obj in _modules if local_obj['default']]
     else:
         local_list = [local_obj for local_obj in _modules if name_limit in local_obj['name']]
     return local_list
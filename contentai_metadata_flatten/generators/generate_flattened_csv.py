@@ -21,13 +21,19 @@
 from os import path
 import json
 import re
+import io
+import numpy as np
 import pandas as pd
 
 from contentai_metadata_flatten.generators import Generate
+from contentai_metadata_flatten import compression
+from contentai_metadata_flatten.parsers import COLUMNS_BOX, details_serialize
+
+HASH_SUFFIX = ".hash.npz"   # sidecar of row hashes next to each incremental CSV
 
 class Generator(Generate):
     def __init__(self, path_destination, logger=None):
-        super().__init__(path_destination, "csv", ".csv", logger=logger)
+        super().__init__(path_destination, "csv", ".csv", incremental=True, logger=logger)
 
     @staticmethod
     def known_types():
@@ -45,14 +51,99 @@ class Generator(Generate):
         :returns: (int): count of items on successful decoding and export, zero otherwise
         """
 
+        if "details" in df.columns:   # structured details (and box columns) are written as one JSON string
+            df = df.drop(columns=[x for x in COLUMNS_BOX if x in df.columns]).assign(details=details_serialize(df))
+
+        if "score" in df.columns and df["score"].dtype == np.float32:   # write with the same text as float64
+            df = df.astype({"score": np.float64})
+        if run_options.get("incremental", False):
+            num_items = self.generate_incremental(path_output, df, run_options.get("incremental_sort", False), run_options)
+            if num_items is not None:
+                return num_items
+
         df_prior = None
         if path.exists(path_output):
-            df_prior = pd.read_csv(path_output)
+            df_prior = self.read_csv(path_output)
             self.logger.info(f"Loaded {len(df_prior)} existing events from {path_output}...")
             df = pd.concat([df, df_prior])
             num_prior = len(df)
             df.drop_duplicates(inplace=True)
             self.logger.info(f"Duplicates removal shrunk from {num_prior} to {len(df)} surviving events...")
 
-        df.sort_values("time_begin").to_csv(path_output, index=False)
+        with self.open_output(path_output, run_options) as outfile:
+            df.sort_values("time_begin").to_csv(outfile, index=False)
         return len(df)
+
+    @staticmethod
+    def read_csv(path_output, **kwargs):
+        """Read a (compressed) CSV output, decompressed by file suffix
+
+        :param: path_output (str): path of the file
+        :param: kwargs: additional arguments for ``pd.read_csv``
+        :returns: (DataFrame): the loaded rows
+        """
+        with compression.open_read(path_output) as infile:
+            return pd.read_csv(infile, **kwargs)
+
+    @staticmethod
+    def row_hashes(df_text):
+        """Compute 64-bit hashes of CSV rows from their text (all columns read as strings)
+
+        :param: df_text (DataFrame): rows as read back from CSV text with ``dtype=str, keep_default_na=False``
+        :returns: (ndarray): ``uint64`` hash per row
+        """
+        return pd.util.hash_pandas_object(df_text, index=False).to_numpy()
+
+    def generate_incremental(self, path_output, df, full_sort=False, run_options=None):
+        """Append only events not already in the CSV, tracked by a sidecar of row hashes (rebuilt from the CSV
+        once if missing or stale) instead of re-reading and rewriting all prior events
+
+        :param: path_output (str): path for output of the file
+        :param: df (DataFrame): events to write (details serialized)
+        :param: full_sort (bool): also re-sort and rewrite the complete file by ``time_begin``
+        :param: run_options (dict): specific runtime information (for compression options)
+        :returns: (int): count of items in the file, or None if the existing file has other columns or its codec
+            cannot be appended to
+        """
+        if not compression.supports_append(path_output):
+            self.logger.warning(f"Compression of {path_output} does not support appending, merging with a full rewrite instead...")
+            return None
+        path_hash = path_output + HASH_SUFFIX
+        hash_prior = np.array([], dtype=np.uint64)
+        if path.exists(path_output):
+            if self.read_csv(path_output, nrows=0).columns.tolist() != df.columns.tolist():
+                self.logger.warning(f"Columns of {path_output} differ, merging with a full rewrite instead...")
+                return None
+            hash_prior = None
+            if path.exists(path_hash):
+                with np.load(path_hash) as hash_obj:
+                    if int(hash_obj["size"]) == path.getsize(path_output):   # sidecar matches last write
+                        hash_prior = hash_obj["hashes"]
+            if hash_prior is None:
+                hash_prior = np.sort(self.row_hashes(self.read_csv(path_output, dtype=str, keep_default_na=False)))
+                self.logger.info(f"Rebuilt {len(hash_prior)} row hashes from {path_output}...")
+
+        df = df.sort_values("time_begin", kind="stable")
+        text_rows = df.to_csv(index=False)
+        hash_new = self.row_hashes(pd.read_csv(io.StringIO(text_rows), dtype=str, keep_default_na=False))
+        rows_new = ~pd.Series(hash_new).duplicated().to_numpy()
+        if len(hash_prior):
+            idx_match = np.minimum(np.searchsorted(hash_prior, hash_new), len(hash_prior) - 1)
+            rows_new &= hash_prior[idx_match] != hash_new
+        if path.exists(path_output):
+            if rows_new.any():
+                with self.open_output(path_output, run_options, append=True) as outfile:
+                    outfile.write(df[rows_new].to_csv(index=False, header=False).encode('utf-8'))   # new gzip member(s)
+            self.logger.info(f"Appended {int(rows_new.sum())} of {len(df)} events to {len(hash_prior)} existing events...")
+        else:
+            with self.open_output(path_output, run_options) as outfile:
+                df[rows_new].to_csv(outfile, index=False)
+        hash_prior = np.sort(np.concatenate([hash_prior, hash_new[rows_new]]))
+
+        if full_sort:
+            df_text = self.read_csv(path_output, dtype=str, keep_default_na=False)
+            df_text = df_text.iloc[np.argsort(pd.to_numeric(df_text["time_begin"]).to_numpy(), kind="stable")]
+            with self.open_output(path_output, run_options) as outfile:
+                df_text.to_csv(outfile, index=False)
+        np.savez(path_hash, hashes=hash_prior, size=path.getsize(path_output))
+        return len(hash_prior)
@@ -0,0 +1,124 @@
+#! python
+# ===============LICENSE_START=======================================================
+# metadata-flatten-extractor Apache-2.0
+# ===================================================================================
+# Copyright (C) 2017-2020 AT&T Intellectual Property. All rights reserved.
+# ===================================================================================
+# This software file is distributed by AT&T 
+# under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# This file is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+# -*- coding: utf-8 -*-
+
+from os import path, makedirs, remove
+from urllib.parse import quote
+import shutil
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:   # optional dependency, the generator is not registered without it
+    pa = None
+
+from contentai_metadata_flatten.generators import Generate
+from contentai_metadata_flatten.parsers import COLUMNS_BOX, details_serialize
+
+COLUMNS_DICTIONARY = ["source_event", "tag_type", "tag", "extractor"]   # repeated strings, dictionary-encoded
+COLUMNS_PARTITION = ["extractor", "tag_type"]   # allowed partition columns
+
+class Generator(Generate):
+    def __init__(self, path_destination, logger=None):
+        super().__init__(path_destination, "parquet", ".parquet", self_compressed=True, logger=logger)
+
+    @staticmethod
+    def known_types():
+        """Return the output types for this generator
+        :return: list.  List of output types (file types) for this generator
+        """
+        return ["parquet"]
+
+    @staticmethod
+    def is_available():
+        """Return whether the optional dependency (``pyarrow``) of this generator is installed"""
+        return pa is not None
+
+    @staticmethod
+    def is_default():
+        """Return whether this generator runs by default; Parquet is an additional format, selected by name
+        (e.g. ``--generator parquet``)"""
+        return False
+
+    @staticmethod
+    def schema(columns):
+        """Return the typed Arrow schema of flattened events
+
+        :param: columns (list): column names of the events (in output order)
+        :returns: (pyarrow.Schema): float times and score, dictionary-encoded repeated strings, other columns as strings
+        """
+        list_fields = []
+        for col_name in columns:
+            if col_name in COLUMNS_DICTIONARY:
+                list_fields.append(pa.field(col_name, pa.dictionary(pa.int32(), pa.string())))
+            elif col_name in ["time_begin", "time_end", "time_event", "score"]:
+                list_fields.append(pa.field(col_name, pa.float64()))
+            else:
+                list_fields.append(pa.field(col_name, pa.string()))
+        return pa.schema(list_fields)
+
+    def generate(self, path_output, run_options, df):
+        """Generate Parquet from flattened results, sorted by ``time_begin`` so that row group statistics allow
+        readers to skip row groups by time
+
+        :param: path_output (str): path for output of the file (or dataset directory if partitioned)
+        :param: run_options (dict): specific runtime information (``parquet_partition``, ``parquet_row_group``)
+        :param: df (DataFrame): dataframe of events to break down
+        :returns: (int): count of items on successful decoding and export, zero otherwise
+        """
+        if pa is None:
+            self.logger.critical("Parquet output requires `pyarrow` (e.g. `pip install pyarrow`), processing aborted.")
+            return 0
+        list_partition = run_options.get("parquet_partition", "")
+        if isinstance(list_partition, str):   # command-line, comma-separated
+            list_partition = [x.strip() for x in list_partition.split(",") if x.strip()]
+        list_unknown = [x for x in list_partition if x not in COLUMNS_PARTITION]
+        if list_unknown:
+            raise ValueError(f"Unknown partition columns {list_unknown} (expected some of {COLUMNS_PARTITION})")
+        num_row_group = int(run_options.get("parquet_row_group", 0)) or None   # None for the library default
+
+        if "details" in df.columns:   # structured details (and box columns) are written as one JSON string
+            df = df.drop(columns=[x for x in COLUMNS_BOX if x in df.columns]).assign(details=details_serialize(df))
+        df = df.sort_values("time_begin", kind="stable")
+        df = df.astype({x: "category" for x in COLUMNS_DICTIONARY if x in df.columns})
+
+        if path.isdir(path_output):   # replace a prior output
+            shutil.rmtree(path_output)
+        elif path.exists(path_output):
+            remove(path_output)
+        if not list_partition:
+            self.write_table(path_output, df, num_row_group)
+            return len(df)
+        for values_partition, df_partition in df.groupby(list_partition, observed=True, sort=True):   # keeps time order
+            if not isinstance(values_partition, tuple):
+                values_partition = (values_partition,)
+            path_partition = path.join(path_output, *[f"{k}={quote(str(v), safe='')}" for k, v in zip(list_partition, values_partition)])
+            makedirs(path_partition, exist_ok=True)   # hive-style ``column=value`` directories
+            self.write_table(path.join(path_partition, "part-0.parquet"), df_partition.drop(columns=list_partition), num_row_group)
+        return len(df)
+
+    def write_table(self, path_file, df, num_row_group=None):
+        """Write events as one Parquet file with the typed schema
+
+        :param: path_file (str): path for the output file
+        :param: df (DataFrame): events, sorted and with categorical repeated strings
+        :param: num_row_group (int): rows per row group (None for the library default)
+        """
+        table = pa.Table.from_pandas(df, schema=self.schema(df.columns.tolist()), preserve_index=False)
+        pq.write_table(table, path_file, row_group_size=num_row_group)
@@ -19,12 +19,17 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import json
 import re
 from pandas import DataFrame
-import hashlib   # for key hashing
+import numpy as np
+import pandas as pd
+from operator import itemgetter
 
+from contentai_metadata_flatten import json_backend
 from contentai_metadata_flatten.generators import Generate
+from contentai_metadata_flatten.parsers import COLUMNS_BOX, details_merge
+
+KEY_MISSING = object()   # dedupe key value of fields missing from an object (differs from ``None``)
 
 class Generator(Generate):
     def __init__(self, path_destination, logger=None):
@@ -39,76 +44,144 @@ class Generator(Generate):
         """
         return ["json"]
 
-    def distill_type(self, output_obj, timed_row):
-        """Render input type to the right JSON/object format...
+    def distill_details(self, details_obj):
+        """Render the special fields of one event's details to the right JSON/object format...
 
-        :param: output_obj (dict): input/target dict object to update with type and data
-        :param: timed_row (pd.Series): a single row for output with some expected column names
-        :returns: (bool): time coverage indicator True (concrete and lasting through whole event),  False (descriptive, not necessarily entire timespan), None (unknown type)
+        :param: details_obj (dict or str): full details of an event (strings are decoded, empty for none)
+        :returns: (tuple): (dict of data type and ``box``/``uri``/``transcript`` fields in output order or None, has transcript)
         """
-        full_coverage = False
-        col_row = list(timed_row.index)
-        if not ("tag" in col_row and "score" in col_row and "source_event" in col_row):
-            return None
-        output_obj["dataObject"] = {"name": timed_row["tag"], "source": timed_row["source_event"], "type":timed_row["tag_type"],
-                                    "score": timed_row["score"], "extractor": timed_row["extractor"] }
-        output_obj["dataTypeId"] = "timedEvent"  # generic audio, visual, or textual tag
-        
-        if "details" in timed_row:    # check for special object
-            details_obj = None
-            if len(timed_row["details"]):    # face identity
-                details_obj = json.loads(timed_row["details"])
-                if 'box' in details_obj:
-                    output_obj['box'] = details_obj['box']
-                    output_obj["dataTypeId"] = "timedObject"  # object with specific coordinates
-                    full_coverage = (timed_row["time_begin"] == timed_row["time_end"])   # only full coverage if singleton event
-                if "uri" in details_obj:
-                    output_obj["uri"] = details_obj["uri"]
-                elif "url" in details_obj:
-                    output_obj["uri"] = details_obj["url"]
-                elif "urls" in details_obj:
-                    output_obj["uri"] = details_obj["urls"]
-                if 'transcript' in details_obj:
-                    output_obj["transcript"] = details_obj["transcript"]
-                    output_obj["dataTypeId"] = "timedText"  # object with specific coordinates
-                    full_coverage = True
-
-                # TODO: detail JSON : AgeRange (aws face), Pose (aws face), face (bounding box for person, azure), kfcluster (cae), shot_type (shot tags, azure)
-
-        return full_coverage
-
-    def append_timed(self, output_set, timed_row):
-        """Append timed row as either timespan or frame to output object...
+        if isinstance(details_obj, str):   # serialized details (e.g. loaded from a prior CSV)
+            details_obj = json_backend.loads(details_obj) if len(details_obj) else None
+        if not details_obj or details_obj != details_obj:   # none or missing (NaN, e.g. without a details column when deferred)
+            return None, False
+        dict_fields = {"dataTypeId": "timedEvent"}   # generic audio, visual, or textual tag
+        if 'box' in details_obj:   # face identity
+            dict_fields['box'] = details_obj['box']
+            dict_fields["dataTypeId"] = "timedObject"  # object with specific coordinates
+        if "uri" in details_obj:
+            dict_fields["uri"] = details_obj["uri"]
+        elif "url" in details_obj:
+            dict_fields["uri"] = details_obj["url"]
+        elif "urls" in details_obj:
+            dict_fields["uri"] = details_obj["urls"]
+        if 'transcript' in details_obj:
+            dict_fields["transcript"] = details_obj["transcript"]
+            dict_fields["dataTypeId"] = "timedText"  # object with specific coordinates
+
+        # TODO: detail JSON : AgeRange (aws face), Pose (aws face), face (bounding box for person, azure), kfcluster (cae), shot_type (shot tags, azure)
+        return dict_fields, 'transcript' in details_obj
+
+    def append_timed(self, output_set, df):
+        """Append all rows as either timespans or frames to output object, built column-wise...
 
         :param: output_set (dict): sets of timed objects ['descriptiveTimespans', 'concreteTimespans', 'frames']
-        :param: timed_row (pd.Series): a single row for output with some expected column names
+        :param: df (DataFrame): rows for output with some expected column names
         :returns: (dict): modified output object
         """
-        if timed_row["time_begin"] == timed_row["time_end"]:   # detect this is a frame input
-            new_frame = {"wbtcd:frameLocation":  { "valueFSTC": float(timed_row["time_event"]), "timeUnits": "seconds", "frameAccuracy": 0.001 },
-                            "wbtcd:frameData": {  } }
-            new_frame["wbtcd:frameLocation"]["valueFSTC"] = float(timed_row["time_event"])
-            if self.distill_type(new_frame["wbtcd:frameData"], timed_row) is not None:
-                output_set["frames"].append(new_frame)
-
-        else:   # detect that this is a timespan
-            new_span = { "start": float(timed_row["time_begin"]), "end": float(timed_row["time_end"]), "units": "seconds", "accuracy": 0.001 }
-            type_update = self.distill_type(new_span, timed_row)
-            if type_update is not None:
-                type_update = output_set["concreteTimespans" if type_update else "descriptiveTimespans"].append(new_span)
-
+        if not ("tag" in df.columns and "score" in df.columns and "source_event" in df.columns):
+            return output_set   # unknown type
+        if df["tag"].isna().any():   # rows of parsers without a tag column (e.g. pyscenedetect, when deferred) are skipped
+            df = df[df["tag"].notna()]
+        list_data = [{"name": name, "source": source, "type": type_tag, "score": score, "extractor": extractor}
+                     for name, source, type_tag, score, extractor in zip(*[df[x].tolist() for x in ["tag", "source_event", "tag_type", "score", "extractor"]])]
+        list_details = [None] * len(df)
+        if "details" in df.columns:
+            list_details = df["details"].tolist()
+            if "box_w" in df.columns:   # structured box columns
+                list_details = list(map(details_merge, list_details, *[df[x].tolist() for x in COLUMNS_BOX]))
+
+        is_frame = (df["time_begin"] == df["time_end"]).to_numpy()   # detect frame inputs
+        list_event = df["time_event" if "time_event" in df.columns else "time_begin"].tolist()   # e.g. scene spans without events
+        for idx_row in np.flatnonzero(is_frame).tolist():
+            dict_fields, _ = self.distill_details(list_details[idx_row])
+            frame_data = {"dataObject": list_data[idx_row], "dataTypeId": "timedEvent"}
+            if dict_fields is not None:
+                frame_data.update(dict_fields)
+            output_set["frames"].append({"wbtcd:frameLocation": {"valueFSTC": float(list_event[idx_row]), "timeUnits": "seconds",
+                                                                  "frameAccuracy": 0.001}, "wbtcd:frameData": frame_data})
+
+        idx_span = np.flatnonzero(~is_frame).tolist()   # timespans, concrete if lasting through whole event (text)
+        list_begin = df["time_begin"].tolist()
+        list_end = df["time_end"].tolist()
+        for idx_row in idx_span:
+            dict_fields, has_transcript = self.distill_details(list_details[idx_row])
+            new_span = {"start": float(list_begin[idx_row]), "end": float(list_end[idx_row]), "units": "seconds", "accuracy": 0.001,
+                        "dataObject": list_data[idx_row], "dataTypeId": "timedEvent"}
+            if dict_fields is not None:
+                new_span.update(dict_fields)
+            output_set["concreteTimespans" if has_transcript else "descriptiveTimespans"].append(new_span)
         return output_set
 
-    def hash_key(self, obj_new, col_check, raw_str=""):
-        """Hash input data into a specific hex key
+    @staticmethod
+    def key_value(value):
+        """Convert a (nested) JSON value into a hashable key that compares equal for equal content
 
-        :param: obj_new (dict): input data 
-        :param: col_check (list): list of strings (column names) to combine/bash
-        :param: raw_str (str): external data to include in hash
-        :returns: (int): count of items on successful decoding and export, zero otherwise
+        :param: value (object): decoded JSON value (e.g. a ``box`` dict or list of dicts)
+        :returns: (object): value with dicts as sorted tuples of items and lists as marked tuples
+        """
+        if isinstance(value, dict):
+            return tuple(sorted((k, Generator.key_value(v)) for k, v in value.items()))
+        if isinstance(value, list):   # marked to differ from a dict with the same items
+            return (list,) + tuple(Generator.key_value(v) for v in value)
+        return value
+
+    @staticmethod
+    def combine_codes(list_codes):
+        """Combine integer codes of several key columns into one dense code per row
+
+        :param: list_codes (list): arrays of codes (``-1`` or larger) of equal length
+        :returns: (ndarray): code per row, equal only for rows with equal codes in all columns
+        """
+        event_key = np.zeros(len(list_codes[0]), dtype=np.int64)
+        for codes in list_codes:
+            event_key = pd.factorize(event_key * (codes.max() + 2) + codes + 1)[0]
+        return event_key
+
+    def key_codes(self, values):
+        """Factorize (nested) JSON values into integer codes, equal for equal content
+
+        :param: values (list): decoded JSON values (e.g. ``box`` dicts), ``KEY_MISSING`` where absent
+        :returns: (ndarray): code per value
+        """
+        idx_dict = [i for i, v in enumerate(values) if v.__class__ is dict]
+        if idx_dict:   # common case of flat dicts with the same keys and numbers (e.g. ``box``), column-wise
+            list_dict = [values[i] for i in idx_dict]
+            key_names = list(list_dict[0])
+            try:
+                if len(key_names) and (np.fromiter(map(len, list_dict), dtype=np.int64, count=len(list_dict)) == len(key_names)).all():
+                    dict_values = [np.array(list(map(itemgetter(k), list_dict))) for k in key_names]
+                    if all(x.ndim == 1 and x.dtype.kind in "fi" for x in dict_values):
+                        codes = np.full(len(values), -1, dtype=np.int64)
+                        codes[idx_dict] = self.combine_codes([pd.factorize(x)[0] for x in dict_values])
+                        idx_other = np.flatnonzero(codes < 0)
+                        values_other = np.fromiter([values[i] for i in idx_other], dtype=object, count=len(idx_other))
+                        codes[idx_other] = pd.factorize(values_other)[0] + len(values) + 1
+                        return codes
+            except (KeyError, TypeError, ValueError):   # other keys, nested, or unhashable values
+                pass
+        return pd.factorize(np.fromiter(map(self.key_value, values), dtype=object, count=len(values)))[0]
+
+    def dedupe_timed(self, list_timed, list_time, list_data, column_unique, column_unique_data):
+        """Keep the first of each repeated timed object (same time, data object columns, and data) in one pass,
+        factorizing each typed key column and combining the integer codes instead of hashing strings per object
+
+        :param: list_timed (list): frame or timespan objects
+        :param: list_time (list): time of each object (frame location or span start)
+        :param: list_data (list): dict with the data object (``dataObject``) and data (e.g. ``box``) of each object
+        :param: column_unique (list): data object keys that make up the key (missing keys match only each other)
+        :param: column_unique_data (list): data keys that make up the key
+        :returns: (list): surviving objects in their original order
         """
-        raw_str += "_".join([str(obj_new[col_name]) for col_name in col_check if col_name in obj_new])  # allow optional columns
-        return hashlib.md5(raw_str.encode()).hexdigest()
+        if not list_timed:
+            return []
+        list_object = [x["dataObject"] for x in list_data]
+        list_codes = [pd.factorize(np.asarray(list_time))[0]]
+        for col_name in column_unique:
+            list_codes.append(pd.factorize(np.array([x.get(col_name, KEY_MISSING) for x in list_object], dtype=object))[0])
+        for col_name in column_unique_data:
+            list_codes.append(self.key_codes([x.get(col_name, KEY_MISSING) for x in list_data]))
+        event_key = self.combine_codes(list_codes)
+        return [list_timed[i] for i in np.flatnonzero(~pd.Series(event_key).duplicated().to_numpy()).tolist()]
 
     def generate(self, path_output, run_options, df):
         """Generate wbTimeTaggedMetadata from flattened results
@@ -135,7 +208,7 @@ class Generator(Generate):
                 if "descriptiveTimespans" in obj_out["wbtcd:timespans"]:
                     output_set["descriptiveTimespans"] = obj_out["wbtcd:timespans"]["descriptiveTimespans"]
                 if "concreteTimespans" in obj_out["wbtcd:timespans"]:
-                    output_set["descriptiveTimespans"] = obj_out["wbtcd:timespans"]["concreteTimespans"]
+                    output_set["concreteTimespans"] = obj_out["wbtcd:timespans"]["concreteTimespans"]
 
             # TODO: integrate this logic as a parser class as well
         
@@ -143,12 +216,8 @@ class Generator(Generate):
             obj_out = self.json_load(self.template_path)
             # TODO: consider dynamically repopulating event groupins with items and objects from schema?
 
-        idx_write = 0
-        for idx_r, val_r in df.iterrows():   # walk through all rows to generate
-            self.append_timed(output_set, val_r)
-            if (idx_write % 20000) == 0:
-                self.logger.info(f"Processing item {idx_write}/{len(df)} ...")
-            idx_write += 1
+        self.logger.info(f"Processing {len(df)} items ...")
+        self.append_timed(output_set, df)
         num_prior = 0
 
         column_unique = ["name", "source", "extractor"]   # define some collision columns
@@ -157,48 +226,23 @@ class Generator(Generate):
         # clean up any empty entries for schema compliance
         if len(output_set["frames"]):
             self.logger.info(f"Processing {len(output_set['frames'])} 'frame' events...")
-            obj_out["wbtcd:frames"] = []
-            hash_prior = {}
             num_prior += len(output_set["frames"])   # compute raw count as well
-            for obj_new in output_set["frames"]:   # parse each frame, combine both object data and frame time
-                hash_key = self.hash_key(obj_new["wbtcd:frameData"]["dataObject"], column_unique, 
-                                         str(obj_new["wbtcd:frameLocation"]["valueFSTC"]))
-                hash_key = self.hash_key(obj_new["wbtcd:frameData"], column_unique_data, hash_key)
-                if hash_key not in hash_prior:
-                    hash_prior[hash_key] = 1
-                    obj_out["wbtcd:frames"].append(obj_new)
+            obj_out["wbtcd:frames"] = self.dedupe_timed(output_set["frames"],   # combine both object data and frame time
+                                                        [x["wbtcd:frameLocation"]["valueFSTC"] for x in output_set["frames"]],
+                                                        [x["wbtcd:frameData"] for x in output_set["frames"]], column_unique, column_unique_data)
             num_items += len(obj_out["wbtcd:frames"])
 
-        if len(output_set["descriptiveTimespans"]):
-            self.logger.info(f"Processing {len(output_set['descriptiveTimespans'])} 'descriptiveTimespans' events...")
-            if "wbtcd:timespans" not in obj_out:
-                obj_out["wbtcd:timespans"] = {}
-            obj_out["wbtcd:timespans"]["descriptiveTimespans"] = []
-            hash_prior = {}
-            num_prior += len(output_set["descriptiveTimespans"])   # compute raw count as well
-            for obj_new in output_set["descriptiveTimespans"]:   # parse each event, all data in event object itself
-                hash_key = self.hash_key(obj_new["dataObject"], column_unique, str(obj_new["start"]))
-                hash_key = self.hash_key(obj_new, column_unique_data, hash_key)
-                if hash_key not in hash_prior:
-                    hash_prior[hash_key] = 1
-                    obj_out["wbtcd:timespans"]["descriptiveTimespans"].append(obj_new)
-            num_items += len(obj_out["wbtcd:timespans"]["descriptiveTimespans"])
-
-        if len(output_set["concreteTimespans"]):
-            self.logger.info(f"Processing {len(output_set['concreteTimespans'])} 'concreteTimespans' events...")
-            if "wbtcd:timespans" not in obj_out:
-                obj_out["wbtcd:timespans"] = {}
-            obj_out["wbtcd:timespans"]["concreteTimespans"] = []
-            hash_prior = {}
-            num_prior += len(output_set["concreteTimespans"])   # compute raw count as well
-            for obj_new in output_set["concreteTimespans"]:
-                hash_key = self.hash_key(obj_new["dataObject"], column_unique, str(obj_new["start"]))
-                hash_key = self.hash_key(obj_new, column_unique_data, hash_key)
-                if hash_key not in hash_prior:
-                    hash_prior[hash_key] = 1
-                    obj_out["wbtcd:timespans"]["concreteTimespans"].append(obj_new)
-            num_items += len(obj_out["wbtcd:timespans"]["concreteTimespans"])
+        for span_name in ["descriptiveTimespans", "concreteTimespans"]:
+            if len(output_set[span_name]):
+                self.logger.info(f"Processing {len(output_set[span_name])} '{span_name}' events...")
+                if "wbtcd:timespans" not in obj_out:
+                    obj_out["wbtcd:timespans"] = {}
+                num_prior += len(output_set[span_name])   # compute raw count as well
+                obj_out["wbtcd:timespans"][span_name] = self.dedupe_timed(output_set[span_name],   # all data in event object itself
+                                                                          [x["start"] for x in output_set[span_name]],
+                                                                          output_set[span_name], column_unique, column_unique_data)
+                num_items += len(obj_out["wbtcd:timespans"][span_name])
 
         self.logger.info(f"Duplicates removal shrunk from {num_prior} to {num_items} surviving events...")
-        self.json_save(path_output, obj_out)      # write out json object
+        self.json_save(path_output, obj_out, run_options=run_options)      # write out json object
         return num_items
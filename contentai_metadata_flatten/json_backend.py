@@ -0,0 +1,213 @@
+#! python
+# ===============LICENSE_START=======================================================
+# metadata-flatten-extractor Apache-2.0
+# ===================================================================================
+# Copyright (C) 2017-2020 AT&T Intellectual Property. All rights reserved.
+# ===================================================================================
+# This software file is distributed by AT&T
+# under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# This file is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+# -*- coding: utf-8 -*-
+
+# pluggable JSON decoding, using the fastest installed library (orjson, simdjson, ujson) or stdlib json; outputs are
+# always encoded with stdlib json so that their bytes do not depend on the installed libraries
+
+import json
+import gzip
+
+_backends = {}   # name -> {'loads': func(bytes)}
+
+_backends["json"] = {'loads': json.loads}
+
+try:
+    import ujson
+    _backends["ujson"] = {'loads': ujson.loads}
+except ImportError:
+    pass
+
+try:
+    import simdjson
+    _backends["simdjson"] = {'loads': simdjson.loads}
+except ImportError:
+    pass
+
+try:
+    import orjson
+    _backends["orjson"] = {'loads': orjson.loads}
+except ImportError:
+    pass
+
+try:
+    import ijson   # incremental parsing for very large documents
+except ImportError:
+    ijson = None
+
+_active = [x for x in ["orjson", "simdjson", "ujson", "json"] if x in _backends][0]
+
+
+def available_backends():
+    """Return the names of installed JSON backends (``json`` is always available)"""
+    return list(_backends.keys())
+
+
+def get_backend():
+    """Return the name of the active JSON backend"""
+    return _active
+
+
+def set_backend(name=None):
+    """Set the active JSON backend by name (or the fastest installed for ``None``)
+
+    :param name: (str): backend name, one of ``available_backends()``
+    :return: str.  The name of the active backend
+    """
+    global _active
+    if name is None:
+        name = [x for x in ["orjson", "simdjson", "ujson", "json"] if x in _backends][0]
+    if name not in _backends:
+        raise ValueError(f"JSON backend '{name}' is not installed (available: {available_backends()})")
+    _active = name
+    return _active
+
+
+def read_bytes(path_file):
+    """Read the full (decompressed) contents of a file in one bulk read
+
+    :param path_file: (str): Path for source file (can be gzipped)
+    :return: bytes.  The raw file contents
+    """
+    with open(path_file, 'rb') as infile:
+        raw_data = infile.read()
+    if path_file.endswith(".gz"):
+        raw_data = gzip.decompress(raw_data)
+    return raw_data
+
+
+def loads(raw_data):
+    """Decode JSON bytes with the active backend, falling back to stdlib for inputs it rejects (e.g. ``NaN``)
+
+    :param raw_data: (bytes): encoded JSON
+    :return: object.  The decoded object; raises ``ValueError`` if not decodable
+    """
+    try:
+        return _backends[_active]['loads'](raw_data)
+    except ValueError as e:
+        if _active == "json":
+            raise e
+    return json.loads(raw_data)
+
+
+def dumps(obj, pretty_print=False):
+    """Encode an object as JSON bytes with stdlib json (same form for any active backend, e.g. ``NaN`` and spacing)
+
+    :param obj: (object): object to encode
+    :param pretty_print: (bool): write out in more human-readable format
+    :return: bytes.  The encoded JSON
+    """
+    return json.dumps(obj, indent=4 if pretty_print else None).encode('utf-8')
+
+
+def dump_stream(obj, outfile, num_chunk=10000, max_depth=2):
+    """Encode an object as JSON to a binary stream, writing long arrays in chunks of elements instead of
+    encoding the whole document in one call (same bytes as ``dumps``); the object itself is still held in full
+
+    :param obj: (object): object to encode
+    :param outfile: (file): binary stream to write to (e.g. a gzip file)
+    :param num_chunk: (int): number of array elements to encode at a time
+    :param max_depth: (int): levels of nested dicts searched for arrays to stream (others are encoded whole)
+    :return: int.  Number of bytes written
+    """
+    sep_key, sep_item = b": ", b", "   # stdlib separators (as in ``dumps``)
+
+    def write_value(value, num_depth):
+        if isinstance(value, list) and len(value) > num_chunk:
+            num_bytes = outfile.write(b"[")
+            for idx_chunk in range(0, len(value), num_chunk):
+                if idx_chunk:
+                    num_bytes += outfile.write(sep_item)
+                num_bytes += outfile.write(dumps(value[idx_chunk:idx_chunk + num_chunk])[1:-1])   # elements only
+            return num_bytes + outfile.write(b"]")
+        if isinstance(value, dict) and num_depth > 0 and value and all(isinstance(k, str) for k in value):
+            num_bytes = outfile.write(b"{")
+            for idx_key, (key_name, value_key) in enumerate(value.items()):
+                if idx_key:
+                    num_bytes += outfile.write(sep_item)
+                num_bytes += outfile.write(dumps(key_name) + sep_key)
+                num_bytes += write_value(value_key, num_depth - 1)
+            return num_bytes + outfile.write(b"}")
+        return outfile.write(dumps(value))
+
+    return write_value(obj, max_depth + 1)
+
+
+def item_prefix(item_path):
+    """Convert an item path like ``videos[].insights.faces[]`` into a dotted prefix (``videos.item.insights.faces.item``)
+
+    :param item_path: (str): keys separated by ``.``, with ``[]`` to address each element of an array
+    :return: str.  The equivalent prefix for incremental parsing
+    """
+    return item_path.replace("[]", ".item").strip(".")
+
+
+def iter_object_items(obj, item_paths):
+    """Generator over the items of an already decoded object at one or more item paths
+
+    :param obj: (dict): decoded JSON document
+    :param item_paths: (list): item paths (see ``item_prefix``)
+    :return: tuple.  Generator of (item path, item), grouped by item path
+    """
+    for item_path in item_paths:
+        list_nodes = [obj]
+        for key_name in item_prefix(item_path).split("."):
+            if key_name == "item":
+                list_nodes = [x for node in list_nodes if isinstance(node, list) for x in node]
+            else:
+                list_nodes = [node[key_name] for node in list_nodes if isinstance(node, dict) and key_name in node]
+        for item in list_nodes:
+            yield item_path, item
+
+
+def iter_items(path_file, item_paths):
+    """Generator over the items at one or more item paths of a JSON file, decoded incrementally in one pass
+    if ``ijson`` is installed (otherwise the whole document is decoded first)
+
+    :param path_file: (str): Path for source file (can be gzipped)
+    :param item_paths: (list): item paths (see ``item_prefix``)
+    :return: tuple.  Generator of (item path, item); raises ``ValueError`` if not decodable
+    """
+    if ijson is None:
+        yield from iter_object_items(loads(read_bytes(path_file)), item_paths)
+        return
+
+    map_prefix = {item_prefix(x): x for x in item_paths}
+    with (gzip.open(path_file, 'rb') if path_file.endswith(".gz") else open(path_file, 'rb')) as infile:
+        try:
+            iter_events = ijson.parse(infile, use_float=True)
+            for prefix, event, value in iter_events:
+                if prefix not in map_prefix or event in ("end_map", "end_array", "map_key"):
+                    continue
+                if event not in ("start_map", "start_array"):   # scalar item
+                    yield map_prefix[prefix], value
+                    continue
+                builder = ijson.ObjectBuilder()   # only this item is materialized
+                builder.event(event, value)
+                num_depth = 1
+                while num_depth:
+                    prefix_inner, event, value = next(iter_events)
+                    if event in ("start_map", "start_array"):
+                        num_depth += 1
+                    elif event in ("end_map", "end_array"):
+                        num_depth -= 1
+                    builder.event(event, value)
+                yield map_prefix[prefix], builder.value
+        except ijson.JSONError as e:
+            raise ValueError(f"Failed to decode '{path_file}' incrementally ({e})")
@@ -22,6 +22,12 @@ import sys
 import argparse
 from pathlib import Path
 import logging
+import json
+import glob
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
 
 import pandas as pd
 import contentaiextractor as contentai
@@ -32,7 +38,222 @@ if __name__ == '__main__':
     if pathRoot not in sys.path:
         sys.path.append(pathRoot)
 
-from contentai_metadata_flatten import parsers, generators
+from contentai_metadata_flatten import parsers, generators, compression
+
+TIMING_FILE = "timing.txt"
+BATCH_SUMMARY = "batch_summary.json"
+
+
+def parse_single(parser_name, path_source, config, logger=None):
+    """Helper to instantiate and run a single parser by name (also the entry point for pool workers)
+
+    :param parser_name: (str): exact name of an auto-discovered parser (e.g. ``azure_videoindexer``)
+    :param path_source: (str): path for content directory to search for extractor results
+    :param config: (dict): specific runtime information passed to the parser
+    :returns: (DataFrame): DataFrame (compact schema) on successful decoding, None otherwise
+    """
+    if logger is None:
+        logger = logging.getLogger()
+    list_match = [local_obj for local_obj in parsers.get_by_name(parser_name) if local_obj['name'] == parser_name]
+    if not list_match:
+        logger.critical(f"Parser `{parser_name}` not found in available modules, skipping")
+        return None
+    parser_instance = list_match[0]['obj'](path_source, logger=logger)   # create instance
+    df = parser_instance.parse(config)  # attempt to process
+    if df is not None and 'coalesce_gap' in config and config['coalesce_gap'] is not None:   # merge frames into spans
+        num_events = len(df)
+        df = parsers.coalesce_events(df, float(config['coalesce_gap']), config.get('coalesce_score', "max"))
+        logger.info(f"Coalesced {num_events} events into {len(df)} for '{parser_name}'")
+    if df is not None and 'sample_interval' in config and config['sample_interval'] is not None:   # bound output rate
+        num_events = len(df)
+        df = parsers.decimate_events(df, float(config['sample_interval']))
+        logger.info(f"Decimated {num_events} events to {len(df)} for '{parser_name}'")
+    return None if df is None else parsers.compact_dataframe(df)   # compact before pickling or generation
+
+
+def get_workers(config):
+    """Helper to resolve the number of pool workers from run configuration (``0`` or less for all cores)"""
+    num_workers = int(config['workers']) if 'workers' in config and config['workers'] is not None else 1
+    if num_workers < 1:   # allow auto-detection of core count
+        num_workers = cpu_count()
+    return num_workers
+
+
+def pool_iterate(executor, list_tasks, num_window):
+    """Generator to submit tasks to an executor and yield their futures in submission order
+
+    :param executor: (Executor): pool for task execution
+    :param list_tasks: (iterable): tuples of (function, arg1, arg2, ...) to submit
+    :param num_window: (int): maximum number of outstanding tasks, bounding memory for finished results
+    :returns: (Future): generator of futures in the same order as ``list_tasks``
+    """
+    queue_futures = deque()
+    for task_args in list_tasks:
+        queue_futures.append(executor.submit(*task_args))
+        if len(queue_futures) >= num_window:
+            yield queue_futures.popleft()
+    while queue_futures:
+        yield queue_futures.popleft()
+
+
+def parse_iterate(list_names, path_source, config, logger=None):
+    """Generator to run a list of parsers serially or in a process pool, yielding results in input order
+
+    :param list_names: (list): names of parsers to execute; ``None`` entries are passed through as ``None``
+    :param path_source: (str): path for content directory to search for extractor results
+    :param config: (dict): specific runtime information, ``workers`` will set the size of the process pool
+    :returns: (tuple): generator of (parser name, DataFrame or None) in the same order as ``list_names``
+    """
+    if logger is None:
+        logger = logging.getLogger()
+    list_valid = [parser_name for parser_name in list_names if parser_name is not None]
+    num_workers = min(get_workers(config), len(list_valid))
+
+    if num_workers <= 1:   # serial execution, parse just in time
+        for parser_name in list_names:
+            yield parser_name, (None if parser_name is None else parse_single(parser_name, path_source, config, logger))
+        return
+
+    logger.info(f"Parsing {len(list_valid)} extractors with a pool of {num_workers} workers...")
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        iter_futures = pool_iterate(executor, [(parse_single, parser_name, path_source, config) for parser_name in list_valid], 
+                                    len(list_valid))
+        for parser_name in list_names:  # wait for results in order
+            yield parser_name, (None if parser_name is None else next(iter_futures).result())
+
+
+def plan_outputs(config, list_parser_modules, list_generator_modules, logger):
+    """Map each parser to its generator outputs and determine whether it needs to be parsed
+
+    :param config: (dict): specific runtime information (``path_result``, ``compressed``, ``compression``, ``force_overwrite``)
+    :param list_parser_modules: (list): auto-discovered parser modules
+    :param list_generator_modules: (list): auto-discovered generator modules
+    :returns: (list): job dicts with parser ``name`` (``None`` if skipped) and ``outputs`` per generator
+    """
+    path_result = Path(config['path_result'])
+    need_generation = False
+    list_jobs = []
+    set_types = parsers.event_filters(config)["tag_types"]
+    set_typed = None if set_types is None else set([x['name'] for x in parsers.get_by_type(list(set_types))])
+    for parser_obj in list_parser_modules:  # iterate through auto-discovered packages
+        map_outputs = {}
+        for generator_obj in list_generator_modules:  # iterate through auto-discovered packages
+            generator_instance = generator_obj['obj'](str(path_result), logger=logger)   # create instance
+            generator_name = generator_obj['name']
+            map_outputs[generator_name] = {'module': generator_instance, 'path': generator_instance.get_output_path(parser_obj['name'])}
+            if "compressed" in config and config["compressed"] and not generator_instance.is_self_compressed:  # allow compressed version
+                map_outputs[generator_name]["path"] += compression.suffix(config.get("compression", "gzip"))
+            need_generation |= (generator_instance.is_universal or not Path(map_outputs[generator_name]["path"]).exists()
+                                or (config.get("incremental", False) and generator_instance.is_incremental))
+
+        if set_typed is not None and parser_obj['name'] not in set_typed:   # none of its types requested
+            logger.info(f"Skipping parser '{parser_obj['name']}' without requested tag types ({sorted(set_types)})...")
+            list_jobs.append({'name': None, 'outputs': map_outputs})
+        elif not need_generation and not config['force_overwrite']:
+            logger.info(f"Skipping re-process of {config['path_result']}...")
+            list_jobs.append({'name': None, 'outputs': map_outputs})
+        else:
+            list_jobs.append({'name': parser_obj['name'], 'outputs': map_outputs})
+    return list_jobs
+
+
+def generate_outputs(config, list_jobs, iter_results, logger, map_counts=None):
+    """Apply time offsets to parsed results and hand them to each generator
+
+    :param config: (dict): specific runtime information
+    :param list_jobs: (list): job dicts from ``plan_outputs``
+    :param iter_results: (iterable): (parser name, DataFrame or None) in the same order as ``list_jobs``
+    :param map_counts: (dict): optional dict updated with the number of events per parser
+    :returns: (set): paths of generated (or existing) result files
+    """
+    set_results = set()
+    map_deferred = {}   # universal generators called once after all parsers (when deferred)
+    for job_obj, (parser_name, df) in zip(list_jobs, iter_results):
+        map_outputs = job_obj['outputs']
+        if parser_name is not None and df is None:  # skip bad results
+            if len(config['extractor']):
+                logger.warning(f"Specified extractor `{config['extractor']}` failed to find data. " \
+                    f"Verify that input directory {config['path_content']} points directly to file...")
+
+        if df is not None:
+            if config['time_offset'] != 0:  # need offset?
+                logger.info(f"Applying time offset of {config['time_offset']} seconds to {len(df)} events ('{parser_name}')...")
+                for col_name in ['time_begin', 'time_end', 'time_event']:
+                    df[col_name] += config['time_offset']
+            df.drop(df[df["time_begin"] < 0].index, inplace=True)  # drop rows if trimmed from front
+            if map_counts is not None:
+                map_counts[parser_name] = len(df)
+
+            for generator_name in map_outputs:  # iterate through auto-discovered packages
+                if config['defer_universal'] and map_outputs[generator_name]['module'].is_universal:
+                    if generator_name not in map_deferred:
+                        map_deferred[generator_name] = {'output': map_outputs[generator_name], 'data': []}
+                    map_deferred[generator_name]['data'].append(df)
+                elif map_outputs[generator_name]['module'].is_universal or not Path(map_outputs[generator_name]["path"]).exists() \
+                        or (config.get('incremental', False) and map_outputs[generator_name]['module'].is_incremental):
+                    num_items = map_outputs[generator_name]['module'].generate(map_outputs[generator_name]["path"], config, df)  # attempt to process
+                    logger.info(f"Wrote {num_items} items as '{generator_name}' to result file '{map_outputs[generator_name]['path']}'")
+                else:
+                    logger.info(f"Skipping re-generate of {generator_name} to file '{map_outputs[generator_name]['path']}''...")
+                set_results.add(map_outputs[generator_name]["path"])
+
+    for generator_name in map_deferred:  # single pass for deferred universal generators
+        output_obj = map_deferred[generator_name]['output']
+        df = parsers.compact_dataframe(pd.concat(map_deferred[generator_name]['data'], ignore_index=True))
+        map_deferred[generator_name]['data'] = None   # release references to partial frames
+        num_items = output_obj['module'].generate(output_obj["path"], config, df)  # attempt to process
+        logger.info(f"Wrote {num_items} items as '{generator_name}' to result file '{output_obj['path']}' " \
+            f"(deferred, {len(df)} events)")
+    return set_results
+
+
+def add_processing_arguments(parser):
+    """Add the input, parsing, and output options shared by ``flatten`` and ``batch``"""
+    submain = parser.add_argument_group('input and parsing options')
+    submain.add_argument('--extractor', dest='extractor', type=str, default="", 
+                            help='specify one extractor to flatten, skipping nested module import (*default=all*, e.g. ``dsai_metadata``)')
+    submain.add_argument('--time_offset', dest='time_offset', type=int, default=0, 
+                            help='when merging events for an asset split into multiple parts, time in seconds (*default=0*); negative numbers will cause a truncation (skip) of events happening before the zero time mark *(added v0.7.1)*')
+    submain.add_argument('--all_frames', dest='all_frames', default=False, action='store_true', 
+                            help='for video-based events, log all instances in box or just the center')
+    submain.add_argument('--workers', dest='workers', type=int, default=1, 
+                            help='number of processes for parallel parsing of extractors (*default=1*, serial; 0 for all cores)')
+    submain.add_argument('--score_min', dest='score_min', type=float, default=None, 
+                            help='drop events with a score below this value while parsing (*default=None*, all scores)')
+    submain.add_argument('--tag_types', dest='tag_types', type=str, default="", 
+                            help='comma-separated tag types to keep while parsing, skipping extractors without them (*default=all*, e.g. ``tag,identity``)')
+    submain.add_argument('--top_k_per_frame', dest='top_k_per_frame', type=int, default=0, 
+                            help='keep only the highest scoring events of each frame (same time, source, tag type, and box) (*default=0*, all)')
+    submain.add_argument('--coalesce_gap', dest='coalesce_gap', type=float, default=None, 
+                            help='merge consecutive frame detections of the same tag that are at most this many seconds apart into spans (*default=None*, no merging)')
+    submain.add_argument('--coalesce_score', dest='coalesce_score', type=str, default="max", choices=["max", "mean"], 
+                            help='score of a merged span from its detections (*default=max*)')
+    submain.add_argument('--sample_interval', dest='sample_interval', type=float, default=None, 
+                            help='keep only the highest scoring event of each tag in each interval of this many seconds (*default=None*, all events)')
+    submain = parser.add_argument_group('output modulation')
+    submain.add_argument('--generator', dest='generator', type=str, default="", 
+                            help='specify one generator for output, skipping nested module import (*default=all*)')
+    submain.add_argument('--no_compression', dest='compressed', default=True, action='store_false', 
+                            help="compress output CSVs instead of raw write (*default=True*, e.g. append ‘.gz’)")
+    submain.add_argument('--compression', dest='compression', type=str, default="gzip", choices=compression.available_codecs(), 
+                            help="codec for compressed outputs, ``zstd`` and ``lz4`` if installed (*default=gzip*, suffix ‘.gz’, ‘.zst’, ‘.lz4’)")
+    submain.add_argument('--compression_level', dest='compression_level', type=int, default=None, 
+                            help="compression level of the codec (*default=None*, codec default, e.g. 9 for gzip)")
+    submain.add_argument('--compression_threads', dest='compression_threads', type=int, default=1, 
+                            help="threads compressing each output, gzip as independent blocks still readable by gzip (*default=1*, 0 for all cores)")
+    submain.add_argument('--force_overwrite', dest='force_overwrite', default=False, action='store_true', 
+                            help="compforce existing files to be overwritten (*default=False*)")
+    submain.add_argument('--defer_universal', dest='defer_universal', default=False, action='store_true', 
+                            help="collect events from all extractors and call universal generators once at the end (*default=False*)")
+    submain.add_argument('--parquet_partition', dest='parquet_partition', type=str, default="", 
+                            help="comma-separated columns to partition Parquet outputs by, ``extractor`` and/or ``tag_type`` (*default=none*, one file)")
+    submain.add_argument('--parquet_row_group', dest='parquet_row_group', type=int, default=0, 
+                            help="rows per Parquet row group, sorted by time (*default=0*, library default)")
+    submain.add_argument('--incremental', dest='incremental', default=False, action='store_true', 
+                            help="append only new events to existing outputs that support it (CSV), tracked by a sidecar of row hashes (*default=False*)")
+    submain.add_argument('--incremental_sort', dest='incremental_sort', default=False, action='store_true', 
+                            help="with ``incremental``, also re-sort and rewrite each complete output by time (*default=False*)")
+    return parser
 
 
 def flatten(input_params=None, args=None, logger=None):
@@ -54,20 +275,7 @@ def flatten(input_params=None, args=None, logger=None):
                             help='output path for samples')
     submain.add_argument('--verbose', dest='verbose', default=False, action='store_true', 
                             help='verbosely print operations')
-    submain = parser.add_argument_group('input and parsing options')
-    submain.add_argument('--extractor', dest='extractor', type=str, default="", 
-                            help='specify one extractor to flatten, skipping nested module import (*default=all*, e.g. ``dsai_metadata``)')
-    submain.add_argument('--time_offset', dest='time_offset', type=int, default=0, 
-                            help='when merging events for an asset split into multiple parts, time in seconds (*default=0*); negative numbers will cause a truncation (skip) of events happening before the zero time mark *(added v0.7.1)*')
-    submain.add_argument('--all_frames', dest='all_frames', default=False, action='store_true', 
-                            help='for video-based events, log all instances in box or just the center')
-    submain = parser.add_argument_group('output modulation')
-    submain.add_argument('--generator', dest='generator', type=str, default="", 
-                            help='specify one generator for output, skipping nested module import (*default=all*)')
-    submain.add_argument('--no_compression', dest='compressed', default=True, action='store_false', 
-                            help="compress output CSVs instead of raw write (*default=True*, e.g. append ‘.gz’)")
-    submain.add_argument('--force_overwrite', dest='force_overwrite', default=False, action='store_true', 
-                            help="compforce existing files to be overwritten (*default=False*)")
+    add_processing_arguments(parser)
 
     if args is not None:
         config = vars(parser.parse_args(args))
@@ -97,54 +305,130 @@ def flatten(input_params=None, args=None, logger=None):
         path_source = path_source.parent
     path_source = str(path_source.resolve())
 
-    need_generation = False
-    map_outputs = {}
-    set_results = set()
-    for parser_obj in list_parser_modules:  # iterate through auto-discovered packages
-        for generator_obj in list_generator_modules:  # iterate through auto-discovered packages
-            generator_instance = generator_obj['obj'](str(path_result), logger=logger)   # create instance
-            generator_name = generator_obj['name']
-            map_outputs[generator_name] = {'module': generator_instance, 'path': generator_instance.get_output_path(parser_obj['name'])}
-            if "compressed" in config and config["compressed"]:  # allow compressed version
-                map_outputs[generator_name]["path"] += ".gz"
-            need_generation |= (generator_instance.is_universal or not Path(map_outputs[generator_name]["path"]).exists())
+    list_jobs = plan_outputs(config, list_parser_modules, list_generator_modules, logger)
+    if config["verbose"]:
+        logger.info(f"ContentAI arguments: {config}")
 
-        df = None
-        if not need_generation and not config['force_overwrite']:
-            logger.info(f"Skipping re-process of {config['path_result']}...")
-        else:
-            parser_instance = parser_obj['obj'](path_source, logger=logger)   # create instance
-        
-            if config["verbose"]:
-                logger.info(f"ContentAI arguments: {config}")
-            df = parser_instance.parse(config)  # attempt to process
+    list_names = [job_obj['name'] for job_obj in list_jobs]
+    set_results = generate_outputs(config, list_jobs, parse_iterate(list_names, path_source, config, logger), logger)
 
-            if df is None:  # skip bad results
-                if len(config['extractor']):
-                    logger.warning(f"Specified extractor `{config['extractor']}` failed to find data. " \
-                        f"Verify that input directory {path_source} points directly to file...")
+    # resolve and return fully qualified path
+    return [str(Path(config['path_result']).joinpath(k).resolve()) for k in set_results]
 
-        if df is not None:
-            if config['time_offset'] != 0:  # need offset?
-                logger.info(f"Applying time offset of {config['time_offset']} seconds to {len(df)} events ('{parser_obj['name']}')...")
-                for col_name in ['time_begin', 'time_end', 'time_event']:
-                    df[col_name] += config['time_offset']
-            df.drop(df[df["time_begin"] < 0].index, inplace=True)  # drop rows if trimmed from front
 
-            for generator_name in map_outputs:  # iterate through auto-discovered packages
-                if map_outputs[generator_name]['module'].is_universal or not Path(map_outputs[generator_name]["path"]).exists():
-                    num_items = map_outputs[generator_name]['module'].generate(map_outputs[generator_name]["path"], config, df)  # attempt to process
-                    logger.info(f"Wrote {num_items} items as '{generator_name}' to result file '{map_outputs[generator_name]['path']}'")
-                else:
-                    logger.info(f"Skipping re-generate of {generator_name} to file '{map_outputs[generator_name]['path']}''...")
-                set_results.add(map_outputs[generator_name]["path"])
+def batch(input_params=None, args=None, logger=None):
+    """Flatten many assets (result directories) with one persistent process pool
+
+    :param input_params: (dict): run configuration that overrides parsed arguments
+    :param args: (list): command-line arguments (default from ``sys.argv``)
+    :returns: (list): per-asset summary dicts (also written as ``batch_summary.json`` in the result path)
+    """
+    if logger is None:
+        logger = logging.getLogger()
+    logging.basicConfig(level=logging.WARNING)
+
+    parser = argparse.ArgumentParser(
+        description="""A script to perform metadata parsing for many assets""",
+        epilog="""
+        Launch to parse all downloaded job directories (one output directory per asset)... 
+            contentai-metadata-flatten batch "results/*" --path_result flattened --workers 8
+    """, formatter_class=argparse.RawTextHelpFormatter)
+    submain = parser.add_argument_group('main execution and evaluation functionality')
+    submain.add_argument('path_assets', type=str, nargs='*', 
+                            help='asset directories or glob patterns (e.g. ``results/*``)')
+    submain.add_argument('--path_list', dest='path_list', type=str, default="", 
+                            help='text file with one asset directory per line')
+    submain.add_argument('--path_result', dest='path_result', type=str, default="", 
+                            help='output path for samples; one sub-directory per asset unless ``merge_result``')
+    submain.add_argument('--merge_result', dest='merge_result', default=False, action='store_true', 
+                            help='write all assets into the same result directory (e.g. parts of one split asset)')
+    submain.add_argument('--verbose', dest='verbose', default=False, action='store_true', 
+                            help='verbosely print operations')
+    add_processing_arguments(parser)
+
+    if args is not None:
+        config = vars(parser.parse_args(args))
+    else:
+        config = vars(parser.parse_args())
+    if input_params is not None:
+        config.update(input_params)
+    logger.info(f"Run arguments: {config}")
+
+    list_assets = []
+    for path_pattern in config['path_assets']:
+        list_assets += sorted(glob.glob(path_pattern)) if glob.has_magic(path_pattern) else [path_pattern]
+    if config['path_list']:
+        with open(config['path_list'], 'rt') as f:
+            list_assets += [x.strip() for x in f if x.strip()]
+    list_assets = [Path(x).resolve() for x in list_assets if Path(x).is_dir()]
+    if not list_assets or not config['path_result']:
+        logger.critical(f"Missing asset directories ({len(list_assets)} found) or result path ({config['path_result']})")
+        parser.print_help(sys.stderr)
+        return []
+
+    list_parser_modules = parsers.get_by_name(config['extractor'] if len(config['extractor']) else None)
+    list_generator_modules = generators.get_by_name(config['generator'] if len(config['generator']) else None)
+
+    list_batch = []
+    for path_asset in list_assets:  # per-asset configuration, plan, and parser tasks
+        config_asset = dict(config)
+        config_asset['path_content'] = str(path_asset)
+        config_asset['path_result'] = config['path_result'] if config['merge_result'] else str(Path(config['path_result']).joinpath(path_asset.name))
+        path_timing = path_asset.joinpath(TIMING_FILE)
+        if path_timing.exists():   # same behavior as `run_local.sh`
+            config_asset['time_offset'] = float(path_timing.read_text().strip())
+            config_asset['force_overwrite'] = False
+            logger.info(f"Detected timing file '{path_timing}' with offset {config_asset['time_offset']} seconds...")
+        Path(config_asset['path_result']).mkdir(parents=True, exist_ok=True)
+        list_jobs = plan_outputs(config_asset, list_parser_modules, list_generator_modules, logger)
+        list_batch.append({'config': config_asset, 'jobs': list_jobs})
+
+    num_workers = get_workers(config)
+    list_tasks = [(parse_single, job_obj['name'], asset_obj['config']['path_content'], asset_obj['config'])
+                  for asset_obj in list_batch for job_obj in asset_obj['jobs'] if job_obj['name'] is not None]
+    logger.info(f"Parsing {len(list_tasks)} extractor results from {len(list_batch)} assets with a pool of {num_workers} workers...")
+
+    list_summary = []
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        iter_futures = pool_iterate(executor, list_tasks, num_workers * 2)
+
+        def asset_results(asset_obj, map_errors):
+            for job_obj in asset_obj['jobs']:
+                if job_obj['name'] is None:
+                    yield None, None
+                    continue
+                future_obj = next(iter_futures)
+                try:
+                    yield job_obj['name'], future_obj.result()
+                except Exception as e:   # one bad extractor should not halt the batch
+                    logger.warning(f"Failed to parse '{job_obj['name']}' for asset '{asset_obj['config']['path_content']}' (error: '{e}')")
+                    map_errors[job_obj['name']] = str(e)
+                    yield job_obj['name'], None
+
+        for asset_obj in list_batch:   # generation in order, while the pool keeps parsing ahead
+            time_start = time.time()
+            config_asset = asset_obj['config']
+            map_counts, map_errors = {}, {}
+            set_results = generate_outputs(config_asset, asset_obj['jobs'], asset_results(asset_obj, map_errors), logger, map_counts)
+            list_summary.append({'path_content': config_asset['path_content'], 'path_result': config_asset['path_result'],
+                                 'time_offset': config_asset['time_offset'], 'events': map_counts, 'errors': map_errors,
+                                 'results': sorted([str(Path(k).resolve()) for k in set_results]), 
+                                 'seconds': round(time.time() - time_start, 3)})
+            logger.info(f"Flattened {sum(map_counts.values())} events from {len(map_counts)} extractors for '{config_asset['path_content']}'")
+
+    path_summary = Path(config['path_result']).joinpath(BATCH_SUMMARY)
+    with path_summary.open('wt') as f:
+        json.dump(list_summary, f, indent=4)
+    logger.info(f"Wrote batch summary for {len(list_summary)} assets to '{path_summary}'")
+    return list_summary
 
-    # resolve and return fully qualified path
-    return [str(Path(config['path_result']).joinpath(k).resolve()) for k in set_results]
 
 def main():
     """Helper wrapper for CLI return status"""
-    flatten()
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":   # sub-command for multiple assets
+        batch(args=sys.argv[2:])
+    else:
+        flatten()
 
 if __name__ == "__main__":
-    flatten()
+    main()
@@ -24,8 +24,13 @@ import importlib
 import json
 import re
 import math
-import gzip
+import os
+import array
+import functools
 from os import path
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 from pathlib import Path
 
@@ -33,10 +38,349 @@ import logging
 import warnings
 from sys import stdout as STDOUT
 
+import numpy as np
 import pandas as pd
+from pytimeparse import parse as pt_parse
 
 import contentaiextractor as contentai
 
+from contentai_metadata_flatten import json_backend
+
+class ExtractorIndex():
+    """Index of directories (and the files within them) under one content root, shared by all parsers in a process"""
+    _cache = {}
+
+    def __init__(self, path_root):
+        self.path_root = str(path_root)
+        self.map_dirs = {}    # directory name -> list of directory paths (e.g. all 'yolo3' directories)
+        self.map_files = {}   # directory path -> set of file names
+        self.map_mtime = {}   # directory path -> modification time at indexing
+        for dir_root, list_dirs, list_files in os.walk(self.path_root):
+            self._stat_dir(dir_root, list_files)
+            for dir_name in list_dirs:
+                if dir_name not in self.map_dirs:
+                    self.map_dirs[dir_name] = []
+                self.map_dirs[dir_name].append(Path(dir_root).joinpath(dir_name))
+
+    def _stat_dir(self, dir_path, list_files=None):
+        """Record modification time and files of a single directory (listed if not provided)"""
+        try:
+            self.map_mtime[dir_path] = os.stat(dir_path).st_mtime
+            if list_files is None:   # e.g. linked directories that were not walked
+                list_files = [x.name for x in os.scandir(dir_path) if not x.is_dir()]
+        except OSError:
+            self.map_mtime[dir_path] = None
+            list_files = []
+        self.map_files[dir_path] = set(list_files)
+
+    def is_stale(self):
+        """Check whether any indexed directory was modified (or removed) since indexing"""
+        for dir_path, dir_mtime in self.map_mtime.items():
+            try:
+                if os.stat(dir_path).st_mtime != dir_mtime:
+                    return True
+            except OSError:
+                if dir_mtime is not None:
+                    return True
+        return False
+
+    def dirs(self, extractor_name):
+        """Return all directories matching an extractor name (like ``rglob(extractor_name)`` on the root)"""
+        return list(self.map_dirs.get(extractor_name, []))
+
+    def files(self, dir_path):
+        """Return the set of file names within an indexed directory"""
+        dir_path = str(dir_path)
+        if dir_path not in self.map_files:
+            self._stat_dir(dir_path)
+        return self.map_files[dir_path]
+
+    @classmethod
+    def get(cls, path_root):
+        """Retrieve a cached index for a content root, rebuilding it if directory modification times changed"""
+        key_root = str(Path(path_root).resolve())
+        if key_root not in cls._cache or cls._cache[key_root].is_stale():
+            cls._cache[key_root] = ExtractorIndex(key_root)
+        return cls._cache[key_root]
+
+
+COLUMNS_BOX = ["box_w", "box_h", "box_l", "box_t"]   # same key order as the serialized ``box`` detail
+
+
+def details_split(details):
+    """Split a normalized bounding box (``{'w', 'h', 'l', 't'}`` floats) out of an event's details
+
+    :param details: (dict or str): details object (strings are passed through as already serialized)
+    :return: tuple.  (residual details, (w, h, l, t) or ``None``); the residual is ``None`` if only the box
+        was present, otherwise a new dict with a ``box`` placeholder that keeps the original key order
+    """
+    if details.__class__ is not dict:
+        return details, None
+    box = details.get("box")
+    if box.__class__ is not dict or list(box) != ["w", "h", "l", "t"]:
+        return dict(details), None   # copy, parsers may keep modifying their detail objects
+    box_values = (box["w"], box["h"], box["l"], box["t"])
+    if any(v.__class__ is not float or v != v for v in box_values):   # ints or NaN would not round-trip
+        return dict(details), None
+    if len(details) == 1:
+        return None, box_values
+    return {k: (None if k == "box" else v) for k, v in details.items()}, box_values
+
+
+def details_merge(details, box_w, box_h, box_l, box_t):
+    """Rebuild the full details of an event from its residual details and box columns (inverse of ``details_split``)
+
+    :param details: (dict, str, or None): residual details
+    :param box_w: (float): box width (NaN if the event has no box column values)
+    :return: dict or str.  The details object (strings are passed through); ``None`` if there are no details
+    """
+    if box_w != box_w:   # NaN, no box
+        return details
+    box = {"w": box_w, "h": box_h, "l": box_l, "t": box_t}
+    if details is None:
+        return {"box": box}
+    return {k: (box if k == "box" else v) for k, v in details.items()}
+
+
+def details_serialize(df):
+    """Serialize the structured details of flattened events into JSON strings (e.g. for text outputs)
+
+    :param df: (DataFrame): flattened events, optionally with box columns
+    :return: list.  JSON string (or empty string) for each event
+    """
+    if "details" not in df.columns:
+        return [""] * len(df)
+    list_details = df["details"].tolist()
+    if all(c in df.columns for c in COLUMNS_BOX):
+        list_details = map(details_merge, list_details, *[df[c].tolist() for c in COLUMNS_BOX])
+    return ["" if x is None else (x if x.__class__ is str else json.dumps(x)) for x in list_details]
+
+
+def drop_duplicate_events(df):
+    """Drop repeated events (like ``DataFrame.drop_duplicates``), comparing structured details by their JSON form
+
+    :param df: (DataFrame): flattened events
+    :return: DataFrame.  Events with the first of each duplicate kept
+    """
+    if "details" not in df.columns:
+        return df.drop_duplicates()
+    return df[~df.assign(details=details_serialize(df)).duplicated()]
+
+
+def event_filters(run_options):
+    """Resolve the push-down event filters from run options (missing or empty options keep all events)
+
+    :param run_options: (dict): specific runtime information (``score_min``, ``tag_types``, ``top_k_per_frame``)
+    :return: dict.  ``score_min`` (float or None), ``tag_types`` (set or None), and ``top_k_per_frame`` (int, 0 for all)
+    """
+    if run_options is None:
+        run_options = {}
+    score_min = run_options.get("score_min")
+    tag_types = run_options.get("tag_types")
+    if isinstance(tag_types, str):   # command-line, comma-separated
+        tag_types = [x.strip() for x in tag_types.split(",") if x.strip()]
+    top_k = run_options.get("top_k_per_frame")
+    return {"score_min": None if score_min is None else float(score_min), 
+            "tag_types": set(tag_types) if tag_types else None, "top_k_per_frame": int(top_k) if top_k else 0}
+
+
+class EventBuilder():
+    """Columnar accumulator for flattened events; times and scores are kept in typed arrays and
+    repeated strings are shared, so that millions of rows do not need one dict each"""
+    COLUMNS = ["time_begin", "time_end", "source_event", "tag_type", "time_event", "tag", "score", "details", "extractor"]
+    COLUMNS_FLOAT = ["time_begin", "time_end", "time_event", "score"] + COLUMNS_BOX
+    COLUMNS_FRAME = ["time_begin", "time_end", "source_event", "tag_type"] + COLUMNS_BOX   # events of one frame (or box)
+
+    def __init__(self, run_options=None):
+        """
+        :param run_options: (dict): specific runtime information; events outside of its ``score_min`` or
+            ``tag_types`` are dropped as they are added and ``top_k_per_frame`` is applied when building the DataFrame
+        """
+        self.columns = {k: array.array('d') if k in self.COLUMNS_FLOAT else [] for k in self.COLUMNS + COLUMNS_BOX}
+        self._strings = {}   # shared instances of repeated strings (e.g. tags)
+        filters = event_filters(run_options)
+        self._score_min, self._tag_types, self._top_k = filters["score_min"], filters["tag_types"], filters["top_k_per_frame"]
+
+    def __len__(self):
+        return len(self.columns["time_begin"])
+
+    def append(self, time_begin, time_end, time_event, source_event, tag_type, tag, score, details="", extractor=None):
+        """Append one event (same fields as the flattened columns); ``details`` is a dict (kept structured) or a string"""
+        if self._tag_types is not None and tag_type not in self._tag_types:
+            return
+        if score is None:   # missing values (e.g. unparsed times) are NaN, as in a float column
+            score = math.nan
+        if self._score_min is not None and score < self._score_min:
+            return
+        if time_begin is None:
+            time_begin = math.nan
+        if time_end is None:
+            time_end = math.nan
+        if time_event is None:
+            time_event = math.nan
+        columns = self.columns
+        columns["time_begin"].append(time_begin)
+        columns["time_end"].append(time_end)
+        columns["time_event"].append(time_event)
+        columns["score"].append(score)
+        columns["source_event"].append(source_event)
+        columns["tag_type"].append(tag_type)
+        columns["tag"].append(self._strings.setdefault(tag, tag))
+        details, box_values = details_split(details)
+        columns["details"].append(details)
+        if box_values is None:
+            box_values = (math.nan, math.nan, math.nan, math.nan)
+        columns["box_w"].append(box_values[0])
+        columns["box_h"].append(box_values[1])
+        columns["box_l"].append(box_values[2])
+        columns["box_t"].append(box_values[3])
+        columns["extractor"].append(extractor)
+
+    def extend(self, time_begin, time_end, time_event, source_event, tag_type, tag, score, details="", extractor=None):
+        """Append many events at once; each field is a sequence or a single value shared by all new events"""
+        dict_values = {"time_begin": time_begin, "time_end": time_end, "time_event": time_event, "source_event": source_event,
+                       "tag_type": tag_type, "tag": tag, "score": score, "details": details, "extractor": extractor}
+        num_items = max([len(v) for k, v in dict_values.items() 
+                         if not isinstance(v, (str, dict)) and hasattr(v, "__len__")] or [1])
+        for name_col, value in dict_values.items():   # validate all columns before modifying any
+            if isinstance(value, (str, dict)) or not hasattr(value, "__len__"):
+                dict_values[name_col] = [value] * num_items
+            elif len(value) != num_items:
+                raise ValueError(f"Column '{name_col}' has {len(value)} values, expected {num_items}")
+        if self._tag_types is not None or self._score_min is not None:
+            rows_keep = np.ones(num_items, dtype=bool)
+            if self._tag_types is not None:
+                rows_keep &= np.fromiter((x in self._tag_types for x in dict_values["tag_type"]), dtype=bool, count=num_items)
+            if self._score_min is not None:
+                rows_keep &= ~(np.asarray(dict_values["score"], dtype=np.float64) < self._score_min)   # NaN is kept
+            if not rows_keep.all():
+                idx_keep = np.flatnonzero(rows_keep)
+                dict_values = {k: np.asarray(v, dtype=np.float64)[idx_keep] if k in self.COLUMNS_FLOAT else [v[x] for x in idx_keep]
+                               for k, v in dict_values.items()}
+        for name_col, value in dict_values.items():
+            if name_col in self.COLUMNS_FLOAT:   # ``None`` becomes NaN in the float conversion
+                self.columns[name_col].frombytes(np.ascontiguousarray(value, dtype=np.float64).tobytes())
+            elif name_col == "tag":
+                self.columns[name_col].extend([self._strings.setdefault(x, x) for x in value])
+            elif name_col == "details":
+                list_split = [details_split(x) for x in value]
+                self.columns[name_col].extend([x[0] for x in list_split])
+                for idx_box, name_box in enumerate(COLUMNS_BOX):
+                    self.columns[name_box].extend([math.nan if x[1] is None else x[1][idx_box] for x in list_split])
+            else:
+                self.columns[name_col].extend(value)
+
+    def extend_from(self, other):
+        """Append all events from another builder (e.g. to combine events that were grouped while parsing);
+        the other builder's events were already filtered when they were added there"""
+        for name_col, values in other.columns.items():
+            self.columns[name_col].extend(values)
+
+    def to_dataframe(self, columns=None):
+        """Build the flattened DataFrame, using the typed arrays as column buffers without copying
+
+        :param columns: (list): flattened columns in output order (default ``COLUMNS``), each parser keeps its own
+            order and column set; the box columns follow when ``details`` is included
+        :return: DataFrame.  Events in the requested column order, followed by the box columns
+        """
+        if columns is None:
+            columns = self.COLUMNS
+        if "details" in columns:
+            columns = list(columns) + COLUMNS_BOX
+        dict_columns = {k: np.frombuffer(v, dtype=np.float64) if k in self.COLUMNS_FLOAT else v 
+                        for k, v in self.columns.items() if k in columns}
+        if "details" in dict_columns:
+            dict_columns["details"] = pd.Series(dict_columns["details"], dtype=object)   # not inferred as strings (``None`` for box-only)
+        df = pd.DataFrame(dict_columns, columns=columns, copy=False)
+        if self._top_k and len(df):   # highest scores of each frame, ties kept in order of appearance
+            rank_score = df.groupby([x for x in self.COLUMNS_FRAME if x in columns], sort=False, dropna=False)["score"] \
+                .rank(method="first", ascending=False, na_option="bottom")
+            df = df[(rank_score <= self._top_k).to_numpy()].reset_index(drop=True)
+        return df
+
+
+class KeywordMatcher():
+    """Multi-keyword (Aho-Corasick) matcher; built once, then each text is scanned in a single pass
+    regardless of the number of keywords (e.g. a metadata keyword list against every transcript sentence)"""
+
+    def __init__(self, keywords, ignore_case=True, whole_words=False):
+        """
+        :param keywords: (list): keyword strings, reported by their index in this list
+        :param ignore_case: (bool): compare lowercase keywords and text (default ``True``)
+        :param whole_words: (bool): only report keywords not adjacent to other word characters (default ``False``, substrings)
+        """
+        self.keywords = list(keywords)
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+        self._goto, self._fail, self._output = [{}], [0], [()]   # per state: transitions, failure link, (length, index) hits
+        self._always = []   # empty keywords are part of any text
+        for idx_keyword, keyword in enumerate(self.keywords):
+            if ignore_case:
+                keyword = keyword.lower()
+            if not keyword:
+                self._always.append(idx_keyword)
+                continue
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = self._goto[state][char]
+            self._output[state] += ((len(keyword), idx_keyword),)
+
+        queue = deque(self._goto[0].values())   # breadth-first, so failure links point to resolved (shallower) states
+        while queue:
+            state = queue.popleft()
+            for char, state_next in self._goto[state].items():
+                queue.append(state_next)
+                state_fail = self._fail[state]
+                while state_fail and char not in self._goto[state_fail]:
+                    state_fail = self._fail[state_fail]
+                self._fail[state_next] = self._goto[state_fail].get(char, 0)
+                self._output[state_next] += self._output[self._fail[state_next]]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    @staticmethod
+    def _is_word_char(text, pos):
+        return 0 <= pos < len(text) and (text[pos].isalnum() or text[pos] == "_")
+
+    def search(self, text):
+        """Find all keywords within a text
+
+        :param text: (str): text to scan
+        :return: list.  Sorted indices of the keywords found (each reported once)
+        """
+        if self.ignore_case:
+            text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        set_found = set(self._always)
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for len_keyword, idx_keyword in output[state]:
+                    if not self.whole_words or not (self._is_word_char(text, pos - len_keyword) or self._is_word_char(text, pos + 1)):
+                        set_found.add(idx_keyword)
+        return sorted(set_found)
+
+    def matches(self, text):
+        """Find all keywords within a text
+
+        :param text: (str): text to scan
+        :return: list.  The keywords found, in keyword order
+        """
+        return [self.keywords[x] for x in self.search(text)]
+
+
+RE_TIMECODE = re.compile(r"(\d+):(\d\d):(\d\d)(\.\d+)?$")   # H:MM:SS.fffffff (e.g. Azure insights)
+
+
 class Flatten():
     # https://cloud.google.com/video-intelligence/docs/reference/reast/Shared.Types/Likelihood
     GCP_LIKELIHOOD_MAP = { "LIKELIHOOD_UNSPECIFIED": 0.0, "VERY_UNLIKELY": 0.1, "UNLIKELY": 0.25,
@@ -44,6 +388,7 @@ class Flatten():
     TAG_TRANSCRIPT = "_transcript_"
     ROUND_DIGITS = 5
     SCORE_DEFAULT = 0.5
+    PAGE_WORKERS = 4
 
 
     def __init__(self, path_content, logger=None):
@@ -51,6 +396,7 @@ class Flatten():
         self.extractor_keys = []
         self.extractor_name = None
         self.path_content = path_content
+        self._index = None
         if logger is None:
             logger = logging.getLogger()
             logger = logging.getLogger()
@@ -67,6 +413,60 @@ class Flatten():
         """
         return None
 
+    @staticmethod
+    def gcp_seconds(list_durations):
+        """Convert GCP (protobuf JSON) durations to seconds in one vectorized pass
+
+        :param list_durations: (list): durations like ``"12.5s"``, ``"0s"``, or ``{"seconds": "12", "nanos": 500000000}``
+        :return: numpy.ndarray.  float64 seconds for each duration; raises ``ValueError`` for malformed durations
+        """
+        list_str = [x if x.__class__ is str else Flatten._gcp_duration_str(x) for x in list_durations]
+        if not list_str:
+            return np.zeros(0, dtype=np.float64)
+        with warnings.catch_warnings():   # malformed text stops the parse early (and warns), detected by count
+            warnings.simplefilter("ignore")
+            array_seconds = np.fromstring(" ".join(list_str).replace("s", " "), dtype=np.float64, sep=" ")
+        if len(array_seconds) != len(list_str):
+            raise ValueError(f"Malformed duration in {len(list_str)} values (parsed {len(array_seconds)})")
+        return array_seconds
+
+    @staticmethod
+    @functools.lru_cache(maxsize=2**16)
+    def timecode_seconds(str_time):
+        """Convert an ``H:MM:SS.fffffff`` timecode (e.g. from Azure) to seconds, memoized for repeated boundaries;
+        other time expressions fall back to ``pytimeparse`` (with the same result types: int without a fraction)
+
+        :param str_time: (str): time expression (e.g. ``0:01:02.3``)
+        :return: int or float.  The number of seconds, or ``None`` if not parsable
+        """
+        match = RE_TIMECODE.match(str_time)
+        if match is None:
+            return pt_parse(str_time)
+        str_hours, str_mins, str_secs, str_fraction = match.groups()
+        if str_fraction is None:
+            return int(str_hours) * 3600 + int(str_mins) * 60 + int(str_secs)
+        return 3600 * float(str_hours) + 60 * float(str_mins) + float(str_secs + str_fraction)   # same sum order as pytimeparse
+
+    @staticmethod
+    def timecode_seconds_array(list_times):
+        """Convert a column of timecodes (see ``timecode_seconds``), parsing each distinct value once
+
+        :param list_times: (list): time expressions
+        :return: numpy.ndarray.  float64 seconds for each value (NaN if not parsable)
+        """
+        codes, uniques = pd.factorize(np.asarray(list_times, dtype=object), use_na_sentinel=False)   # None as a value
+        array_unique = np.array([Flatten.timecode_seconds(x) for x in uniques], dtype=np.float64)
+        return array_unique[codes] if len(codes) else np.zeros(0, dtype=np.float64)
+
+    @staticmethod
+    def _gcp_duration_str(duration):
+        """Render a non-string duration (seconds/nanos object or number) as a decimal string"""
+        if isinstance(duration, dict):
+            num_seconds, num_nanos = int(duration.get("seconds", 0)), int(duration.get("nanos", 0))
+            str_sign = "-" if num_seconds < 0 or num_nanos < 0 else ""
+            return f"{str_sign}{abs(num_seconds)}.{abs(num_nanos):09d}"
+        return repr(float(duration))
+
     def json_load(self, path_file):
         """Helper to read dict object from JSON
 
@@ -74,15 +474,9 @@ class Flatten():
         :return: dict.  The loaded dict or an empty dict (`{}`) on error
         """
         if path.exists(path_file):
-            if path_file.endswith(".gz"):
-                infile = gzip.open(path_file, 'rt')
-            else:
-                infile = open(path_file, 'rt')
             try:
-                return json.load(infile)
-            except json.decoder.JSONDecodeError as e:
-                return {}
-            except UnicodeDecodeError as e:
+                return json_backend.loads(json_backend.read_bytes(path_file))
+            except ValueError as e:   # includes decode errors for JSON and unicode
                 return {}
         return {}
 
@@ -93,19 +487,19 @@ class Flatten():
         :return: dict.  The loaded dict or an empty dict (`{}`) on error
         """
         if path.exists(path_file):
-            if path_file.endswith(".gz"):
-                infile = gzip.open(path_file, 'rt')
-            else:
-                infile = open(path_file, 'rt')
             try:
-                return infile.read()
+                return json_backend.read_bytes(path_file).decode('utf-8')
             except UnicodeDecodeError as e:
                 return ""
         return ""
 
     def get_extractor_results(self, extractor_name, path, force_retrieve=False, is_json=True):
         """Get results from remote or local location.  Return a dictionary or string (depending on is_json), empty if not found"""
-        result_data = {} if is_json else ""
+        self.update_extractor_keys(extractor_name, force_retrieve)
+        return self.load_extractor_result(extractor_name, path, is_json)
+
+    def update_extractor_keys(self, extractor_name, force_retrieve=False):
+        """Retrieve (and retain) the available remote keys for an extractor, if not already known"""
         if force_retrieve or (len(self.extractor_keys) < 1 or self.extractor_name != extractor_name):   # safe way to request without 404/500 error
             self.extractor_name = extractor_name
             try:
@@ -115,6 +509,11 @@ class Flatten():
                     self.extractor_keys = []
             except Exception as e:
                 self.logger.info(f"Failed to get extractor keys for extractor {self.extractor_name} (error: '{e}')")
+        return self.extractor_keys
+
+    def load_extractor_result(self, extractor_name, path, is_json=True):
+        """Load a single result from remote (if in known keys) or local location, without refreshing keys"""
+        result_data = {} if is_json else ""
         if self.extractor_keys is not None and path in self.extractor_keys:   # have the keys, check for presence
             try:
                 if is_json:
@@ -127,6 +526,9 @@ class Flatten():
 
         if not result_data:  # do we need to load it locally?
             for dir_search in self.recursive_search(self.path_content, extractor_name):
+                set_files = self.extractor_index(self.path_content).files(dir_search)
+                if path not in set_files and f"{path}.gz" not in set_files and len(Path(path).parts) == 1:
+                    continue   # known miss from the index (e.g. probing for more result pages)
                 path_file = dir_search.joinpath(path)
                 if is_json:
                     result_data = self.json_load(str(path_file))
@@ -138,17 +540,112 @@ class Flatten():
                         result_data = self.text_load(str(path_file)+".gz")
         return result_data
 
+    def get_extractor_items(self, extractor_name, path, item_paths, force_retrieve=False):
+        """Generator over the items of arrays in a (potentially very large) result, decoded incrementally from
+        local files so that the whole document is never materialized; remote results are decoded in full
+
+        :param extractor_name: (str): name of the extractor
+        :param path: (str): result file name (e.g. ``data.json``)
+        :param item_paths: (list): item paths like ``annotationResults[].speechTranscriptions[]`` (see ``json_backend.item_prefix``)
+        :param force_retrieve: (bool): refresh the remote keys for the extractor
+        :return: tuple.  Generator of (item path, item) in document order, empty if not found or not decodable;
+            a decoding error after the first item (e.g. a truncated result) raises ``ValueError``
+        """
+        self.update_extractor_keys(extractor_name, force_retrieve)
+        if self.extractor_keys is not None and path in self.extractor_keys:   # remote result, decode as one object
+            dict_data = self.load_extractor_result(extractor_name, path)
+            yield from json_backend.iter_object_items(dict_data, item_paths)
+            return
+
+        path_file = None
+        for dir_search in self.recursive_search(self.path_content, extractor_name):   # last match wins, as in loading
+            for path_test in [dir_search.joinpath(path), dir_search.joinpath(f"{path}.gz")]:
+                if path_test.exists():
+                    path_file = str(path_test)
+                    break
+        if path_file is None:
+            return
+        num_items = 0
+        try:
+            for item in json_backend.iter_items(path_file, item_paths):
+                num_items += 1
+                yield item
+        except (OSError, EOFError, ValueError) as e:
+            if num_items:   # items were already parsed, a partial result must not be flattened
+                raise ValueError(f"Failed to decode items from '{path_file}' for extractor '{extractor_name}' " \
+                    f"after {num_items} items (error: '{e}')") from e
+            self.logger.warning(f"Failed to decode items from '{path_file}' for extractor '{extractor_name}' (error: '{e}')")
+
+    def get_extractor_shards(self, extractor_name, prefix="result", suffix=".json"):
+        """List the consecutive page shards (e.g. ``result0.json``, ``result1.json``, ...) for an extractor
+
+        :param extractor_name: (str): name of the extractor
+        :param prefix: (str): file name prefix before the page number
+        :param suffix: (str): file name suffix after the page number (a further ``.gz`` is allowed)
+        :return: list.  File names of pages, in order, starting at zero and stopping at the first missing page
+        """
+        re_shard = re.compile(r"^" + re.escape(prefix) + r"([0-9]+)" + re.escape(suffix) + r"(\.gz)?$")
+        set_names = set(self.update_extractor_keys(extractor_name) or [])
+        for dir_search in self.recursive_search(self.path_content, extractor_name):
+            set_names |= self.extractor_index(self.path_content).files(dir_search)
+        set_idx = set()
+        for name_file in set_names:
+            match_shard = re_shard.match(name_file)
+            if match_shard is not None:
+                set_idx.add(int(match_shard.group(1)))
+        list_shards = []
+        while len(list_shards) in set_idx:   # only consecutive pages, like a probe loop
+            list_shards.append(f"{prefix}{len(list_shards)}{suffix}")
+        return list_shards
+
+    def get_extractor_pages(self, extractor_name, prefix="result", suffix=".json", num_workers=None):
+        """Generator to load and decode page shards of an extractor concurrently, yielding them in order
+
+        :param extractor_name: (str): name of the extractor
+        :param prefix: (str): file name prefix before the page number
+        :param suffix: (str): file name suffix after the page number
+        :param num_workers: (int): number of loading threads (default ``PAGE_WORKERS``)
+        :return: tuple.  Generator of (file name, dict) for each page, stopping at the first empty page
+        """
+        list_shards = self.get_extractor_shards(extractor_name, prefix, suffix)
+        num_workers = min(self.PAGE_WORKERS if num_workers is None else num_workers, len(list_shards))
+        if num_workers <= 1:
+            for name_shard in list_shards:
+                dict_data = self.load_extractor_result(extractor_name, name_shard)
+                if not dict_data:
+                    return
+                yield name_shard, dict_data
+            return
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            iter_shards = iter(list_shards)
+            queue_futures = deque([(name_shard, executor.submit(self.load_extractor_result, extractor_name, name_shard))
+                                   for name_shard in islice(iter_shards, num_workers)])
+            while queue_futures:   # keep a bounded number of decoded pages in flight
+                name_done, future_obj = queue_futures.popleft()
+                dict_data = future_obj.result()
+                if not dict_data:
+                    break
+                name_shard = next(iter_shards, None)
+                if name_shard is not None:
+                    queue_futures.append((name_shard, executor.submit(self.load_extractor_result, extractor_name, name_shard)))
+                yield name_done, dict_data
+            for name_done, future_obj in queue_futures:   # stop loading after an empty page
+                future_obj.cancel()
+
 
     def get_extractor_keys(self, extractor_name):
         return contentai.keys(extractor_name)
 
+    def extractor_index(self, path_root):
+        """Get the shared directory index for a content root (validated once per parser instance)"""
+        if self._index is None or self._index[0] != str(path_root):
+            self._index = (str(path_root), ExtractorIndex.get(path_root))
+        return self._index[1]
+
     def recursive_search(self, path_root, extractor_name):
         """Attempt to find a specific extractor directory under the desired path"""
-        list_dirs = []
-        for path_search in Path(path_root).rglob(extractor_name):
-            if path_search.is_dir():
-                list_dirs.append(path_search)
-        return list_dirs
+        return self.extractor_index(path_root).dirs(extractor_name)
 
 # import other modules
 
@@ -191,3 +688,100 @@ def get_by_name(name_limit=None):
 def empty_dataframe():
     return pd.DataFrame([], columns=["time_begin", "time_end", "source_event", "tag_type", 
                                         "time_event", "tag", "score", "details", "extractor"])
+
+# compact in-memory schema for flattened events (see ``compact_dataframe``)
+SCHEMA_CATEGORICAL = ["source_event", "tag_type", "extractor"]   # always low cardinality
+SCHEMA_CATEGORICAL_OPTIONAL = ["tag"]   # categorical only when values repeat often enough
+SCHEMA_FLOAT = ["time_begin", "time_end", "time_event"]
+SCHEMA_SCORE = "score"
+
+def compact_dataframe(df, ratio_unique=0.5):
+    """Coerce flattened events to the compact canonical schema (categorical strings, float32 score when exact)
+
+    :param df: (DataFrame): flattened events (modified in place)
+    :param ratio_unique: (float): maximum ratio of unique to total values for an optional categorical column
+    :return: DataFrame.  The same dataframe, for chaining
+    """
+    for col_name in SCHEMA_FLOAT:   # integer times (e.g. whole seconds) are kept, widening would change their text
+        if col_name in df.columns and df[col_name].dtype != np.float64 and not pd.api.types.is_integer_dtype(df[col_name]):
+            df[col_name] = df[col_name].astype(np.float64)
+    for col_name in SCHEMA_CATEGORICAL + SCHEMA_CATEGORICAL_OPTIONAL:
+        if col_name not in df.columns or isinstance(df[col_name].dtype, pd.CategoricalDtype):
+            continue
+        if col_name in SCHEMA_CATEGORICAL_OPTIONAL and df[col_name].nunique() > len(df) * ratio_unique:
+            continue
+        df[col_name] = df[col_name].astype("category")
+    if SCHEMA_SCORE in df.columns and df[SCHEMA_SCORE].dtype == np.float64:
+        score_compact = df[SCHEMA_SCORE].astype(np.float32)
+        if np.array_equal(score_compact.to_numpy(np.float64), df[SCHEMA_SCORE].to_numpy(), equal_nan=True):
+            df[SCHEMA_SCORE] = score_compact   # only narrow when no precision is lost (e.g. default scores)
+    return df
+
+
+COALESCE_KEYS = ["extractor", "source_event", "tag_type", "tag"]   # detections of one span share these values
+
+def coalesce_events(df, max_gap, score_agg="max"):
+    """Merge consecutive point detections (``time_begin == time_end``, e.g. per-frame tags) of the same extractor,
+    source, tag type, and tag into spans in one vectorized (sort and run-length) pass
+
+    :param df: (DataFrame): flattened events
+    :param max_gap: (float): maximum time in seconds between two detections of the same span
+    :param score_agg: (str): score of a span from its detections, ``max`` or ``mean``
+    :return: DataFrame.  Events with each span in place of its first detection (keeping its ``time_event`` and
+        details) and other events unchanged
+    """
+    if score_agg not in ["max", "mean"]:
+        raise ValueError(f"Unknown score aggregation '{score_agg}' (expected 'max' or 'mean')")
+    idx_point = np.flatnonzero((df["time_begin"] == df["time_end"]).to_numpy())
+    if len(idx_point) == 0:
+        return df
+    df_point = df.iloc[idx_point]
+    list_codes = [pd.factorize(df_point[x])[0] for x in COALESCE_KEYS if x in df.columns]
+    time_point = df_point["time_begin"].to_numpy(dtype=np.float64)
+    order_point = np.lexsort([time_point] + list_codes[::-1])   # by key, then time (stable for simultaneous detections)
+    time_point = time_point[order_point]
+
+    span_start = np.ones(len(order_point), dtype=bool)
+    span_start[1:] = (time_point[1:] - time_point[:-1]) > max_gap
+    for codes in list_codes:
+        codes = codes[order_point]
+        span_start[1:] |= codes[1:] != codes[:-1]
+    idx_first = np.flatnonzero(span_start)
+    span_score = pd.Series(df_point["score"].to_numpy(dtype=np.float64)[order_point]) \
+        .groupby(np.cumsum(span_start) - 1).agg(score_agg).to_numpy()
+
+    idx_span = idx_point[order_point[idx_first]]   # position of each span's first detection
+    rows_keep = np.ones(len(df), dtype=bool)
+    rows_keep[idx_point] = False
+    rows_keep[idx_span] = True
+    time_end = df["time_end"].to_numpy(dtype=np.float64, copy=True)
+    time_end[idx_span] = np.maximum.reduceat(time_point, idx_first)
+    score = df["score"].to_numpy(dtype=np.float64, copy=True)
+    score[idx_span] = span_score
+    return df.assign(time_end=time_end, score=score).iloc[np.flatnonzero(rows_keep)]
+
+
+def decimate_events(df, sample_interval):
+    """Keep at most one event per extractor, source, tag type, tag, and time bucket (``time_begin`` in intervals
+    of ``sample_interval`` seconds), chosen by highest score (NaN lowest, first event on ties), in one sorted pass
+
+    :param df: (DataFrame): flattened events
+    :param sample_interval: (float): bucket size in seconds; must be positive
+    :return: DataFrame.  The kept events in their original order (and index)
+    """
+    if sample_interval <= 0:
+        raise ValueError(f"Sample interval must be positive (got {sample_interval})")
+    if len(df) == 0:
+        return df
+    list_codes = [pd.factorize(df[x])[0] for x in COALESCE_KEYS if x in df.columns]
+    list_codes.append(np.floor(df["time_begin"].to_numpy(dtype=np.float64) / sample_interval))
+    score_order = -df["score"].to_numpy(dtype=np.float64)
+    score_order[np.isnan(score_order)] = np.inf   # missing scores lose to any score
+    order_rows = np.lexsort([np.arange(len(df)), score_order] + list_codes[::-1])   # by key, then best score first
+
+    bucket_start = np.zeros(len(order_rows), dtype=bool)   # first (best) row of each key and bucket
+    bucket_start[0] = True
+    for codes in list_codes:
+        codes = codes[order_rows]
+        bucket_start[1:] |= codes[1:] != codes[:-1]
+    return df.iloc[np.sort(order_rows[bucket_start])]
@@ -19,11 +19,9 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import json
 import re
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -44,23 +42,12 @@ class Parser(Flatten):
         :param: run_options (dict): specific runtime information 
         :returns: (DataFrame): DataFrame on successful decoding and export, None (or exception) otherwise
         """
-        list_items = []
+        events = EventBuilder(run_options)
         re_clean = re.compile(r"((faces*|result|data)|([0-9]+$))+")
         re_split = re.compile(r"_+")
 
-        last_load_idx = 0
         suppressed_matches = 0
-        while last_load_idx >= 0:
-            file_search = f"result{last_load_idx}.json"
-            dict_data = self.get_extractor_results(self.EXTRACTOR, file_search)
-            if not dict_data:  # couldn't load anything else...
-                if list_items:
-                    self.logger.info(f"... suppressed {suppressed_matches} duplicate identities on a timestamp...")
-                    return DataFrame(list_items)
-                else:
-                    last_load_idx = -1
-                    break
-
+        for file_search, dict_data in self.get_extractor_pages(self.EXTRACTOR):  # pages are loaded concurrently, in order
             if run_options["verbose"]:
                 self.logger.info(f"... parsing rekognition_face_collection/{file_search} ")
 
@@ -93,15 +80,20 @@ class Parser(Flatten):
                                 suppressed_matches += 1
                             seen_faces[face_name] = {"time_begin": time_frame, "source_event": "image", 
                                 "time_end": time_frame, "time_event": time_frame, "tag_type": "identity",
-                                "tag": face_name, "score": score_frame, "details": json.dumps(details_obj),
+                                "tag": face_name, "score": score_frame, "details": details_obj,
                                 "extractor": self.EXTRACTOR}
                         else:
                             suppressed_matches += 1
 
                     # finally, append those highest scoring faces
-                    list_items += list(seen_faces.values())
-            last_load_idx += 1
+                    for face_item in seen_faces.values():
+                        events.append(**face_item)
+
+        if events:
+            self.logger.info(f"... suppressed {suppressed_matches} duplicate identities on a timestamp...")
+            return events.to_dataframe(["time_begin", "source_event", "time_end", "time_event", "tag_type", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
-            self.logger.critical(f"No faces found in source 'rekognition_face_collection' ({file_search})")
+            self.logger.critical(f"No faces found in source '{self.EXTRACTOR}'")
         return None
@@ -19,10 +19,8 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import json
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -43,22 +41,12 @@ class Parser(Flatten):
         :param: run_options (dict): specific runtime information 
         :returns: (DataFrame): DataFrame on successful decoding and export, None (or exception) otherwise
         """
-        list_items = []
+        events = EventBuilder(run_options)
         face_feats = {'Smile':'NoSmile', 'Eyeglasses':'NoGlasses', 'Sunglasses':'NoGlasses', 
                       'Gender':None, 'Beard':'NoBeard', 'Mustache':'NoMustache', 
                       'EyesOpen':'EyesClosed', 'MouthOpen':'MouthClosed'} # 'Pose', 'Landmarks', 'Quality']  -- propose we skip these (emz 1/30
         
-        last_load_idx = 0
-        while last_load_idx >= 0:
-            file_search = f"result{last_load_idx}.json"
-            dict_data = self.get_extractor_results(self.EXTRACTOR, file_search)
-            if not dict_data:  # couldn't load anything else...
-                if list_items:
-                    return DataFrame(list_items)
-                else:
-                    last_load_idx = -1
-                    break
-
+        for file_search, dict_data in self.get_extractor_pages(self.EXTRACTOR):  # pages are loaded concurrently, in order
             if run_options["verbose"]:
                 self.logger.info(f"... parsing aws_rekognition_video_faces/{file_search} ")
 
@@ -73,16 +61,16 @@ class Parser(Flatten):
                             'h': round(local_obj['BoundingBox']['Height'], self.ROUND_DIGITS),
                             'l': round(local_obj['BoundingBox']['Left'], self.ROUND_DIGITS), 
                             't': round(local_obj['BoundingBox']['Top'], self.ROUND_DIGITS) }
-                        list_items.append({"time_begin": time_frame, "source_event": "face", 
-                            "time_end": time_frame, "time_event": time_frame, "tag_type": "face",
-                            "tag": "Face", "score": score_frame, "details": json.dumps(details_obj),
-                            "extractor": self.EXTRACTOR})
+                        events.append(time_begin=time_frame, source_event="face", 
+                            time_end=time_frame, time_event=time_frame, tag_type="face",
+                            tag="Face", score=score_frame, details=details_obj,
+                            extractor=self.EXTRACTOR)
                     if "Pose" in local_obj:
                         details_obj['pose'] = local_obj["Pose"]
-                        list_items.append({"time_begin": time_frame, "source_event": "face", 
-                            "time_end": time_frame, "time_event": time_frame, "tag_type": "face",
-                            "tag": "Face", "score": score_frame, "details": json.dumps(details_obj),
-                            "extractor": self.EXTRACTOR})
+                        events.append(time_begin=time_frame, source_event="face", 
+                            time_end=time_frame, time_event=time_frame, tag_type="face",
+                            tag="Face", score=score_frame, details=details_obj,
+                            extractor=self.EXTRACTOR)
 
                     # go through all face features (modified 0.5.4, split face attributes)
                     for f in local_obj:
@@ -101,23 +89,25 @@ class Parser(Flatten):
                             score_feat = self.SCORE_DEFAULT
                             f = "Age"
                         if score_feat is not None:
-                            list_items.append({"time_begin": time_frame, "source_event": "face", 
-                                "time_end": time_frame, "time_event": time_frame, "tag_type": "face",
-                                "tag": f, "score": score_feat, "details": json.dumps(details_obj),
-                                "extractor": self.EXTRACTOR})
+                            events.append(time_begin=time_frame, source_event="face", 
+                                time_end=time_frame, time_event=time_frame, tag_type="face",
+                                tag=f, score=score_feat, details=details_obj,
+                                extractor=self.EXTRACTOR)
 
                     # update 0.5.2 - break out emotion to other tag type
                     if "Emotions" in local_obj and local_obj["Emotions"]:
                         for emo_obj in local_obj["Emotions"]:
                             # if score_emo > 0.05   # consider a threshold?
                             score_emo = round(float(emo_obj["Confidence"])/100, self.ROUND_DIGITS)
-                            list_items.append({"time_begin": time_frame, "source_event": "face", 
-                                "time_end": time_frame, "time_event": time_frame, "tag_type": "emotion",
-                                "tag": emo_obj["Type"].capitalize(), "score": score_emo, 
-                                "details": json.dumps(details_obj), "extractor": self.EXTRACTOR})
+                            events.append(time_begin=time_frame, source_event="face", 
+                                time_end=time_frame, time_event=time_frame, tag_type="emotion",
+                                tag=emo_obj["Type"].capitalize(), score=score_emo, 
+                                details=details_obj, extractor=self.EXTRACTOR)
 
-            last_load_idx += 1
+        if events:
+            return events.to_dataframe(["time_begin", "source_event", "time_end", "time_event", "tag_type", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
-            self.logger.critical(f"No faces found in source 'aws_rekognition_video_faces' ({file_search})")
+            self.logger.critical(f"No faces found in source '{self.EXTRACTOR}'")
         return None
@@ -19,10 +19,8 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import json
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -43,18 +41,8 @@ class Parser(Flatten):
         :param: run_options (dict): specific runtime information
         :returns: (DataFrame): DataFrame on successful decoding and export, None (or exception) otherwise
         """
-        list_items = []
-        last_load_idx = 0
-        while last_load_idx >= 0:
-            file_search = f"result{last_load_idx}.json"
-            dict_data = self.get_extractor_results(self.EXTRACTOR, file_search)
-            if not dict_data:  # couldn't load anything else...
-                if list_items:
-                    return DataFrame(list_items)
-                else:
-                    last_load_idx = -1
-                    break
-
+        events = EventBuilder(run_options)
+        for file_search, dict_data in self.get_extractor_pages(self.EXTRACTOR):  # pages are loaded concurrently, in order
             if run_options["verbose"]:
                 self.logger.info(f"... parsing aws_rekognition_video_labels/{file_search} ")
 
@@ -80,12 +68,15 @@ class Parser(Flatten):
                                 't': round(instance_obj['BoundingBox']['Top'], self.ROUND_DIGITS) }
 
                             score_frame = round(float(instance_obj["Confidence"])/100, self.ROUND_DIGITS)
-                            list_items.append({"time_begin": time_frame, "source_event": "image",  "tag_type": "tag",
-                                "time_end": time_frame, "time_event": time_frame, "tag": local_obj["Name"],
-                                "score": score_frame, "details": json.dumps(details_obj),
-                                "extractor": self.EXTRACTOR})
-            last_load_idx += 1
+                            events.append(time_begin=time_frame, source_event="image",  tag_type="tag",
+                                time_end=time_frame, time_event=time_frame, tag=local_obj["Name"],
+                                score=score_frame, details=details_obj,
+                                extractor=self.EXTRACTOR)
+
+        if events:
+            return events.to_dataframe(["time_begin", "source_event", "tag_type", "time_end", "time_event", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
-            self.logger.critical(f"No moderation enties found in source 'aws_rekognition_video_labels' ({file_search})")
+            self.logger.critical(f"No moderation enties found in source '{self.EXTRACTOR}'")
         return None
@@ -19,10 +19,8 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import json
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -43,19 +41,9 @@ class Parser(Flatten):
         :param: run_options (dict): specific runtime information
         :returns: (DataFrame): DataFrame on successful decoding and export, None (or exception) otherwise
         """
-        list_items = []
+        events = EventBuilder(run_options)
         
-        last_load_idx = 0
-        while last_load_idx >= 0:
-            file_search = f"result{last_load_idx}.json"
-            dict_data = self.get_extractor_results(self.EXTRACTOR, file_search)
-            if not dict_data:  # couldn't load anything else...
-                if list_items:
-                    return DataFrame(list_items)
-                else:
-                    last_load_idx = -1
-                    break
-
+        for file_search, dict_data in self.get_extractor_pages(self.EXTRACTOR):  # pages are loaded concurrently, in order
             if run_options["verbose"]:
                 self.logger.info(f"... parsing aws_rekognition_video_person_tracking/{file_search} ")
 
@@ -79,13 +67,15 @@ class Parser(Flatten):
                                 'l': round(face_obj['BoundingBox']['Left'], self.ROUND_DIGITS), 
                                 't': round(face_obj['BoundingBox']['Top'], self.ROUND_DIGITS) }
 
-                    list_items.append({"time_begin": time_frame, "source_event": "image",
-                        "time_end": time_frame, "time_event": time_frame,  "tag_type": "person",
-                        "tag": person_idx, "score": self.SCORE_DEFAULT, "details": json.dumps(details_obj),
-                        "extractor": self.EXTRACTOR})
+                    events.append(time_begin=time_frame, source_event="image",
+                        time_end=time_frame, time_event=time_frame,  tag_type="person",
+                        tag=person_idx, score=self.SCORE_DEFAULT, details=details_obj,
+                        extractor=self.EXTRACTOR)
 
-            last_load_idx += 1
+        if events:
+            return events.to_dataframe(["time_begin", "source_event", "time_end", "time_event", "tag_type", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
-            self.logger.critical(f"No people found in source 'aws_rekognition_video_person_tracking' ({file_search})")
+            self.logger.critical(f"No people found in source '{self.EXTRACTOR}'")
         return None
@@ -19,13 +19,12 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame, read_csv
+from pandas import read_csv
 from io import StringIO
-import json
 
 from pytimeparse import parse as pt_parse
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -61,7 +60,7 @@ class Parser(Flatten):
         #         "class": "BuildingExplode"
         #     },
 
-        list_items = []
+        events = EventBuilder(run_options)
 
         if dict_data is None or 'results' not in dict_data or 'config' not in dict_data:
             self.logger.critical(f"Missing nested 'results' from source '{self.EXTRACTOR}'")
@@ -78,13 +77,14 @@ class Parser(Flatten):
                     details_obj['audio'] = local_obj['type_audio']
                     if "video" not in details_obj:
                         source_type = 'audio'
-                list_items.append({"time_begin": time_begin, "source_event": source_type, "tag_type": "tag",
-                    "time_end": time_end, "time_event": time_begin, "tag": local_obj["class"],
-                    "score":  local_obj['score'], "details": json.dumps(details_obj),
-                    "extractor": self.EXTRACTOR})
+                events.append(time_begin=time_begin, source_event=source_type, tag_type="tag",
+                    time_end=time_end, time_event=time_begin, tag=local_obj["class"],
+                    score=local_obj['score'], details=details_obj,
+                    extractor=self.EXTRACTOR)
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["time_begin", "source_event", "tag_type", "time_end", "time_event", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"No valid events detected for '{self.EXTRACTOR}'")
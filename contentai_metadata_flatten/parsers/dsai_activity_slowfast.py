@@ -19,13 +19,14 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame, read_csv
+from pandas import read_csv
 from io import StringIO
 import json
+import numpy as np
 
 from pytimeparse import parse as pt_parse
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -77,27 +78,28 @@ class Parser(Flatten):
                 return None
         df_raw[column_timing] = df_raw[column_timing].astype(float)   # convert to better time format
         
-        list_items = []
-        for row_idx, row_data in df_raw.iterrows():
-            base_obj = {"source_event": source_type["type"], "tag_type": "tag", "extractor": self.EXTRACTOR}
-            for col_name in column_timing:  # copy basic timing
-                base_obj[col_name] = row_data[col_name]
-        
-            # iterate through other prefixes
-            idx_prefix = 0
-            while True:
-                label_name = f"{source_type['column_prefix'][0]}{idx_prefix}"
-                score_name = f"{source_type['column_prefix'][1]}{idx_prefix}"
-                if not (label_name in column_clean and score_name in column_clean):  # stop looping
-                    break
-                else:
-                    new_obj = {"score": row_data[score_name], "tag": row_data[label_name]}
-                    new_obj.update(base_obj)
-                    list_items.append(new_obj)
-                idx_prefix += 1
+        # find the label/score column pairs once, then reshape the wide block into one event per (row, pair)
+        list_pairs = []
+        while True:
+            label_name = f"{source_type['column_prefix'][0]}{len(list_pairs)}"
+            score_name = f"{source_type['column_prefix'][1]}{len(list_pairs)}"
+            if not (label_name in column_clean and score_name in column_clean):  # stop looping
+                break
+            list_pairs.append((label_name, score_name))
+
+        events = EventBuilder(run_options)
+        if list_pairs:   # row-major ravel keeps the original order (all pairs of one row, then the next row)
+            num_pairs = len(list_pairs)
+            events.extend(time_begin=np.repeat(df_raw["time_begin"].to_numpy(), num_pairs),
+                          time_end=np.repeat(df_raw["time_end"].to_numpy(), num_pairs),
+                          time_event=np.repeat(df_raw["time_event"].to_numpy(), num_pairs),
+                          score=df_raw[[x[1] for x in list_pairs]].to_numpy(dtype=float).ravel(),
+                          tag=df_raw[[x[0] for x in list_pairs]].to_numpy(dtype=object).ravel().tolist(),
+                          source_event=source_type["type"], tag_type="tag", extractor=self.EXTRACTOR)
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["score", "tag", "source_event", "tag_type", "extractor", "time_begin",
+                                        "time_end", "time_event"])
 
         if run_options["verbose"]:
             self.logger.critical(f"No valid events detected for '{self.EXTRACTOR}'")
@@ -19,12 +19,10 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame
-import json
 
 from pytimeparse import parse as pt_parse
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder, KeywordMatcher
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -37,7 +35,7 @@ class Parser(Flatten):
         """Return the output types for this generator
         :return: list.  List of output types (file types) for this generator
         """
-        return ['keyword', 'identity', 'tag', 'scene', 'topic', 'brand', 'shot', 'transcript']
+        return ['keyword', 'identity', 'tag', 'scene', 'topic', 'brand', 'shot', 'transcript', 'entity']
 
     def parse(self, run_options):
         """Flatten CAE Indexing results
@@ -47,7 +45,7 @@ class Parser(Flatten):
         """
         dict_data = self.get_extractor_results(self.EXTRACTOR, "metadata.json")
 
-        list_items = []
+        events = EventBuilder(run_options)
         list_keywords = []
         if "keywords" in dict_data:  # loop over keywords
             for local_obj in dict_data['keywords']:
@@ -70,6 +68,7 @@ class Parser(Flatten):
                                 key_sentence[sent_id].append(insight_obj)
 
         if "sent" in dict_data:  # loop over transcripts
+            keyword_matcher = KeywordMatcher([x['tag'] for x in list_keywords])
             insight_obj = dict_data["sent"]
             for local_obj in insight_obj:
                 if "text" in local_obj and "start" in local_obj and len(local_obj["text"]) > 0:  # validate object
@@ -79,34 +78,33 @@ class Parser(Flatten):
                     if "ccstart" in local_obj:
                         detail_obj['caption'] = {"time_begin": float(local_obj['ccstart'])/1000}
                         detail_obj['caption']["time_end"] = float(local_obj['ccduration'])/1000 + detail_obj['caption']["time_begin"]
-                    list_items.append( {"time_begin": time_begin, "source_event": "speech", "tag_type": "transcript",
-                        "time_end": time_begin + time_duration, "time_event": time_begin, "tag": Flatten.TAG_TRANSCRIPT,
-                        "score": self.SCORE_DEFAULT_FIXED, "details": json.dumps(detail_obj), "extractor": self.EXTRACTOR})
+                    events.append(time_begin=time_begin, source_event="speech", tag_type="transcript",
+                        time_end=time_begin + time_duration, time_event=time_begin, tag=Flatten.TAG_TRANSCRIPT,
+                        score=self.SCORE_DEFAULT_FIXED, details=detail_obj, extractor=self.EXTRACTOR)
 
                     # process other named entities that indicted this sentence
                     sent_id = int(local_obj["number"])
                     if sent_id in key_sentence:
                         for insight_obj in key_sentence[sent_id]:
-                            list_items.append( {"time_begin": time_begin, "source_event": "speech", "tag_type": insight_obj['tag_type'],
-                                "time_end": time_begin + time_duration, "time_event": time_begin, "tag": insight_obj['tag'],
-                                "score": self.SCORE_DEFAULT, "details": json.dumps(insight_obj['details']), "extractor": self.EXTRACTOR})
+                            events.append(time_begin=time_begin, source_event="speech", tag_type=insight_obj['tag_type'],
+                                time_end=time_begin + time_duration, time_event=time_begin, tag=insight_obj['tag'],
+                                score=self.SCORE_DEFAULT, details=insight_obj['details'], extractor=self.EXTRACTOR)
 
                     # now process quickly for keywords
-                    lower_scan = local_obj["text"].lower()
-                    for insight_obj in list_keywords:
-                        if insight_obj['tag'].lower() in lower_scan:   # just check for presence
-                            list_items.append( {"time_begin": time_begin, "source_event": "speech", "tag_type": insight_obj['tag_type'],
-                                "time_end": time_begin + time_duration, "time_event": time_begin, "tag": insight_obj['tag'],
-                                "score": self.SCORE_DEFAULT, "details": "", "extractor": self.EXTRACTOR})
+                    for idx_keyword in keyword_matcher.search(local_obj["text"]):   # just check for presence
+                        insight_obj = list_keywords[idx_keyword]
+                        events.append(time_begin=time_begin, source_event="speech", tag_type=insight_obj['tag_type'],
+                            time_end=time_begin + time_duration, time_event=time_begin, tag=insight_obj['tag'],
+                            score=self.SCORE_DEFAULT, details="", extractor=self.EXTRACTOR)
 
         if "silence" in dict_data:  # loop over audio
             for local_obj in dict_data['silence']:
                 if "start" in local_obj and "duration" in local_obj:  # validate object
                     time_begin = float(local_obj['start'])/1000
                     time_duration = float(local_obj['duration'])/1000
-                    list_items.append({"time_begin": time_begin, "source_event": "audio", "tag_type": "tag",
-                        "time_end": time_begin + time_duration, "time_event": time_begin, "tag": "silence",
-                        "score": self.SCORE_DEFAULT_FIXED, "details": "", "extractor": self.EXTRACTOR})
+                    events.append(time_begin=time_begin, source_event="audio", tag_type="tag",
+                        time_end=time_begin + time_duration, time_event=time_begin, tag="silence",
+                        score=self.SCORE_DEFAULT_FIXED, details="", extractor=self.EXTRACTOR)
 
         if "audio" in dict_data:  # loop over audio concepts
             if 'regions' in dict_data['audio']:
@@ -115,18 +113,18 @@ class Parser(Flatten):
                         time_begin = float(local_obj['start'])/1000
                         time_duration = float(local_obj['duration'])/1000
                         for score_obj in local_obj['concepts']:
-                            list_items.append({"time_begin": time_begin, "source_event": "audio", "tag_type": "tag",
-                                "time_end": time_begin + time_duration, "time_event": time_begin, "tag": score_obj['name'],
-                                "score": round(float(score_obj['score']), self.ROUND_DIGITS), "details": "", "extractor": self.EXTRACTOR})
+                            events.append(time_begin=time_begin, source_event="audio", tag_type="tag",
+                                time_end=time_begin + time_duration, time_event=time_begin, tag=score_obj['name'],
+                                score=round(float(score_obj['score']), self.ROUND_DIGITS), details="", extractor=self.EXTRACTOR)
 
         if "commercial" in dict_data:  # loop over scenes
             for local_obj in dict_data['commercial']:
                 if "start" in local_obj and "duration" in local_obj:  # validate object
                     time_begin = float(local_obj['start'])/1000
                     time_duration = float(local_obj['duration'])/1000
-                    list_items.append({"time_begin": time_begin, "source_event": "video", "tag_type": "scene",
-                        "time_end": time_begin + time_duration, "time_event": time_begin, "tag": "commercial",
-                        "score": self.SCORE_DEFAULT, "details": "", "extractor": self.EXTRACTOR})
+                    events.append(time_begin=time_begin, source_event="video", tag_type="scene",
+                        time_end=time_begin + time_duration, time_event=time_begin, tag="commercial",
+                        score=self.SCORE_DEFAULT, details="", extractor=self.EXTRACTOR)
 
         for local_type in ['tms', 'iab']:  # loop over TMS and IAB concepts
             if local_type in dict_data and 'regions' in dict_data[local_type]:
@@ -135,9 +133,9 @@ class Parser(Flatten):
                         time_begin = float(local_obj['start'])/1000
                         time_duration = float(local_obj['duration'])/1000
                         for score_obj in local_obj['concepts']:
-                            list_items.append({"time_begin": time_begin, "source_event": "video", "tag_type": "topic",
-                                "time_end": time_begin + time_duration, "time_event": time_begin, "tag": score_obj['name'],
-                                "score": round(float(score_obj['score']), self.ROUND_DIGITS), "details": "", "extractor": self.EXTRACTOR})
+                            events.append(time_begin=time_begin, source_event="video", tag_type="topic",
+                                time_end=time_begin + time_duration, time_event=time_begin, tag=score_obj['name'],
+                                score=round(float(score_obj['score']), self.ROUND_DIGITS), details="", extractor=self.EXTRACTOR)
 
 
         if "mmimg" in dict_data:  # overall validation
@@ -166,10 +164,10 @@ class Parser(Flatten):
                     if 'type' in local_obj:  # udpate 0.7.0, make into an array
                         details_obj['shot_type'] = [local_obj['type']]
                     # first, publish the shot for this image
-                    list_items.append( {"time_begin": img_timing[img_id]['time_begin'], "source_event": "video", "tag_type": "shot",
-                        "time_end": img_timing[img_id]['time_end'], "time_event": img_timing[img_id]['time_begin'], "tag": "shot",
-                        "score": self.SCORE_DEFAULT_FIXED, "details": json.dumps(details_obj),
-                        "extractor": self.EXTRACTOR})
+                    events.append(time_begin=img_timing[img_id]['time_begin'], source_event="video", tag_type="shot",
+                        time_end=img_timing[img_id]['time_end'], time_event=img_timing[img_id]['time_begin'], tag="shot",
+                        score=self.SCORE_DEFAULT_FIXED, details=details_obj,
+                        extractor=self.EXTRACTOR)
                     
                     if "face" in local_obj:  # process faces
                         for insight_obj in local_obj['face']:
@@ -180,18 +178,18 @@ class Parser(Flatten):
                                     'l': round(float(insight_obj['x']) / img_height, self.ROUND_DIGITS), 
                                     't': round(float(insight_obj['y']) / img_height, self.ROUND_DIGITS) }
                             if 'rec' in insight_obj:   # specific identity
-                                list_items.append( {"time_begin": img_timing[img_id]['time_begin'], "source_event": "face", "tag_type": "identity",
-                                    "time_end": img_timing[img_id]['time_end'], "time_event": img_timing[img_id]['time_begin'], 
-                                    "tag": insight_obj['rec']['name'].replace("_", " "),
-                                    "score": float(insight_obj['rec']['confidence']), "details": json.dumps(details_obj),
-                                    "extractor": self.EXTRACTOR})
+                                events.append(time_begin=img_timing[img_id]['time_begin'], source_event="face", tag_type="identity",
+                                    time_end=img_timing[img_id]['time_end'], time_event=img_timing[img_id]['time_begin'], 
+                                    tag=insight_obj['rec']['name'].replace("_", " "),
+                                    score=float(insight_obj['rec']['confidence']), details=details_obj,
+                                    extractor=self.EXTRACTOR)
 
                             if 'cluster' in insight_obj:   # general face cluster
-                                list_items.append( {"time_begin": img_timing[img_id]['time_begin'], "source_event": "face", "tag_type": "identity",
-                                    "time_end": img_timing[img_id]['time_end'], "time_event": img_timing[img_id]['time_begin'], 
-                                    "tag": f"face_cluster_{insight_obj['cluster']['id']}",
-                                    "score": min(self.SCORE_DEFAULT_FIXED, float(insight_obj['cluster']['score'])), "details": json.dumps(details_obj),
-                                    "extractor": self.EXTRACTOR})
+                                events.append(time_begin=img_timing[img_id]['time_begin'], source_event="face", tag_type="identity",
+                                    time_end=img_timing[img_id]['time_end'], time_event=img_timing[img_id]['time_begin'], 
+                                    tag=f"face_cluster_{insight_obj['cluster']['id']}",
+                                    score=min(self.SCORE_DEFAULT_FIXED, float(insight_obj['cluster']['score'])), details=details_obj,
+                                    extractor=self.EXTRACTOR)
                     
                     object_map = {'logo': 'brand', 'object': 'tag'}
                     for local_type in object_map:  # loop over logo and object
@@ -203,25 +201,25 @@ class Parser(Flatten):
                                         'h': round(float(insight_obj['h']) / img_width, self.ROUND_DIGITS),
                                         'l': round(float(insight_obj['x']) / img_height, self.ROUND_DIGITS), 
                                         't': round(float(insight_obj['y']) / img_height, self.ROUND_DIGITS) }
-                                list_items.append( {"time_begin": img_timing[img_id]['time_begin'], "source_event": "image", "tag_type": object_map[local_type],
-                                    "time_end": img_timing[img_id]['time_end'], "time_event": img_timing[img_id]['time_begin'], 
-                                    "tag": insight_obj['name'].replace("_", " "),
-                                    "score": round(min(self.SCORE_DEFAULT_FIXED, float(insight_obj['score'])), self.ROUND_DIGITS), "details": json.dumps(details_obj),
-                                    "extractor": self.EXTRACTOR})
+                                events.append(time_begin=img_timing[img_id]['time_begin'], source_event="image", tag_type=object_map[local_type],
+                                    time_end=img_timing[img_id]['time_end'], time_event=img_timing[img_id]['time_begin'], 
+                                    tag=insight_obj['name'].replace("_", " "),
+                                    score=round(min(self.SCORE_DEFAULT_FIXED, float(insight_obj['score'])), self.ROUND_DIGITS), details=details_obj,
+                                    extractor=self.EXTRACTOR)
 
                     if 'concept' in local_obj:   # process concepts
                         for insight_obj in local_obj['concept']:
-                            list_items.append({"time_begin": img_timing[img_id]['time_begin'], "source_event": "image", "tag_type": "tag",
-                                "time_end": img_timing[img_id]['time_end'], "time_event": img_timing[img_id]['time_begin'], 
-                                "tag": insight_obj['name'], "score": round(float(insight_obj['score']), self.ROUND_DIGITS), "details": "", "extractor": self.EXTRACTOR})
+                            events.append(time_begin=img_timing[img_id]['time_begin'], source_event="image", tag_type="tag",
+                                time_end=img_timing[img_id]['time_end'], time_event=img_timing[img_id]['time_begin'], 
+                                tag=insight_obj['name'], score=round(float(insight_obj['score']), self.ROUND_DIGITS), details="", extractor=self.EXTRACTOR)
 
                     if 'kfcluster' in local_obj and len(local_obj['kfcluster']):   # process kfcluster (duplicate frames)
                         details_obj = local_obj['kfcluster']
                         # TODO: investigate whether kfcluster score is a distance or a similarity; this code assumes distance!
-                        list_items.append({"time_begin": img_timing[img_id]['time_begin'], "source_event": "image", "tag_type": "scene",
-                            "time_end": img_timing[img_id]['time_end'], "time_event": img_timing[img_id]['time_begin'], 
-                            "tag": "duplicate", "score": 1 - round(float(local_obj['kfcluster']['score']) / kfcluster_max, self.ROUND_DIGITS), 
-                            "details": json.dumps(details_obj), "extractor": self.EXTRACTOR})
+                        events.append(time_begin=img_timing[img_id]['time_begin'], source_event="image", tag_type="scene",
+                            time_end=img_timing[img_id]['time_end'], time_event=img_timing[img_id]['time_begin'], 
+                            tag="duplicate", score=1 - round(float(local_obj['kfcluster']['score']) / kfcluster_max, self.ROUND_DIGITS), 
+                            details=details_obj, extractor=self.EXTRACTOR)
 
         if "mmpara" in dict_data:  # loop over paragraph segments to make scenes (from speech)
             for local_obj in dict_data['mmpara']:
@@ -231,17 +229,18 @@ class Parser(Flatten):
                     details_obj = {}
                     if "sentstart" in local_obj and "sentend" in local_obj:  # retain number of sentences
                         details_obj = {'sentences': int(local_obj["sentend"]) - int(local_obj["sentstart"]) + 1}
-                    list_items.append({"time_begin": time_begin, "source_event": "speech", "tag_type": "scene",
-                        "time_end": time_begin + time_duration, "time_event": time_begin, "tag": "story",
-                        "score": self.SCORE_DEFAULT, "details": json.dumps(details_obj), "extractor": self.EXTRACTOR})
+                    events.append(time_begin=time_begin, source_event="speech", tag_type="scene",
+                        time_end=time_begin + time_duration, time_event=time_begin, tag="story",
+                        score=self.SCORE_DEFAULT, details=details_obj, extractor=self.EXTRACTOR)
 
 
         # TODO: additional parsing for these data
         # viewers  --> ??
         # segments  --> scenes?
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["time_begin", "source_event", "tag_type", "time_end", "time_event", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested sections from source '{self.EXTRACTOR}'")
@@ -19,10 +19,8 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame
-import json
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder, event_filters
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -73,7 +71,8 @@ class Parser(Flatten):
         #             "extractor": "azure_videoindexer"
         #         },
 
-        list_items = []
+        events = EventBuilder(run_options)
+        score_min = event_filters(run_options)["score_min"]   # an explicit minimum replaces the default threshold
 
         if dict_data is None or 'results' not in dict_data or 'config' not in dict_data:
             self.logger.critical(f"Missing nested 'results' from source '{self.EXTRACTOR}'")
@@ -84,13 +83,14 @@ class Parser(Flatten):
                 time_end = float(local_obj['end'])
                 for score_name in local_obj['scores']:
                     local_score = local_obj['scores'][score_name]
-                    if local_score > self.SCORE_THRESHOLD:
-                        list_items.append({"time_begin": time_begin, "source_event": local_obj["source"], "tag_type": "moderation",
-                            "time_end": time_end, "time_event": time_begin, "tag": score_name, "score": local_score, 
-                            "details": json.dumps({"extractor_source": local_obj["extractor"]}), "extractor": self.EXTRACTOR})
+                    if score_min is not None or local_score > self.SCORE_THRESHOLD:
+                        events.append(time_begin=time_begin, source_event=local_obj["source"], tag_type="moderation",
+                            time_end=time_end, time_event=time_begin, tag=score_name, score=local_score, 
+                            details={"extractor_source": local_obj["extractor"]}, extractor=self.EXTRACTOR)
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["time_begin", "source_event", "tag_type", "time_end", "time_event", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"No valid events detected for '{self.EXTRACTOR}'")
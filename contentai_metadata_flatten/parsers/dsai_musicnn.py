@@ -19,12 +19,10 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame
-import json
 
 from pytimeparse import parse as pt_parse
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -56,7 +54,7 @@ class Parser(Flatten):
                 self.logger.critical(f"Missing timing array for extractor '{self.EXTRACTOR}', aborting")
             return None
 
-        list_items = []
+        events = EventBuilder(run_options)
         for type_classifier in dict_data:
             if type_classifier != "timing" and type(dict_data[type_classifier]) == list:   # not timing, is list
                 for local_obj in dict_data[type_classifier]:   # iterate through all objects
@@ -64,14 +62,17 @@ class Parser(Flatten):
                         timing_obj = list_timing[local_obj['id']]  # deref for timing object
                         for tag_name in local_obj:
                             if tag_name != 'id':
-                                new_obj = {"source_event": "audio", "tag_type": "tag", "tag": tag_name,
-                                            "score": local_obj[tag_name], "details": json.dumps({"model": type_classifier}), 
-                                            "extractor": self.EXTRACTOR}
-                                new_obj.update(timing_obj)
-                                list_items.append(new_obj)     
+                                events.append(source_event="audio", tag_type="tag", tag=tag_name,
+                                              score=local_obj[tag_name], details={"model": type_classifier}, 
+                                              extractor=self.EXTRACTOR, **timing_obj)
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            df = events.to_dataframe(["source_event", "tag_type", "tag", "score", "details", "extractor",
+                                      "time_begin", "time_event", "time_end"])
+            for col_time in ["time_begin", "time_event", "time_end"]:   # whole-second timing stays integer, as in the source
+                if all(type(x[col_time]) == int for x in list_timing.values()):
+                    df[col_time] = df[col_time].astype(int)
+            return df
 
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested sections from source '{self.EXTRACTOR}'")
@@ -19,7 +19,7 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame, read_csv
+from pandas import read_csv
 import json
 
 from pytimeparse import parse as pt_parse
@@ -27,7 +27,7 @@ from pytimeparse import parse as pt_parse
 # NOTE: we reuse the parser (also CSV source) for this type as well
 from contentai_metadata_flatten.parsers.dsai_activity_slowfast import Parser as ParserBase
 # NOTE: non-CSV parser (JSON) will use core flattener
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class ParserLegacy(ParserBase):
     def __init__(self, path_content, logger=None):
@@ -88,7 +88,7 @@ class Parser(Flatten):
         #             }
         #         },
 
-        list_items = []
+        events = EventBuilder(run_options)
 
         if dict_data is None or 'results' not in dict_data or 'config' not in dict_data:
             self.logger.critical(f"Missing nested 'results' from source '{self.EXTRACTOR}'")
@@ -101,12 +101,13 @@ class Parser(Flatten):
                 time_event = float(local_obj['time_event'])
                 for score_original in score_obj:
                     local_score = float(score_obj[score_original])
-                    list_items.append({"time_begin": time_event, "source_event": "image", "tag_type": "tag",
-                        "time_end": time_event, "time_event": time_event, "tag": score_original,
-                        "score": local_score, "details": "", "extractor": self.EXTRACTOR})
+                    events.append(time_begin=time_event, source_event="image", tag_type="tag",
+                        time_end=time_event, time_event=time_event, tag=score_original,
+                        score=local_score, details="", extractor=self.EXTRACTOR)
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["time_begin", "source_event", "tag_type", "time_end", "time_event", "tag",
+                                        "score", "details", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"No valid events detected for '{self.EXTRACTOR}'")
@@ -19,12 +19,10 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame
-import json
 
 from pytimeparse import parse as pt_parse
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -55,7 +53,7 @@ class Parser(Flatten):
                 self.logger.critical(f"Missing timing array for extractor '{self.EXTRACTOR}', aborting")
             return None
 
-        list_items = []
+        events = EventBuilder(run_options)
         if "annotations" in dict_data and len(dict_data["annotations"]):  # validate known format 
             for local_obj in dict_data['annotations']:
                 if "annotator" in local_obj and local_obj["annotator"]["name"] == "sceneboundary":
@@ -71,14 +69,16 @@ class Parser(Flatten):
                             self.logger.critical(f"Missing timing array for extractor '{self.EXTRACTOR}', aborting")
                             return None
 
-                        list_items.append( {"time_begin": list_timing[insight_obj["shots"][0]]["time_begin"], 
-                            "time_end": list_timing[insight_obj["shots"][-1]]["time_end"], 
-                            "source_event": "video", "tag_type": "scene", "tag": "scene",
-                            "score": insight_obj["score"], "details": json.dumps(detail_local),
-                            "extractor": self.EXTRACTOR})
+                        events.append(time_begin=list_timing[insight_obj["shots"][0]]["time_begin"], 
+                            time_end=list_timing[insight_obj["shots"][-1]]["time_end"], 
+                            time_event=list_timing[insight_obj["shots"][0]]["time_begin"], 
+                            source_event="video", tag_type="scene", tag="scene",
+                            score=insight_obj["score"], details=detail_local,
+                            extractor=self.EXTRACTOR)
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["time_begin", "time_end", "source_event", "tag_type", "tag", "score",
+                                        "details", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested sections from source '{self.EXTRACTOR}'")
@@ -19,10 +19,8 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame
-import re
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -56,23 +54,26 @@ class Parser(Flatten):
                 self.logger.critical(f"Missing nested 'annotationResults' from source 'gcp_videointelligence_explicit_content'")
             return None
 
-        re_time_clean = re.compile(r"s$")
         for annotation_obj in dict_data["annotationResults"]:  # traverse items
             if "explicitAnnotation" in annotation_obj:  # validate object
                 if "frames" not in annotation_obj["explicitAnnotation"]:  # validate object
                     self.logger.critical(f"Missing nested 'frames' in shot chunk '{annotation_obj['explicitAnnotation']}'")
                     return None
-                list_items = []
+                list_time, list_tag, list_score = [], [], []   # raw offsets, converted in one pass
                 for frame_item in annotation_obj["explicitAnnotation"]["frames"]:
                     if "timeOffset" in frame_item:
-                        time_clean = float(re_time_clean.sub('', frame_item["timeOffset"]))
                         dict_scores = {n:n.split("Likelihood")[0] for n in frame_item.keys() if not n.startswith("time") }
                         for n in dict_scores:  # a little bit of a dance, but flexiblity for future explicit types
-                            list_items.append( {"time_begin": time_clean, "source_event": "image",  "tag_type": "moderation",
-                                "time_end": time_clean, "time_event": time_clean, "tag": dict_scores[n],                   
-                                "score": Flatten.GCP_LIKELIHOOD_MAP[frame_item[n]], "details": "",
-                                "extractor": self.EXTRACTOR})
-                return DataFrame(list_items)
+                            list_time.append(frame_item["timeOffset"])
+                            list_tag.append(dict_scores[n])
+                            list_score.append(Flatten.GCP_LIKELIHOOD_MAP[frame_item[n]])
+                time_clean = self.gcp_seconds(list_time)
+                events = EventBuilder(run_options)
+                events.extend(time_begin=time_clean, source_event="image",  tag_type="moderation",
+                    time_end=time_clean, time_event=time_clean, tag=list_tag, score=list_score, details="",
+                    extractor=self.EXTRACTOR)
+                return events.to_dataframe(["time_begin", "source_event", "tag_type", "time_end", "time_event", "tag",
+                                            "score", "details", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested 'explicitAnnotation' from source 'gcp_videointelligence_explicit_content'")
@@ -20,10 +20,8 @@
 
 from os import path
 import json
-import re
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -45,13 +43,6 @@ class Parser(Flatten):
         :returns: (DataFrame): DataFrame on successful decoding and export, None (or exception) otherwise
         """
 
-        # read data.json
-        dict_data = self.get_extractor_results(self.EXTRACTOR, "data.json")
-        if "annotationResults" not in dict_data:
-            if run_options["verbose"]:
-                self.logger.critical(f"Missing nested 'annotationResults' from source 'gcp_videointelligence_label'")
-            return None
-
         # return details from a local entity
         def extract_entities(entity_item, as_str=True):
             details_obj = {}
@@ -72,35 +63,34 @@ class Parser(Flatten):
                 return tag_name, json.dumps(details_obj)
             return tag_name, details_obj
 
-        re_time_clean = re.compile(r"s$")
-        list_items = []
-        for annotation_obj in dict_data["annotationResults"]:  # traverse items
+        # stream segments (video) and shots (image) from data.json, without decoding the whole document
+        map_source = {"annotationResults[].segmentLabelAnnotations[]": "video",
+                      "annotationResults[].shotLabelAnnotations[]": "image"}
+        map_items = {x: {"time_begin": [], "time_end": [], "score": [], "tag": [], "details": []} for x in map_source}
+        for item_path, segment_item in self.get_extractor_items(self.EXTRACTOR, "data.json", list(map_source.keys())):
             # "segments": [{ "segment": { "startTimeOffset": "0s", "endTimeOffset": "13189.109266s" }, 
             #               "confidence": 0.5998325347900391 }
-            if "segmentLabelAnnotations" in annotation_obj:  # validate object
-                for segment_item in annotation_obj["segmentLabelAnnotations"]:   # segments
-                    tag_name, str_json = extract_entities(segment_item, True)
-                    if "segments" in segment_item:   # parsing segments
-                        for local_seg in segment_item["segments"]:
-                            list_items.append({"source_event": "video", "score": float(local_seg["confidence"]),
-                                "time_begin": float(re_time_clean.sub('', local_seg["segment"]["startTimeOffset"])),
-                                "time_end": float(re_time_clean.sub('', local_seg["segment"]["endTimeOffset"])),
-                                "time_event": float(re_time_clean.sub('', local_seg["segment"]["startTimeOffset"])),
-                                "details": str_json, "extractor": self.EXTRACTOR, "tag_type": "tag",
-                                "tag": tag_name})
-            if "shotLabelAnnotations" in annotation_obj:  # validate object
-                for segment_item in annotation_obj["shotLabelAnnotations"]:  # shots
-                    tag_name, str_json = extract_entities(segment_item, True)
-                    if "segments" in segment_item:  # parsing segments
-                        for local_seg in segment_item["segments"]:
-                            list_items.append({"source_event": "image", "score": float(local_seg["confidence"]),
-                                "time_begin": float(re_time_clean.sub('', local_seg["segment"]["startTimeOffset"])),
-                                "time_end": float(re_time_clean.sub('', local_seg["segment"]["endTimeOffset"])),
-                                "time_event": float(re_time_clean.sub('', local_seg["segment"]["startTimeOffset"])),
-                                "details": str_json, "extractor": self.EXTRACTOR, "tag_type": "tag",
-                                "tag": tag_name})
-            # convert list to a dataframe
-            return DataFrame(list_items)
+            tag_name, details_obj = extract_entities(segment_item, False)
+            if "segments" in segment_item:   # parsing segments, raw offsets are converted in one pass
+                dict_columns = map_items[item_path]
+                for local_seg in segment_item["segments"]:
+                    dict_columns["time_begin"].append(local_seg["segment"]["startTimeOffset"])
+                    dict_columns["time_end"].append(local_seg["segment"]["endTimeOffset"])
+                    dict_columns["score"].append(float(local_seg["confidence"]))
+                    dict_columns["tag"].append(tag_name)
+                    dict_columns["details"].append(details_obj)
+
+        events = EventBuilder(run_options)
+        for item_path in map_source:   # segments before shots
+            dict_columns = map_items[item_path]
+            time_begin = self.gcp_seconds(dict_columns["time_begin"])
+            events.extend(source_event=map_source[item_path], score=dict_columns["score"],
+                time_begin=time_begin, time_end=self.gcp_seconds(dict_columns["time_end"]), time_event=time_begin,
+                details=dict_columns["details"], extractor=self.EXTRACTOR, tag_type="tag",
+                tag=dict_columns["tag"])
+        if events:   # convert to a dataframe
+            return events.to_dataframe(["source_event", "score", "time_begin", "time_end", "time_event", "details",
+                                        "extractor", "tag_type", "tag"])
 
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested knowns 'segmentLabelAnnotations' and 'shotLabelAnnotations' from source 'gcp_videointelligence_label'")
@@ -19,12 +19,9 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import re
-import json
 import math
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -56,11 +53,10 @@ class Parser(Flatten):
                 self.logger.critical(f"Missing nested 'annotationResults' from source 'gcp_videointelligence_logo_recognition'")
             return None
 
-        re_time_clean = re.compile(r"s$")
         for annotation_obj in dict_data["annotationResults"]:  # traverse items
             if "logoRecognitionAnnotations" in annotation_obj:  # validate object
-                list_items = []
-                for logo_item in annotation_obj["logoRecognitionAnnotations"]:
+                dict_columns = {"time_begin": [], "time_end": [], "time_event": [], "tag": [], "score": [], "details": []}
+                for logo_item in annotation_obj["logoRecognitionAnnotations"]:   # raw offsets, converted in one pass
                     details_obj = {}
                     if "entity" not in logo_item:
                         self.logger.critical(f"Missing nested 'entity' in logo chunk '{logo_item}'")
@@ -85,13 +81,21 @@ class Parser(Flatten):
                                     local_box['h'] -= local_box['t']
                                     details_obj['box'].append(local_box)
                             if "confidence" in track_item:
-                                list_items.append( {"time_begin": float(re_time_clean.sub('', track_item["segment"]["startTimeOffset"])), 
-                                    "time_end": float(re_time_clean.sub('', track_item["segment"]["endTimeOffset"])), 
-                                    "time_event": float(re_time_clean.sub('', timestamped_item["timeOffset"])), 
-                                    "source_event": "video", "tag": logo_item["entity"]["description"], "tag_type": "brand",
-                                    "score": round(track_item["confidence"], self.ROUND_DIGITS), "details": json.dumps(details_obj), 
-                                    "extractor": self.EXTRACTOR})
-                return DataFrame(list_items)
+                                dict_columns["time_begin"].append(track_item["segment"]["startTimeOffset"])
+                                dict_columns["time_end"].append(track_item["segment"]["endTimeOffset"])
+                                dict_columns["time_event"].append(timestamped_item["timeOffset"])
+                                dict_columns["tag"].append(logo_item["entity"]["description"])
+                                dict_columns["score"].append(round(track_item["confidence"], self.ROUND_DIGITS))
+                                dict_columns["details"].append(dict(details_obj))
+                events = EventBuilder(run_options)
+                events.extend(time_begin=self.gcp_seconds(dict_columns["time_begin"]), 
+                    time_end=self.gcp_seconds(dict_columns["time_end"]), 
+                    time_event=self.gcp_seconds(dict_columns["time_event"]), 
+                    source_event="video", tag=dict_columns["tag"], tag_type="brand",
+                    score=dict_columns["score"], details=dict_columns["details"], 
+                    extractor=self.EXTRACTOR)
+                return events.to_dataframe(["time_begin", "time_end", "time_event", "source_event", "tag", "tag_type",
+                                            "score", "details", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested 'logoRecognitionAnnotations' from source 'gcp_videointelligence_logo_recognition'")
@@ -19,10 +19,8 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import re
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 
 class Parser(Flatten):
@@ -55,20 +53,22 @@ class Parser(Flatten):
                 self.logger.critical(f"Missing nested 'annotationResults' from source 'gcp_videointelligence_shot_change'")
             return None
 
-        re_time_clean = re.compile(r"s$")
         for annotation_obj in dict_data["annotationResults"]:  # traverse items
             if "shotAnnotations" in annotation_obj:  # validate object
-                list_items = []
+                list_begin, list_end = [], []   # raw offsets, converted in one pass
                 for shot_item in annotation_obj["shotAnnotations"]:
                     if "startTimeOffset" not in shot_item:
                         self.logger.critical(f"Missing nested 'startTimeOffset' in shot chunk '{shot_item}'")
                         return None
-                    list_items.append( {"time_begin": float(re_time_clean.sub('', shot_item["startTimeOffset"])), 
-                        "time_end": float(re_time_clean.sub('', shot_item["endTimeOffset"])), 
-                        "time_event": float(re_time_clean.sub('', shot_item["startTimeOffset"])), 
-                        "source_event": "video", "tag": "shot", "score": self.SCORE_DEFAULT, "details": "", "tag_type": "shot",
-                        "extractor": self.EXTRACTOR})
-                return DataFrame(list_items)
+                    list_begin.append(shot_item["startTimeOffset"])
+                    list_end.append(shot_item["endTimeOffset"])
+                time_begin = self.gcp_seconds(list_begin)
+                events = EventBuilder(run_options)
+                events.extend(time_begin=time_begin, time_end=self.gcp_seconds(list_end), time_event=time_begin, 
+                    source_event="video", tag="shot", score=self.SCORE_DEFAULT, details="", tag_type="shot",
+                    extractor=self.EXTRACTOR)
+                return events.to_dataframe(["time_begin", "time_end", "time_event", "source_event", "tag", "score",
+                                            "details", "tag_type", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested 'shotAnnotations' from source 'gcp_videointelligence_shot_change'")
@@ -19,11 +19,28 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import re
-import json
+import numpy as np
 from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
+
+
+def segment_sums(values, idx_first):
+    """Sum consecutive segments of an array in sequential order (like a running ``+=``), vectorized across segments
+
+    :param values: (numpy.ndarray): values to sum
+    :param idx_first: (numpy.ndarray): sorted index of the first value of each segment (starting at 0)
+    :return: numpy.ndarray.  Sum for each segment
+    """
+    len_segments = np.diff(np.append(idx_first, len(values)))
+    order_len = np.argsort(-len_segments, kind="stable")   # longest first, so active segments are a prefix
+    len_sorted = len_segments[order_len]
+    sums = values[idx_first].astype(float)
+    for idx_offset in range(1, int(len_sorted[0]) if len(len_sorted) else 0):
+        idx_active = order_len[:np.searchsorted(-len_sorted, -idx_offset, side="left")]
+        sums[idx_active] += values[idx_first[idx_active] + idx_offset]
+    return sums
+
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -35,7 +52,7 @@ class Parser(Flatten):
         """Return the output types for this generator
         :return: list.  List of output types (file types) for this generator
         """
-        return ['keyword', 'transcript', 'identity']
+        return ['keyword', 'transcript', 'identity', 'word']
 
     def parse(self, run_options):
         """Flatten GCP Speech Recognition 
@@ -48,85 +65,107 @@ class Parser(Flatten):
         #   "annotationResults": [ {  "speechTranscriptions": [ {
         #       "alternatives": [ { "transcript": "Play Super Bowl 50 for here tonight. ", "confidence": 0.8140063881874084,
         #       "words": [ { "startTime": "0s", "endTime": "0.400s", "word": "Play", "confidence": 0.9128385782241821 },
-        dict_data = self.get_extractor_results(self.EXTRACTOR, "data.json")
-        if "annotationResults" not in dict_data:
-            if run_options["verbose"]:
-                self.logger.critical(f"Missing nested 'annotationResults' from source 'gcp_videointelligence_speech_transcription'")
+        # stream each transcription chunk from data.json, without decoding the whole document; word timing
+        # offsets are collected for all chunks and converted in one pass
+        list_alts = []   # (alternative without words, index of first word, index after last word)
+        word_columns = {"startTime": [], "endTime": [], "word": [], "confidence": [], "speakerTag": []}
+        for _, speech_obj in self.get_extractor_items(self.EXTRACTOR, "data.json", ["annotationResults[].speechTranscriptions[]"]):
+            if "alternatives" not in speech_obj:
+                self.logger.critical(f"Missing nested 'alternatives' in speechTranscriptions chunk '{speech_obj}'")
+                return None
+            for alt_obj in speech_obj["alternatives"]:   # walk through speech parts
+                idx_start = len(word_columns["word"])
+                for word_obj in alt_obj.get("words", []):
+                    # {  "startTime": "0.400s",  "endTime": "0.700s",  "word": "Super", "confidence": 0.9128385782241821 }
+                    word_columns["startTime"].append(word_obj["startTime"])
+                    word_columns["endTime"].append(word_obj["endTime"])
+                    word_columns["word"].append(word_obj["word"])
+                    word_columns["confidence"].append(float(word_obj["confidence"]))
+                    word_columns["speakerTag"].append(word_obj.get("speakerTag"))
+                list_alts.append(({k: v for k, v in alt_obj.items() if k != "words"}, idx_start, len(word_columns["word"])))
+
+        # every word belongs to one alternative; events are ordered by (word index, rank) as if emitted while walking words
+        list_alts = [x for x in list_alts if x[2] > x[1]]
+        if list_alts:
+            time_begin = self.gcp_seconds(word_columns["startTime"])
+            time_end = self.gcp_seconds(word_columns["endTime"])
+            word_confidence = np.array(word_columns["confidence"], dtype=float)
+            alt_first = np.array([x[1] for x in list_alts], dtype=np.int64)
+            alt_last = np.array([x[2] for x in list_alts], dtype=np.int64) - 1
+            word_alt = np.repeat(np.arange(len(list_alts)), alt_last - alt_first + 1)
+            list_order = [np.arange(len(time_begin))]
+            list_rank = [np.zeros(len(time_begin), dtype=np.int64)]
+            list_transcript = [np.zeros(len(time_begin), dtype=np.int64)]   # code of each distinct transcript detail
+            dict_events = {"time_begin": [time_begin], "time_end": [time_end], "score": [word_confidence],
+                           "tag_type": ["word"] * len(time_begin), "tag": word_columns["word"], "details": [""] * len(time_begin)}
+
+            # { ... "confidence": 0.9128385782241821,  "speakerTag": 3 } ...  (added 0.8.6)
+            # speaker turns are runs of words with a speaker (others are skipped), split by a new speaker,
+            # a gap after the last word of the turn, or a new alternative; a turn is emitted after the word that closes it
+            speaker_tag = np.array(word_columns["speakerTag"], dtype=object)
+            idx_speaker = np.flatnonzero(speaker_tag != None)
+            if len(idx_speaker):
+                speaker_alt = word_alt[idx_speaker]
+                turn_start = np.ones(len(idx_speaker), dtype=bool)
+                turn_start[1:] = (speaker_alt[1:] != speaker_alt[:-1]) \
+                    | (speaker_tag[idx_speaker[1:]] != speaker_tag[idx_speaker[:-1]]) \
+                    | (time_begin[idx_speaker[1:]] != time_end[idx_speaker[:-1]])
+                turn_first = np.flatnonzero(turn_start)
+                turn_last = np.append(turn_first[1:], len(idx_speaker)) - 1
+                turn_alt = speaker_alt[turn_first]
+                turn_closed = np.append(turn_alt[1:] == turn_alt[:-1], False)   # closed by the next turn, not the alternative
+                turn_score = segment_sums(word_confidence[idx_speaker], turn_first) / (turn_last - turn_first + 1)
+                list_order.append(np.where(turn_closed, idx_speaker[np.append(turn_first[1:], 0)], alt_last[turn_alt]))
+                list_rank.append(np.where(turn_closed, 1, 2))
+                list_transcript.append(np.zeros(len(turn_first), dtype=np.int64))
+                dict_events["time_begin"].append(time_begin[idx_speaker[turn_first]])
+                dict_events["time_end"].append(time_end[idx_speaker[turn_last]])
+                dict_events["score"].append(np.array([round(x, self.ROUND_DIGITS) for x in turn_score.tolist()]))
+                dict_events["tag_type"] += ["identity"] * len(turn_first)
+                dict_events["tag"] += [f"speaker_{x}" for x in speaker_tag[idx_speaker[turn_first]]]
+                dict_events["details"] += [""] * len(turn_first)
+
+            # generate top-level transcript item, after going through all words
+            idx_transcript = np.array([idx_alt for idx_alt, x in enumerate(list_alts) if "transcript" in x[0]], dtype=np.int64)
+            if len(idx_transcript):
+                list_order.append(alt_last[idx_transcript])
+                list_rank.append(np.full(len(idx_transcript), 3))
+                dict_events["time_begin"].append(np.fmin(np.fmin.reduceat(time_begin, alt_first)[idx_transcript], 1e200))
+                dict_events["time_end"].append(np.fmax(np.fmax.reduceat(time_end, alt_first)[idx_transcript], 0))
+                dict_events["score"].append(np.array([float(list_alts[x][0]["confidence"]) for x in idx_transcript]))
+                dict_events["tag_type"] += ["transcript"] * len(idx_transcript)
+                dict_events["tag"] += [Flatten.TAG_TRANSCRIPT] * len(idx_transcript)
+                dict_events["details"] += [{"words": list_alts[x][2] - list_alts[x][1], "transcript": list_alts[x][0]["transcript"]}
+                                           for x in idx_transcript]
+                dict_codes = {}
+                list_transcript.append(np.array([dict_codes.setdefault((x["words"], x["transcript"]), len(dict_codes) + 1)
+                                                 for x in dict_events["details"][-len(idx_transcript):]], dtype=np.int64))
+
+            event_rank = np.concatenate(list_rank)
+            order_events = np.lexsort((event_rank, np.concatenate(list_order)))
+            for name_col, value in dict_events.items():
+                dict_events[name_col] = np.concatenate(value)[order_events] if name_col in ["time_begin", "time_end", "score"] \
+                    else [value[x] for x in order_events]
+
+            # added duplicate drop 0.4.1 for some reason this extractor has this bad tendency; other columns are constant
+            # (or equal to time_begin), so this composite key finds the same duplicates without hashing every column
+            df_key = DataFrame({"time_begin": dict_events["time_begin"], "time_end": dict_events["time_end"],
+                                "score": dict_events["score"], "tag_type": np.array([0, 1, 1, 2])[event_rank[order_events]],
+                                "tag": np.array(dict_events["tag"], dtype=object),
+                                "transcript": np.concatenate(list_transcript)[order_events]})
+            idx_unique = np.flatnonzero(~df_key.duplicated().to_numpy())
+            for name_col, value in dict_events.items():
+                dict_events[name_col] = value[idx_unique] if name_col in ["time_begin", "time_end", "score"] \
+                    else [value[x] for x in idx_unique]
+            events = EventBuilder(run_options)
+            events.extend(time_event=dict_events["time_begin"], source_event="speech", extractor=self.EXTRACTOR, **dict_events)
+            if len(events) > 0:
+                return events.to_dataframe(["time_begin", "source_event", "tag_type", "time_end", "time_event", "tag",
+                                            "score", "details", "extractor"])
+            if run_options["verbose"]:   # all events removed by the ``score_min`` or ``tag_types`` filters
+                self.logger.critical(f"No valid events detected for '{self.EXTRACTOR}'")
             return None
 
-        list_items = []
-        re_time_clean = re.compile(r"s$")
-        for annotation_obj in dict_data["annotationResults"]:  # traverse items
-            if "speechTranscriptions" not in annotation_obj:  # validate object
-                self.logger.critical(f"Missing nested 'speechTranscriptions' in annotation chunk '{annotation_obj}'")
-                return None
-            for speech_obj in annotation_obj["speechTranscriptions"]:  # walk through all parts
-                if "alternatives" not in speech_obj:
-                    self.logger.critical(f"Missing nested 'alternatives' in speechTranscriptions chunk '{speech_obj}'")
-                    return None
-
-                for alt_obj in speech_obj["alternatives"]:   # walk through speech parts
-                    time_end = 0
-                    time_begin = 1e200
-                    if "words" in alt_obj and len(alt_obj['words']) > 0:  # parse all words for this transcript chunk
-                        speaker_last = None
-                        speaker_begin = None
-                        speaker_end = None
-                        speaker_score = 0
-                        speaker_segments = 0
-                        num_words = 0
-                        for word_obj in alt_obj["words"]:  # walk through all words
-                            # {  "startTime": "0.400s",  "endTime": "0.700s",  "word": "Super", "confidence": 0.9128385782241821 }
-                            time_begin_clean = float(re_time_clean.sub('', word_obj["startTime"]))
-                            time_end_clean = float(re_time_clean.sub('', word_obj["endTime"]))
-                            time_begin = min(time_begin, time_begin_clean)
-                            time_end = max(time_end, time_end_clean)
-                            # add new item for this word
-                            list_items.append( {"time_begin": time_begin_clean, "source_event": "speech", "tag_type": "word",
-                                "time_end": time_end_clean, "time_event": time_begin_clean, "tag": word_obj["word"],
-                                "score": float(word_obj["confidence"]), "details": "",
-                                "extractor": self.EXTRACTOR})
-                            num_words += 1
-
-                            # { ... "confidence": 0.9128385782241821,  "speakerTag": 3 } ...  (added 0.8.6)
-                            if "speakerTag" in word_obj:  # if speaker is consistent, add it here
-                                reset_speaker = True
-                                if word_obj["speakerTag"] == speaker_last:   # same speaker?
-                                    if time_begin_clean == speaker_end:   # right after last speech segment? extend
-                                        speaker_end = time_end_clean
-                                        speaker_segments += 1
-                                        speaker_score += float(word_obj["confidence"])
-                                        reset_speaker = False
-                                if reset_speaker:   # speaker mismatch or restart
-                                    if speaker_begin is not None:   # close last speaker segment
-                                        list_items.append( {"time_begin": speaker_begin, "source_event": "speech", "tag_type": "identity",
-                                            "time_end": speaker_end, "time_event": speaker_begin, "tag": f"speaker_{speaker_last}",
-                                            "score": round(speaker_score / speaker_segments, self.ROUND_DIGITS), "details": "",
-                                            "extractor": self.EXTRACTOR})
-                                    speaker_last = word_obj["speakerTag"]
-                                    speaker_begin = time_begin_clean   # reset timing information
-                                    speaker_end = time_end_clean
-                                    speaker_segments = 1
-                                    speaker_score = float(word_obj["confidence"])
-
-                        if speaker_begin is not None:   # close last speaker segment
-                            list_items.append( {"time_begin": speaker_begin, "source_event": "speech", "tag_type": "identity",
-                                "time_end": speaker_end, "time_event": speaker_begin, "tag": f"speaker_{speaker_last}",
-                                "score": round(speaker_score / speaker_segments, self.ROUND_DIGITS), "details": "",
-                                "extractor": self.EXTRACTOR})
-
-                        if "transcript" in alt_obj:  # generate top-level transcript item, after going through all words
-                            list_items.append( {"time_begin": time_begin, "source_event": "speech", "tag_type": "transcript",
-                                "time_end": time_end, "time_event": time_begin, "tag": Flatten.TAG_TRANSCRIPT,
-                                "score": float(alt_obj["confidence"]), 
-                                "details": json.dumps({"words": num_words, "transcript": alt_obj["transcript"]}),
-                                "extractor": self.EXTRACTOR})
-
-
-
-        # added duplicate drop 0.4.1 for some reason this extractor has this bad tendency
-        if len(list_items) > 0:
-            return DataFrame(list_items).drop_duplicates()
         if run_options["verbose"]:
             self.logger.critical(f"Missing nested 'alternatives' in speechTranscriptions chunks from source 'gcp_videointelligence_speech_transcription'")
         return None
@@ -19,13 +19,14 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-from pandas import DataFrame, read_csv
+from pandas import read_csv
 from io import StringIO
-import json
+
+import numpy as np
 
 from pytimeparse import parse as pt_parse
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 
 class Parser(Flatten):
@@ -62,8 +63,6 @@ class Parser(Flatten):
                 self.logger.critical(f"Empty shot or scenen file for extractor '{self.EXTRACTOR}', aborting")
             return None
 
-        df_frames["Frame Number"] = df_frames["Frame Number"].astype(int)
-
         # (scene format)
         # Scene Number,Start Frame,Start Timecode,Start Time (seconds),End Frame,End Timecode,End Time (seconds),Length (frames),Length (timecode),Length (seconds)
         # 1,0,00:00:00.000,0.000,169,00:00:05.639,5.639,169,00:00:05.639,5.639
@@ -72,28 +71,48 @@ class Parser(Flatten):
         # Frame Number,Timecode,content_val,delta_hue,delta_lum,delta_sat
         # 1,00:00:00.033,0.0,0.0,0.0,0.0
 
-        base_obj = {"source_event": "video", "tag_type": "shot", "extractor": self.EXTRACTOR, "score": self.SCORE_DEFAULT}
-
-        list_items = []
-        for row_idx, row_data in df_scenes.iterrows():
-            item_new = {"time_begin": round(row_data["Start Time (seconds)"], self.ROUND_DIGITS),
-                        "time_end": round(row_data["End Time (seconds)"], self.ROUND_DIGITS),
-                        "time_event": round(row_data["Start Time (seconds)"], self.ROUND_DIGITS), "details": ""}
-            item_new.update(base_obj)
-
-            # https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.agg.html
-            df_frame_sub = df_frames[(df_frames["Frame Number"] >= int(row_data["Start Frame"])) & \
-                                     (df_frames["Frame Number"] < int(row_data["End Frame"]))]
-            df_frame_agg = df_frame_sub[["content_val","delta_hue","delta_lum","delta_sat"]].agg(["mean", "min", "max"]).unstack()
-            flat_index = ['_'.join(x) for x in list(df_frame_agg.index.to_flat_index())]
-            df_frame_agg.index = flat_index
-
-            # include features from frames, perhaps as an average, min, and max?
-            item_new["details"] = json.dumps(df_frame_agg.round(self.ROUND_DIGITS).to_dict())
-            list_items.append(item_new)
-
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        list_stats = ["content_val","delta_hue","delta_lum","delta_sat"]
+        frame_numbers = df_frames["Frame Number"].to_numpy().astype(int)
+        is_sorted = not (np.diff(frame_numbers) < 0).any()   # typical, frames are written in order
+        order_frames = np.arange(len(frame_numbers)) if is_sorted else np.argsort(frame_numbers, kind="stable")
+        frame_numbers = frame_numbers[order_frames]
+
+        # locate the frames of each scene [start, end) in the sorted frame numbers, then gather them all at once
+        idx_first = np.searchsorted(frame_numbers, df_scenes["Start Frame"].to_numpy().astype(int), side="left")
+        idx_last = np.maximum(np.searchsorted(frame_numbers, df_scenes["End Frame"].to_numpy().astype(int), side="left"), idx_first)
+        num_frames = idx_last - idx_first
+        scene_ids = np.repeat(np.arange(len(df_scenes)), num_frames)
+        frame_ids = order_frames[np.arange(num_frames.sum()) - np.repeat(np.cumsum(num_frames) - num_frames, num_frames) 
+                                 + np.repeat(idx_first, num_frames)]
+        if not is_sorted:
+            frame_ids = frame_ids[np.lexsort((frame_ids, scene_ids))]   # file order within each scene
+
+        # https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.core.groupby.DataFrameGroupBy.agg.html
+        df_frame_sub = df_frames[list_stats].astype(float).iloc[frame_ids]
+        df_frame_agg = df_frame_sub.groupby(scene_ids).agg(["count", "min", "max"]).reindex(range(len(df_scenes)))
+        # means are summed per scene slice (numpy pairwise, like Series.mean) so rounded values match a per-scene agg
+        values_sub = df_frame_sub.to_numpy().T
+        values_sub = np.where(np.isnan(values_sub), 0, values_sub)
+        idx_bounds = np.concatenate([[0], np.cumsum(num_frames)])
+        for idx_stat, name_stat in enumerate(list_stats):
+            values_stat = values_sub[idx_stat]
+            sum_stat = np.array([values_stat[a:b].sum() for a, b in zip(idx_bounds[:-1], idx_bounds[1:])])
+            with np.errstate(invalid="ignore", divide="ignore"):
+                df_frame_agg[(name_stat, "mean")] = sum_stat / df_frame_agg[(name_stat, "count")].to_numpy()
+        df_frame_agg = df_frame_agg[[(x, y) for x in list_stats for y in ["mean", "min", "max"]]]
+        df_frame_agg.columns = ['_'.join(x) for x in df_frame_agg.columns.to_flat_index()]
+        # include features from frames, perhaps as an average, min, and max?
+        list_details = df_frame_agg.round(self.ROUND_DIGITS).to_dict(orient="records")
+
+        time_begin = [round(x, self.ROUND_DIGITS) for x in df_scenes["Start Time (seconds)"].tolist()]
+        events = EventBuilder(run_options)
+        events.extend(time_begin=time_begin, time_end=[round(x, self.ROUND_DIGITS) for x in df_scenes["End Time (seconds)"].tolist()],
+                      time_event=time_begin, details=list_details, source_event="video", tag_type="shot", tag=None, 
+                      extractor=self.EXTRACTOR, score=self.SCORE_DEFAULT)
+
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["time_begin", "time_end", "time_event", "details", "source_event", "tag_type",
+                                        "extractor", "score"])
 
         if run_options["verbose"]:
             self.logger.critical(f"No valid events detected for '{self.EXTRACTOR}'")
@@ -19,10 +19,8 @@
 # -*- coding: utf-8 -*-
 
 from os import path
-import json
-from pandas import DataFrame
 
-from contentai_metadata_flatten.parsers import Flatten
+from contentai_metadata_flatten.parsers import Flatten, EventBuilder
 
 class Parser(Flatten):
     def __init__(self, path_content, logger=None):
@@ -43,7 +41,7 @@ class Parser(Flatten):
         :param: run_options (dict): specific runtime information
         :returns: (DataFrame): DataFrame on successful decoding and export, None (or exception) otherwise
         """
-        list_items = []
+        events = EventBuilder(run_options)
 
         dict_data = self.get_extractor_results(self.EXTRACTOR, "data.json")
 
@@ -68,13 +66,12 @@ class Parser(Flatten):
                                 'l': round(instance_obj['boundingBox']['left'], self.ROUND_DIGITS), 
                                 't': round(instance_obj['boundingBox']['top'], self.ROUND_DIGITS) } }
                             score_frame = round(float(instance_obj["confidence"]), self.ROUND_DIGITS)
-                            obj_insert = { "tag": instance_obj["name"], "score": score_frame, 
-                                "details": json.dumps(details_obj) }
-                            obj_insert.update(base_obj)
-                            list_items.append(obj_insert)
+                            events.append(tag=instance_obj["name"], score=score_frame, 
+                                details=details_obj, **base_obj)
 
-        if len(list_items) > 0:   # return the whole thing as dataframe
-            return DataFrame(list_items)
+        if len(events) > 0:   # return the whole thing as dataframe
+            return events.to_dataframe(["tag", "score", "details", "time_begin", "time_event", "time_end", "tag_type",
+                                        "source_event", "extractor"])
 
         if run_options["verbose"]:
             self.logger.critical(f"No tag entries found in source '{self.EXTRACTOR}'")
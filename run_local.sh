@@ -5,6 +5,7 @@ if [ $# -lt 1 ]; then
 	echo "./run_local.sh <result_json_source> <result_output_sub> [<json_args>] - run flattening for existing director (downloaded from a single job)"
 	echo "  e.g. ./run_local.sh results/SOMESUBID results/ \"{'force_overwrite':False}\" -- will re-run flatteners "
 	echo "  e.g. find results -type d -d 1 | xargs -I {} ./run_local.sh {} results/ -- will run all flatteners in sub-dir"
+	echo "  (for many directories, prefer 'contentai-metadata-flatten batch \"results/*\" --path_result results/ --merge_result --workers 8')"
     echo "" 
     echo " NOTE: This script also searches for a text file called 'timing.txt' in each source directory.  If found, it will "
     echo "       offset all results by the specified number of seconds before saving them to disk. "
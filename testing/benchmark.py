@@ -0,0 +1,599 @@
+#! python
+# ===============LICENSE_START=======================================================
+# metadata-flatten-extractor Apache-2.0
+# ===================================================================================
+# Copyright (C) 2017-2020 AT&T Intellectual Property. All rights reserved.
+# ===================================================================================
+# This software file is distributed by AT&T
+# under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# This file is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============LICENSE_END=========================================================
+# -*- coding: utf-8 -*-
+"""
+wall-clock benchmarks for flattening stages (not collected by pytest)
+
+    python testing/benchmark.py --suite deferred_universal
+    python testing/benchmark.py --suite json_backend --scale 8
+    python testing/benchmark.py --suite event_builder --events 20000
+    python testing/benchmark.py --suite structured_details
+    python testing/benchmark.py --suite gcp_seconds --events 40000
+    python testing/benchmark.py --suite timecode --extractors 100 --events 3000
+    python testing/benchmark.py --suite pyscenedetect --events 2000
+    python testing/benchmark.py --suite wide_csv --events 5000
+    python testing/benchmark.py --suite keyword_matcher --extractors 20 --events 3000
+    python testing/benchmark.py --suite speech_turns --extractors 20 --events 5000
+    python testing/benchmark.py --suite push_down --events 5000
+    python testing/benchmark.py --suite coalesce --extractors 10 --events 5000
+    python testing/benchmark.py --suite decimate --extractors 10 --events 5000
+    python testing/benchmark.py --suite incremental_csv --extractors 20 --events 10000
+    python testing/benchmark.py --suite wb_rows --extractors 20 --events 10000
+    python testing/benchmark.py --suite wb_dedupe --extractors 20 --events 10000
+    python testing/benchmark.py --suite json_stream --extractors 20 --events 10000
+    python testing/benchmark.py --suite parquet --extractors 20 --events 10000
+    python testing/benchmark.py --suite compression --extractors 20 --events 10000
+"""
+
+import sys
+import argparse
+import tempfile
+import shutil
+import time
+import json
+import gzip
+import gc
+import hashlib
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+if __name__ == '__main__':
+    # patch the path to include this package
+    pathRoot = str(Path(__file__).resolve().parent.parent)
+    if pathRoot not in sys.path:
+        sys.path.append(pathRoot)
+
+
+def synthetic_events(num_events, extractor="bench_extractor", seed=0):
+    """Helper to create a flattened DataFrame with frame events (half boxed) and a few spans
+
+    :param num_events: (int): number of rows to create
+    :param extractor: (str): name to assign in the ``extractor`` column
+    :returns: (DataFrame): flattened events with the standard column set
+    """
+    rng = np.random.default_rng(seed)
+    time_begin = np.round(np.sort(rng.uniform(0, 3600, num_events)), 5)
+    time_end = time_begin.copy()
+    idx_span = rng.uniform(size=num_events) < 0.1
+    time_end[idx_span] += np.round(rng.uniform(1, 10, idx_span.sum()), 5)
+    tags = np.array([f"tag_{i}" for i in range(200)])[rng.integers(0, 200, num_events)]
+    details = [json.dumps({'box': {'w': 0.1, 'h': 0.2, 'l': round(float(v), 5), 't': 0.3}}) if v < 0.5 else ""
+               for v in rng.uniform(size=num_events)]
+    return pd.DataFrame({"time_begin": time_begin, "time_end": time_end, "source_event": "image",
+                         "tag_type": "tag", "time_event": time_begin, "tag": tags,
+                         "score": np.round(rng.uniform(size=num_events), 5), "details": details, "extractor": extractor})
+
+
+def timed(func, *args, **kwargs):
+    """Helper to run a function and return (seconds, result), with garbage collection paused for stable timing"""
+    gc.collect()
+    gc.disable()
+    try:
+        time_start = time.perf_counter()
+        result = func(*args, **kwargs)
+        return time.perf_counter() - time_start, result
+    finally:
+        gc.enable()
+
+
+def md5_key(obj_new, col_check, raw_str=""):
+    """Helper for the md5 string keys of prior wbTimeTaggedMetadata versions (reference for ``dedupe_timed``)"""
+    raw_str += "_".join([str(obj_new[col_name]) for col_name in col_check if col_name in obj_new])   # allow optional columns
+    return hashlib.md5(raw_str.encode()).hexdigest()
+
+
+def benchmark_deferred_universal(config):
+    """Compare per-extractor universal generation against a single deferred pass"""
+    from contentai_metadata_flatten import generators
+
+    list_df = [synthetic_events(config['events'], f"extractor_{i}", seed=i) for i in range(config['extractors'])]
+    path_temp = Path(tempfile.mkdtemp())
+    results = {}
+    for generator_obj in generators.get_by_name(config['generator']):
+        generator_instance = generator_obj['obj'](str(path_temp), logger=logging.getLogger("benchmark"))
+        if not generator_instance.is_universal:
+            continue
+        path_out = generator_instance.get_output_path("") + ".gz"
+
+        def per_extractor():
+            for df in list_df:
+                generator_instance.generate(path_out, config, df)
+        time_iter, _ = timed(per_extractor)
+        Path(path_out).unlink()
+        time_single, _ = timed(generator_instance.generate, path_out, config, pd.concat(list_df, ignore_index=True))
+        Path(path_out).unlink()
+        results[generator_obj['name']] = {'per_extractor': time_iter, 'deferred': time_single}
+    shutil.rmtree(str(path_temp))
+    return results
+
+
+def benchmark_json_backend(config):
+    """Compare JSON loading for each installed backend on the (scaled) test fixtures"""
+    from contentai_metadata_flatten import json_backend
+
+    path_temp = Path(tempfile.mkdtemp())
+    list_files = []
+    for path_fixture in sorted(Path(__file__).resolve().parent.joinpath('data').rglob("*.json*")):
+        try:
+            obj_fixture = json.loads(json_backend.read_bytes(str(path_fixture)))
+        except (OSError, ValueError):   # skip fixtures that are not materialized (e.g. LFS pointers)
+            continue
+        list_files.append(obj_fixture)
+    if not list_files:   # fall back to synthetic data with the same nesting as typical results
+        list_files = [{'results': synthetic_events(config['events'], f"extractor_{i}", seed=i).to_dict(orient='records')}
+                      for i in range(config['extractors'])]
+    list_paths = []
+    for idx_file, obj_fixture in enumerate(list_files):   # scale up by repeating the top-level content
+        path_file = path_temp.joinpath(f"data_{idx_file}.json.gz")
+        with gzip.open(str(path_file), 'wt') as outfile:
+            json.dump([obj_fixture] * config['scale'], outfile)
+        list_paths.append(str(path_file))
+
+    results = {}
+    backend_default = json_backend.get_backend()
+    for name_backend in json_backend.available_backends():
+        json_backend.set_backend(name_backend)
+        time_load, _ = timed(lambda: [json_backend.loads(json_backend.read_bytes(x)) for x in list_paths])
+        results[name_backend] = {'load': time_load}   # outputs are always encoded with stdlib json
+    json_backend.set_backend(backend_default)
+    shutil.rmtree(str(path_temp))
+    return results
+
+
+def benchmark_event_builder(config):
+    """Compare list-of-dict row accumulation against the columnar EventBuilder for per-frame events"""
+    from contentai_metadata_flatten.parsers import EventBuilder
+
+    num_events = config['extractors'] * config['events']
+    list_tags = [f"tag_{i}" for i in range(200)]
+
+    def build_dicts():
+        list_items = []
+        for idx in range(num_events):
+            time_frame = idx / 30.0
+            list_items.append({"time_begin": time_frame, "source_event": "image", "tag_type": "tag",
+                               "time_end": time_frame, "time_event": time_frame, "tag": list_tags[idx % 200],
+                               "score": 0.5, "details": "", "extractor": "bench_extractor"})
+        return pd.DataFrame(list_items)
+
+    def build_columns():
+        events = EventBuilder()
+        for idx in range(num_events):
+            time_frame = idx / 30.0
+            events.append(time_begin=time_frame, source_event="image", tag_type="tag",
+                          time_end=time_frame, time_event=time_frame, tag=list_tags[idx % 200],
+                          score=0.5, details="", extractor="bench_extractor")
+        return events.to_dataframe()
+
+    time_dicts, _ = timed(build_dicts)
+    time_columns, _ = timed(build_columns)
+    return {'list_of_dicts': {'build': time_dicts}, 'event_builder': {'build': time_columns}}
+
+
+def benchmark_structured_details(config):
+    """Compare per-event JSON strings against structured box columns for boxed events (parse and read back)"""
+    from contentai_metadata_flatten.parsers import EventBuilder, COLUMNS_BOX, details_merge
+
+    num_events = config['extractors'] * config['events']
+
+    def build(serialize):
+        events = EventBuilder()
+        for idx in range(num_events):
+            details_obj = {'box': {'w': 0.1, 'h': 0.2, 'l': (idx % 1000) / 1000.0, 't': 0.3}}
+            events.append(time_begin=idx / 30.0, source_event="image", tag_type="tag", time_end=idx / 30.0,
+                          time_event=idx / 30.0, tag="person", score=0.5,
+                          details=json.dumps(details_obj) if serialize else details_obj, extractor="bench_extractor")
+        return events.to_dataframe()
+
+    def read_strings(df):
+        return [json.loads(x)['box'] for x in df["details"]]
+
+    def read_columns(df):
+        return [details_merge(*x)['box'] for x in zip(df["details"], *[df[c] for c in COLUMNS_BOX])]
+
+    time_build_str, df_str = timed(build, True)
+    time_read_str, _ = timed(read_strings, df_str)
+    del df_str
+    time_build_col, df_col = timed(build, False)
+    time_read_col, _ = timed(read_columns, df_col)
+    return {'json_strings': {'parse': time_build_str, 'read': time_read_str},
+            'box_columns': {'parse': time_build_col, 'read': time_read_col}}
+
+
+def benchmark_gcp_seconds(config):
+    """Compare per-timestamp regex cleanup against one vectorized conversion of GCP duration strings"""
+    import re
+    from contentai_metadata_flatten.parsers import Flatten
+
+    rng = np.random.default_rng(0)
+    list_offsets = [f"{x:.3f}s" for x in np.sort(rng.uniform(0, 7200, config['extractors'] * config['events']))]
+
+    def per_value():
+        re_time_clean = re.compile(r"s$")
+        return [float(re_time_clean.sub('', x)) for x in list_offsets]
+
+    time_loop, _ = timed(per_value)
+    time_vector, _ = timed(Flatten.gcp_seconds, list_offsets)
+    return {'regex_loop': {'convert': time_loop}, 'vectorized': {'convert': time_vector}}
+
+
+def benchmark_timecode(config):
+    """Compare pytimeparse against the memoized timecode parser on Azure-style instance boundaries"""
+    from pytimeparse import parse as pt_parse
+    from contentai_metadata_flatten.parsers import Flatten
+
+    # boundaries shared across insight types: a few thousand distinct cut points for a ~2 hour asset
+    rng = np.random.default_rng(0)
+    list_cuts = np.sort(rng.uniform(0, 7200, max(config['events'], 2)))
+    list_cuts = [f"{int(x // 3600)}:{int(x % 3600 // 60):02d}:{int(x % 60):02d}.{int(round(x % 1 * 1e7)) % 10000000:07d}" 
+                 for x in list_cuts]
+    list_times = [list_cuts[x] for x in rng.integers(0, len(list_cuts), config['extractors'] * config['events'])]
+
+    time_pt, _ = timed(lambda: [pt_parse(x) for x in list_times])
+    Flatten.timecode_seconds.cache_clear()
+    time_memo, _ = timed(lambda: [Flatten.timecode_seconds(x) for x in list_times])
+    Flatten.timecode_seconds.cache_clear()
+    time_array, _ = timed(Flatten.timecode_seconds_array, list_times)
+    return {'pytimeparse': {'convert': time_pt}, 'memoized': {'convert': time_memo}, 'column': {'convert': time_array}}
+
+
+def benchmark_pyscenedetect(config):
+    """Compare per-scene frame masking against the sorted-interval aggregation for a 3-hour, 60fps stats.csv"""
+    from contentai_metadata_flatten.parsers import pyscenedetect
+
+    num_frames, num_scenes, frame_rate = 3 * 3600 * 60, config['events'], 60.0
+    rng = np.random.default_rng(0)
+    df_frames = pd.DataFrame({"Frame Number": np.arange(1, num_frames + 1), "Timecode": "00:00:00.000"})
+    for name_stat in ["content_val", "delta_hue", "delta_lum", "delta_sat"]:
+        df_frames[name_stat] = np.round(rng.uniform(0, 50, num_frames), 3)
+    frame_cuts = np.concatenate([[0], np.sort(rng.choice(np.arange(1, num_frames), num_scenes - 1, replace=False)), [num_frames]])
+    df_scenes = pd.DataFrame({"Scene Number": np.arange(1, num_scenes + 1), "Start Frame": frame_cuts[:-1], 
+                              "Start Timecode": "", "Start Time (seconds)": np.round(frame_cuts[:-1] / frame_rate, 3),
+                              "End Frame": frame_cuts[1:], "End Timecode": "", "End Time (seconds)": np.round(frame_cuts[1:] / frame_rate, 3)})
+    path_temp = Path(tempfile.mkdtemp())
+    path_temp.joinpath("pyscenedetect").mkdir()
+    for name_file, df in [("stats.csv", df_frames), ("scenes.csv", df_scenes)]:   # both files have an extra header line
+        with path_temp.joinpath("pyscenedetect", name_file).open('wt') as f:
+            f.write("header\n")
+            df.to_csv(f, index=False)
+
+    def per_scene():
+        for _, row_data in df_scenes.iterrows():
+            df_frame_sub = df_frames[(df_frames["Frame Number"] >= int(row_data["Start Frame"])) & \
+                                     (df_frames["Frame Number"] < int(row_data["End Frame"]))]
+            df_frame_sub[["content_val","delta_hue","delta_lum","delta_sat"]].agg(["mean", "min", "max"]).unstack()
+
+    parser_instance = pyscenedetect.Parser(str(path_temp), logger=logging.getLogger("benchmark"))
+    time_load, _ = timed(lambda: [parser_instance.retrieve_output(x, {"verbose": False}) for x in ["stats.csv", "scenes.csv"]])
+    time_parse, _ = timed(parser_instance.parse, {"verbose": False})
+    time_mask, _ = timed(per_scene)
+    shutil.rmtree(str(path_temp))
+    return {'per_scene_mask': {'aggregate': time_mask}, 'parser': {'load': time_load, 'total': time_parse}}
+
+
+def benchmark_wide_csv(config):
+    """Compare per-row label/score probing against the reshaped wide block for a clip classifier results.csv"""
+    from contentai_metadata_flatten.parsers import dsai_yt8m, EventBuilder
+
+    num_rows, num_pairs = config['events'] * 10, 10
+    rng = np.random.default_rng(0)
+    df_raw = pd.DataFrame({"video_clip": np.arange(num_rows), "Time_begin": np.arange(num_rows) * 10.0,
+                           "Time_end": np.arange(num_rows) * 10.0 + 10, "Time_event": np.arange(num_rows) * 10.0})
+    for idx_pair in range(num_pairs):
+        df_raw[f"category{idx_pair}"] = rng.choice([f"label_{x}" for x in range(500)], num_rows)
+        df_raw[f"score{idx_pair}"] = np.round(rng.uniform(0, 1, num_rows), 6)
+    path_temp = Path(tempfile.mkdtemp())
+    path_temp.joinpath("dsai_yt8m").mkdir()
+    df_raw.to_csv(str(path_temp.joinpath("dsai_yt8m", "results.csv")), index=False)
+    df_raw.columns = [x.lower() for x in df_raw.columns]
+
+    def per_row():
+        events = EventBuilder()
+        for _, row_data in df_raw.iterrows():
+            base_obj = {"source_event": "video", "tag_type": "tag", "extractor": "dsai_yt8m"}
+            for col_name in ["time_begin", "time_end", "time_event"]:
+                base_obj[col_name] = row_data[col_name]
+            idx_prefix = 0
+            while f"category{idx_prefix}" in df_raw.columns and f"score{idx_prefix}" in df_raw.columns:
+                events.append(score=row_data[f"score{idx_prefix}"], tag=row_data[f"category{idx_prefix}"], **base_obj)
+                idx_prefix += 1
+        return events.to_dataframe()
+
+    parser_instance = dsai_yt8m.Parser(str(path_temp), logger=logging.getLogger("benchmark"))
+    time_load, _ = timed(parser_instance.get_extractor_results, "dsai_yt8m", "results.csv", False)
+    time_parse, _ = timed(parser_instance.parse, {"verbose": False})
+    time_row, _ = timed(per_row)
+    shutil.rmtree(str(path_temp))
+    return {'per_row': {'reshape': time_row}, 'parser': {'load': time_load, 'total': time_parse}}
+
+
+def benchmark_keyword_matcher(config):
+    """Compare per-keyword substring scans against one multi-keyword pass for every transcript sentence"""
+    from contentai_metadata_flatten.parsers import KeywordMatcher
+
+    rng = np.random.default_rng(0)
+    list_words = ["".join(rng.choice(list("abcdefghijklmnopqrstuvwxyz"), rng.integers(3, 9))) for _ in range(5000)]
+    list_keywords = [" ".join(rng.choice(list_words, rng.integers(1, 3))).title() for _ in range(config['events'])]
+    list_sentences = [" ".join(rng.choice(list_words, 15)) for _ in range(config['extractors'] * 100)]
+
+    def per_keyword():
+        return [[x for x in list_keywords if x.lower() in text.lower()] for text in list_sentences]
+
+    def matcher():
+        keyword_matcher = KeywordMatcher(list_keywords)
+        return [keyword_matcher.matches(text) for text in list_sentences]
+
+    time_scan, list_scan = timed(per_keyword)
+    time_match, list_match = timed(matcher)
+    if list_scan != list_match:
+        raise ValueError("Keyword matches differ between per-keyword scan and matcher")
+    return {'per_keyword': {'scan': time_scan}, 'matcher': {'scan': time_match}}
+
+
+def benchmark_speech_turns(config):
+    """Time the GCP speech parser (speaker turns and dedupe) and, for reference, a full-row dedupe of its output"""
+    from contentai_metadata_flatten.parsers import gcp_videointelligence_speech_transcription, drop_duplicate_events
+
+    rng = np.random.default_rng(0)
+    list_chunks, time_word = [], 0.0
+    for idx_chunk in range(config['extractors'] * 10):
+        list_words = []
+        for idx_word in range(config['events'] // 10):
+            list_words.append({"startTime": f"{time_word:.1f}s", "endTime": f"{time_word + 0.3:.1f}s", "word": f"word_{rng.integers(2000)}",
+                               "confidence": float(rng.uniform()), "speakerTag": int(rng.integers(1, 3))})
+            time_word = round(time_word + 0.3 if rng.uniform() < 0.8 else time_word + 0.5, 1)
+        list_alts = [{"transcript": " ".join([x["word"] for x in list_words]), "confidence": 0.9, "words": list_words}]
+        list_chunks += [{"alternatives": list_alts}] * 2   # GCP repeats chunks (e.g. per channel)
+    path_temp = Path(tempfile.mkdtemp())
+    path_temp.joinpath("gcp_videointelligence_speech_transcription").mkdir()
+    with path_temp.joinpath("gcp_videointelligence_speech_transcription", "data.json").open('wt') as f:
+        json.dump({"annotationResults": [{"speechTranscriptions": list_chunks}]}, f)
+
+    parser_instance = gcp_videointelligence_speech_transcription.Parser(str(path_temp), logger=logging.getLogger("benchmark"))
+    time_parse, df = timed(parser_instance.parse, {"verbose": False})
+    time_dedupe, _ = timed(drop_duplicate_events, df)
+    shutil.rmtree(str(path_temp))
+    return {'full_row_dedupe': {'dedupe': time_dedupe}, 'parser': {'total': time_parse}}
+
+
+def benchmark_push_down(config):
+    """Compare parsing every place score against score and top-k filters pushed down into the parser"""
+    from contentai_metadata_flatten.parsers import dsai_places
+
+    rng = np.random.default_rng(0)
+    list_places = [f"place_{x}" for x in range(365)]
+    list_results = [{"time_event": idx_frame / 2, "index_frame": idx_frame,
+                     "scores": dict(zip(list_places, np.round(rng.dirichlet(np.ones(365) * 0.1), 5).tolist()))}
+                    for idx_frame in range(config['events'])]
+    path_temp = Path(tempfile.mkdtemp())
+    path_temp.joinpath("dsai_places").mkdir()
+    with path_temp.joinpath("dsai_places", "data.json").open('wt') as f:
+        json.dump({"config": {"version": "1.0.0"}, "results": list_results}, f)
+
+    dict_results = {}
+    for name_run, run_options in [("all", {}), ("score_min", {"score_min": 0.01}), ("top_k", {"top_k_per_frame": 5}),
+                                  ("score_min+top_k", {"score_min": 0.01, "top_k_per_frame": 5})]:
+        parser_instance = dsai_places.Parser(str(path_temp), logger=logging.getLogger("benchmark"))
+        time_parse, _ = timed(parser_instance.parse, dict(run_options, verbose=False))
+        dict_results[name_run] = {'parse': time_parse}
+    shutil.rmtree(str(path_temp))
+    return dict_results
+
+
+def benchmark_coalesce(config):
+    """Time merging per-frame detections into spans and writing the flattened CSV with and without merging"""
+    from contentai_metadata_flatten.parsers import coalesce_events, compact_dataframe
+    from contentai_metadata_flatten.generators import generate_flattened_csv
+
+    rng = np.random.default_rng(0)
+    num_rows = config['extractors'] * config['events'] * 10
+    df = pd.DataFrame({"time_begin": np.repeat(np.arange(num_rows // 20) / 5, 20), "source_event": "image", "tag_type": "tag",
+                       "tag": rng.choice([f"label_{x}" for x in range(40)], num_rows), "score": np.round(rng.uniform(size=num_rows), 5),
+                       "details": "", "extractor": "yolo3"}).iloc[:num_rows // 20 * 20]
+    df["time_end"] = df["time_begin"]
+    df["time_event"] = df["time_begin"]
+    time_coalesce, df_span = timed(coalesce_events, df, 1.0)
+    path_temp = Path(tempfile.mkdtemp())
+    generator_instance = generate_flattened_csv.Generator(str(path_temp), logger=logging.getLogger("benchmark"))
+    dict_results = {}
+    for name_run, df_run in [("frames", df), ("spans", df_span)]:
+        time_write, _ = timed(generator_instance.generate, str(path_temp.joinpath(f"{name_run}.csv.gz")), {}, compact_dataframe(df_run.copy()))
+        dict_results[name_run] = {'write': time_write}
+    dict_results['spans']['coalesce'] = time_coalesce
+    shutil.rmtree(str(path_temp))
+    return dict_results
+
+
+def benchmark_decimate(config):
+    """Time keeping the best event per tag and interval of full frame rate (25 fps) detections, and writing the CSV"""
+    from contentai_metadata_flatten.parsers import decimate_events, compact_dataframe
+    from contentai_metadata_flatten.generators import generate_flattened_csv
+
+    rng = np.random.default_rng(0)
+    num_rows = config['extractors'] * config['events'] * 10
+    df = pd.DataFrame({"time_begin": np.repeat(np.arange(num_rows // 20) * 0.04, 20), "source_event": "face", "tag_type": "face",
+                       "tag": rng.choice([f"label_{x}" for x in range(40)], num_rows), "score": np.round(rng.uniform(size=num_rows), 5),
+                       "details": "", "extractor": "aws_rekognition_video_faces"}).iloc[:num_rows // 20 * 20]
+    df["time_end"] = df["time_begin"]
+    df["time_event"] = df["time_begin"]
+    time_decimate, df_sample = timed(decimate_events, df, 1.0)
+    path_temp = Path(tempfile.mkdtemp())
+    generator_instance = generate_flattened_csv.Generator(str(path_temp), logger=logging.getLogger("benchmark"))
+    dict_results = {}
+    for name_run, df_run in [("frames", df), ("sampled", df_sample)]:
+        time_write, _ = timed(generator_instance.generate, str(path_temp.joinpath(f"{name_run}.csv.gz")), {}, compact_dataframe(df_run.copy()))
+        dict_results[name_run] = {'write': time_write}
+    dict_results['sampled']['decimate'] = time_decimate
+    shutil.rmtree(str(path_temp))
+    return dict_results
+
+
+def benchmark_incremental_csv(config):
+    """Time re-generating an existing CSV with 1% new events as a full merge and rewrite versus an incremental append
+    (the first append also rebuilds the hash sidecar from the CSV)"""
+    from contentai_metadata_flatten.generators import generate_flattened_csv
+
+    num_rows = config['extractors'] * config['events']
+    df_prior = synthetic_events(num_rows)
+    df_rerun = pd.concat([df_prior, synthetic_events(num_rows // 100, seed=1)], ignore_index=True)
+    path_temp = Path(tempfile.mkdtemp())
+    generator_instance = generate_flattened_csv.Generator(str(path_temp), logger=logging.getLogger("benchmark"))
+    dict_results = {}
+    for name_run, run_options in [("rewrite", {}), ("incremental", {"incremental": True})]:
+        path_output = str(path_temp.joinpath(f"{name_run}.csv.gz"))
+        generator_instance.generate(path_output, {}, df_prior.copy())
+        time_first, _ = timed(generator_instance.generate, path_output, run_options, df_rerun.copy())
+        time_again, _ = timed(generator_instance.generate, path_output, run_options, df_rerun.copy())
+        dict_results[name_run] = {'first': time_first, 'again': time_again}
+    shutil.rmtree(str(path_temp))
+    return dict_results
+
+
+def benchmark_wb_rows(config):
+    """Time building wbTimeTaggedMetadata frames and timespans from all rows, and the complete generation"""
+    from contentai_metadata_flatten.generators import generate_wbTimeTaggedMetadata
+
+    df = synthetic_events(config['extractors'] * config['events'])
+    path_temp = Path(tempfile.mkdtemp())
+    generator_instance = generate_wbTimeTaggedMetadata.Generator(str(path_temp), logger=logging.getLogger("benchmark"))
+    time_rows, _ = timed(generator_instance.append_timed, {'descriptiveTimespans': [], 'concreteTimespans': [], 'frames': []}, df)
+    time_generate, _ = timed(generator_instance.generate, str(path_temp.joinpath("wbTimeTaggedMetadata.json.gz")), config, df)
+    shutil.rmtree(str(path_temp))
+    return {'wbTimeTaggedMetadata': {'rows': time_rows, 'generate': time_generate}}
+
+
+def benchmark_wb_dedupe(config):
+    """Compare md5 string keys (reference) against factorized typed keys for deduplicating wbTimeTaggedMetadata frames"""
+    from contentai_metadata_flatten.generators import generate_wbTimeTaggedMetadata
+
+    df = synthetic_events(config['extractors'] * config['events'])
+    df = pd.concat([df, df.iloc[::3]], ignore_index=True)   # a third repeated (e.g. merged with a prior output)
+    generator_instance = generate_wbTimeTaggedMetadata.Generator(tempfile.gettempdir(), logger=logging.getLogger("benchmark"))
+    list_frames = generator_instance.append_timed({'descriptiveTimespans': [], 'concreteTimespans': [], 'frames': []}, df)["frames"]
+    column_unique = ["name", "source", "extractor"]
+
+    def dedupe_md5():
+        hash_prior = {}
+        for obj_new in list_frames:
+            hash_key = md5_key(obj_new["wbtcd:frameData"]["dataObject"], column_unique, str(obj_new["wbtcd:frameLocation"]["valueFSTC"]))
+            hash_key = md5_key(obj_new["wbtcd:frameData"], ["box"], hash_key)
+            if hash_key not in hash_prior:
+                hash_prior[hash_key] = 1
+
+    def dedupe_typed():
+        generator_instance.dedupe_timed(list_frames, [x["wbtcd:frameLocation"]["valueFSTC"] for x in list_frames],
+                                        [x["wbtcd:frameData"] for x in list_frames], column_unique, ["box"])
+    time_md5, _ = timed(dedupe_md5)
+    time_typed, _ = timed(dedupe_typed)
+    return {'frames': {'md5': time_md5, 'typed': time_typed}}
+
+
+def benchmark_json_stream(config):
+    """Time writing a wbTimeTaggedMetadata document encoded whole versus streamed in chunks of elements"""
+    from contentai_metadata_flatten import json_backend
+    from contentai_metadata_flatten.generators import generate_wbTimeTaggedMetadata
+    import gzip
+
+    path_temp = Path(tempfile.mkdtemp())
+    generator_instance = generate_wbTimeTaggedMetadata.Generator(str(path_temp), logger=logging.getLogger("benchmark"))
+    output_set = generator_instance.append_timed({'descriptiveTimespans': [], 'concreteTimespans': [], 'frames': []},
+                                                 synthetic_events(config['extractors'] * config['events']))
+    dict_out = {"wbtcd:frames": output_set["frames"], "wbtcd:timespans": {"descriptiveTimespans": output_set["descriptiveTimespans"]}}
+    path_out = str(path_temp.joinpath("wbTimeTaggedMetadata.json.gz"))
+
+    def save_whole():
+        raw_data = json_backend.dumps(dict_out)
+        with gzip.open(path_out, 'wb') as outfile:
+            outfile.write(raw_data)
+    time_whole, _ = timed(save_whole)
+    time_stream, _ = timed(generator_instance.json_save, path_out, dict_out)
+    shutil.rmtree(str(path_temp))
+    return {'wbTimeTaggedMetadata': {'whole': time_whole, 'stream': time_stream}}
+
+
+def benchmark_parquet(config):
+    """Compare writing and reading back flattened events as gzip CSV and as Parquet (requires ``pyarrow``)"""
+    from contentai_metadata_flatten.generators import generate_flattened_csv, generate_parquet
+
+    if not generate_parquet.Generator.is_available():
+        logging.getLogger("benchmark").warning("Parquet benchmark requires `pyarrow`, skipping")
+        return {}
+    df = synthetic_events(config['extractors'] * config['events'])
+    path_temp = Path(tempfile.mkdtemp())
+    dict_results = {}
+    for name_run, generator_obj, name_file, func_read in [("csv", generate_flattened_csv, "events.csv.gz", pd.read_csv),
+                                                          ("parquet", generate_parquet, "events.parquet", pd.read_parquet)]:
+        generator_instance = generator_obj.Generator(str(path_temp), logger=logging.getLogger("benchmark"))
+        path_output = str(path_temp.joinpath(name_file))
+        time_write, _ = timed(generator_instance.generate, path_output, {}, df.copy())
+        time_read, _ = timed(func_read, path_output)
+        dict_results[name_run] = {'write': time_write, 'read': time_read}
+    shutil.rmtree(str(path_temp))
+    return dict_results
+
+
+def benchmark_compression(config):
+    """Time writing and reading back a flattened CSV with each installed codec, single-threaded and in parallel"""
+    from contentai_metadata_flatten import compression
+    from os import cpu_count
+
+    text_csv = synthetic_events(config['extractors'] * config['events']).to_csv(index=False).encode('utf-8')
+    path_temp = Path(tempfile.mkdtemp())
+    dict_results = {}
+    for codec in compression.available_codecs():
+        path_output = str(path_temp.joinpath("flatten.csv" + compression.suffix(codec)))
+        for threads in sorted(set([1, 4, cpu_count() or 1])):
+
+            def write_csv():
+                with compression.open_write(path_output, threads=threads) as outfile:
+                    outfile.write(text_csv)
+            time_write, _ = timed(write_csv)
+            time_read, _ = timed(compression.read_bytes, path_output)
+            dict_results[f"{codec} x{threads}"] = {'write': time_write, 'read': time_read}
+    shutil.rmtree(str(path_temp))
+    return dict_results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="""Wall-clock benchmarks for flattening stages""")
+    parser.add_argument('--suite', dest='suite', type=str, default="",
+                        help='run only benchmarks containing this name (*default=all*)')
+    parser.add_argument('--extractors', dest='extractors', type=int, default=25,
+                        help='number of simulated extractors (*default=25*)')
+    parser.add_argument('--events', dest='events', type=int, default=2000,
+                        help='number of events per simulated extractor (*default=2000*)')
+    parser.add_argument('--scale', dest='scale', type=int, default=4,
+                        help='repetitions of each fixture for file-based benchmarks (*default=4*)')
+    parser.add_argument('--generator', dest='generator', type=str, default="",
+                        help='limit generators for output benchmarks (*default=all*)')
+    config = vars(parser.parse_args(args))
+
+    list_bench = [k for k in globals() if k.startswith("benchmark_") and config['suite'] in k]
+    for name_bench in list_bench:
+        print(f"== {name_bench[len('benchmark_'):]} ({config['extractors']} extractors x {config['events']} events)")
+        results = globals()[name_bench](config)
+        for name_result, dict_time in results.items():
+            print(f"   {name_result}: " + ", ".join([f"{k}={v:.3f}s" for k, v in dict_time.items()]))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ basic tests
 import tempfile
 import shutil
 import pytest
+import os
 from os import path
 
 PATH_TEST = path.join(path.dirname(path.dirname(path.abspath(__file__))), 'data')
@@ -71,6 +72,599 @@ def test_packages():
 
 
 
+def test_extractor_index():
+    from contentai_metadata_flatten.parsers import ExtractorIndex
+    from pathlib import Path
+
+    path_root = Path(tempfile.mkdtemp())
+    path_extractor = path_root.joinpath("job", "aws_rekognition_video_labels")
+    path_extractor.mkdir(parents=True)
+    path_extractor.joinpath("result0.json").write_text("{}")
+
+    index_obj = ExtractorIndex.get(str(path_root))
+    assert index_obj is ExtractorIndex.get(str(path_root))   # shared across requests
+    assert index_obj.dirs("aws_rekognition_video_labels") == [path_extractor.resolve()]
+    assert index_obj.dirs("yolo3") == []
+    assert index_obj.files(index_obj.dirs("aws_rekognition_video_labels")[0]) == {"result0.json"}
+
+    path_extractor.joinpath("result1.json").write_text("{}")   # new page changes directory mtime
+    os.utime(str(path_extractor), (1, 1))
+    index_new = ExtractorIndex.get(str(path_root))
+    assert index_new is not index_obj
+    assert index_new.files(index_new.dirs("aws_rekognition_video_labels")[0]) == {"result0.json", "result1.json"}
+    shutil.rmtree(str(path_root))   # cleanup
+
+
+def test_extractor_pages():
+    from contentai_metadata_flatten.parsers import Flatten
+    from pathlib import Path
+    import gzip
+    import json
+    import logging
+
+    path_root = Path(tempfile.mkdtemp())
+    path_extractor = path_root.joinpath("aws_rekognition_video_faces")
+    path_extractor.mkdir(parents=True)
+    for idx in [0, 1, 2, 4]:   # gap after the third page
+        with gzip.open(str(path_extractor.joinpath(f"result{idx}.json.gz")), 'wt') as f:
+            json.dump({"page": idx}, f)
+
+    parser_obj = Flatten(str(path_root), logger=logging.getLogger())
+    assert parser_obj.get_extractor_shards("aws_rekognition_video_faces") == ["result0.json", "result1.json", "result2.json"]
+    for num_workers in [1, 2]:
+        list_pages = list(parser_obj.get_extractor_pages("aws_rekognition_video_faces", num_workers=num_workers))
+        assert [x[1]["page"] for x in list_pages] == [0, 1, 2]   # loaded in order
+    assert list(parser_obj.get_extractor_pages("yolo3")) == []
+    shutil.rmtree(str(path_root))   # cleanup
+
+
+def test_json_backend():
+    from contentai_metadata_flatten import json_backend
+    from contentai_metadata_flatten.parsers import Flatten
+    from contentai_metadata_flatten.generators import Generate
+    from pathlib import Path
+    import numpy as np
+    import json
+    import math
+    import logging
+    import io
+
+    path_root = Path(tempfile.mkdtemp())
+    dict_source = {"results": [{"tag": "caf\u00e9/bar", "score": np.float64(0.25), "time": 1e16, "count": 3},
+                               {"tag": "nan", "score": float("nan"), "nested": {"a": [1, 2, None]}}]}
+    with pytest.raises(ValueError):
+        json_backend.set_backend("not_a_backend")
+    backend_default = json_backend.get_backend()
+    for name_backend in json_backend.available_backends():
+        json_backend.set_backend(name_backend)
+        generator_obj = Generate(str(path_root), logger=logging.getLogger())
+        parser_obj = Flatten(str(path_root), logger=logging.getLogger())
+        for name_file in ["data.json", "data.json.gz"]:
+            path_file = str(path_root.joinpath(name_file))
+            assert generator_obj.json_save(path_file, dict_source)
+            for dict_loaded in [generator_obj.json_load(path_file), parser_obj.json_load(path_file)]:
+                assert dict_loaded["results"][0] == {"tag": "caf\u00e9/bar", "score": 0.25, "time": 1e16, "count": 3}
+                assert math.isnan(dict_loaded["results"][1]["score"])
+                assert dict_loaded["results"][1]["nested"] == dict_source["results"][1]["nested"]
+        assert json_backend.dumps({"a": [1.5, float("nan")]}) == b'{"a": [1.5, NaN]}'   # same output for all backends
+        assert json_backend.read_bytes(str(path_root.joinpath("data.json"))) == json.dumps(dict_source).encode('utf-8')
+        dict_stream = {"header": {"version": 1}, "frames": [{"t": x * 0.5, "tag": "caf\u00e9"} for x in range(25)],
+                       "timespans": {"descriptive": list(range(7)), "concrete": []}}
+        for num_chunk in [1, 4, 100]:   # streamed arrays encode to the same bytes
+            stream_out = io.BytesIO()
+            assert json_backend.dump_stream(dict_stream, stream_out, num_chunk=num_chunk) == len(stream_out.getvalue())
+            assert stream_out.getvalue() == json_backend.dumps(dict_stream)
+        with open(str(path_root.joinpath("bad.json")), 'wt') as f:
+            f.write("{not json")
+        assert parser_obj.json_load(str(path_root.joinpath("bad.json"))) == {}
+        assert generator_obj.json_load(str(path_root.joinpath("missing.json"))) == {}
+    json_backend.set_backend(backend_default)
+    shutil.rmtree(str(path_root))   # cleanup
+
+
+def test_extractor_items(monkeypatch):
+    from contentai_metadata_flatten import json_backend
+    from contentai_metadata_flatten.parsers import Flatten, gcp_videointelligence_speech_transcription
+    from pathlib import Path
+    import gzip
+    import json
+    import logging
+
+    path_root = Path(tempfile.mkdtemp())
+    path_extractor = path_root.joinpath("gcp_videointelligence_speech_transcription")
+    path_extractor.mkdir(parents=True)
+    dict_source = {"annotationResults": [{"speechTranscriptions": [{"alternatives": [{"words": [1, 2]}]}, {"alternatives": []}]},
+                                         {"speechTranscriptions": [{"alternatives": [{"transcript": "x", "confidence": 0.5}]}]},
+                                         {"segment": {}}],
+                   "summary": {"topics": ["a", "b"]}}
+    with gzip.open(str(path_extractor.joinpath("data.json.gz")), 'wt') as f:
+        json.dump(dict_source, f)
+
+    list_paths = ["annotationResults[].speechTranscriptions[]", "summary.topics[]", "missing[]"]
+    list_expected = list(json_backend.iter_object_items(dict_source, list_paths))
+    assert [x[0] for x in list_expected] == [list_paths[0]] * 3 + [list_paths[1]] * 2
+    assert list_expected[2][1] == dict_source["annotationResults"][1]["speechTranscriptions"][0]
+    list_modules = set([json_backend.ijson, None])
+    for ijson_module in list_modules:   # incremental (if installed) and whole-document decoding
+        monkeypatch.setattr(json_backend, "ijson", ijson_module)
+        parser_obj = Flatten(str(path_root), logger=logging.getLogger())
+        list_items = list(parser_obj.get_extractor_items("gcp_videointelligence_speech_transcription", "data.json", list_paths))
+        assert list_items == list_expected
+        assert list(parser_obj.get_extractor_items("gcp_videointelligence_label", "data.json", list_paths)) == []
+    shutil.rmtree(str(path_root))   # cleanup
+
+    path_root = Path(tempfile.mkdtemp())
+    path_extractor = path_root.joinpath("gcp_videointelligence_speech_transcription")
+    path_extractor.mkdir()
+    chunk = {"alternatives": [{"transcript": "hi", "confidence": 0.9, 
+                               "words": [{"startTime": "0s", "endTime": "0.5s", "word": "hi", "confidence": 0.9}]}]}
+    str_source = json.dumps({"annotationResults": [{"speechTranscriptions": [chunk] * 4}]})
+    path_extractor.joinpath("data.json").write_text(str_source[:len(str_source) // 2])   # truncated within the second chunk
+    for ijson_module in list_modules:
+        monkeypatch.setattr(json_backend, "ijson", ijson_module)
+        parser_obj = gcp_videointelligence_speech_transcription.Parser(str(path_root), logger=logging.getLogger())
+        if ijson_module is None:   # not decodable at all, nothing is yielded (as if missing)
+            assert list(parser_obj.get_extractor_items(parser_obj.EXTRACTOR, "data.json", list_paths[:1])) == []
+            assert parser_obj.parse({"verbose": False}) is None
+        else:   # decoding fails after the first items, no partial result
+            with pytest.raises(ValueError):
+                list(parser_obj.get_extractor_items(parser_obj.EXTRACTOR, "data.json", list_paths[:1]))
+            with pytest.raises(ValueError):
+                parser_obj.parse({"verbose": False})
+    shutil.rmtree(str(path_root))   # cleanup
+
+
+def test_event_builder():
+    from contentai_metadata_flatten.parsers import EventBuilder, empty_dataframe, COLUMNS_BOX
+    import pandas as pd
+
+    list_rows = [{"time_begin": 1.5, "time_end": 2, "time_event": 1.5, "source_event": "image", "tag_type": "tag",
+                  "tag": "person", "score": 0.25, "details": "", "extractor": "yolo3"},
+                 {"time_begin": 3, "time_end": 3, "time_event": 3, "source_event": "face", "tag_type": "identity",
+                  "tag": "person", "score": 1, "details": "{}", "extractor": "yolo3"}]
+    events = EventBuilder()
+    assert not events and len(events) == 0
+    for row in list_rows:
+        events.append(**row)
+    events.extend(time_begin=[4, 5], time_end=[4.5, 5.5], time_event=[4, 5], source_event="audio", tag_type="tag",
+                  tag=["music", "person"], score=[0.5, 0.75], extractor="yolo3")
+    with pytest.raises(ValueError):
+        events.extend(time_begin=[1, 2, 3], time_end=[1, 2], time_event=1, source_event="audio", tag_type="tag",
+                      tag="x", score=0.5, extractor="yolo3")
+    assert len(events) == 4
+
+    df = events.to_dataframe()
+    assert list(df.columns) == list(empty_dataframe().columns) + COLUMNS_BOX
+    assert df[COLUMNS_BOX].isna().all().all()
+    df = df[EventBuilder.COLUMNS]
+    df_expected = pd.DataFrame(list_rows + [
+        {"time_begin": 4, "time_end": 4.5, "time_event": 4, "source_event": "audio", "tag_type": "tag",
+         "tag": "music", "score": 0.5, "details": "", "extractor": "yolo3"},
+        {"time_begin": 5, "time_end": 5.5, "time_event": 5, "source_event": "audio", "tag_type": "tag",
+         "tag": "person", "score": 0.75, "details": "", "extractor": "yolo3"}])
+    df_expected = df_expected[df.columns].astype({k: float for k in EventBuilder.COLUMNS_FLOAT if k in df.columns})
+    pd.testing.assert_frame_equal(df, df_expected.astype({"details": object}))   # details are always objects
+    df = events.to_dataframe(["score", "tag", "time_begin"])   # parser column order, box columns only with details
+    assert list(df.columns) == ["score", "tag", "time_begin"] and df["tag"].tolist()[-2:] == ["music", "person"]
+    assert sorted(events._strings) == ["music", "person"]   # repeated strings are shared while accumulating
+    assert events.columns["tag"][0] is events.columns["tag"][3]
+
+    events_all = EventBuilder()
+    events_all.extend_from(events)
+    events_all.extend_from(events)
+    assert len(events_all) == 8 and events_all.to_dataframe()["tag"].tolist() == df["tag"].tolist() * 2
+
+    events_missing = EventBuilder({"score_min": 0.5})   # missing times and scores are NaN (score kept by the filter)
+    events_missing.append(time_begin=None, time_end=1, time_event=None, source_event="image", tag_type="tag",
+                          tag="car", score=None, extractor="azure_videoindexer")
+    events_missing.extend(time_begin=[None, 2], time_end=2, time_event=2, source_event="image", tag_type="tag",
+                          tag="car", score=[0.9, None], extractor="azure_videoindexer")
+    df_missing = events_missing.to_dataframe()
+    assert df_missing["time_begin"].isna().tolist() == [True, True, False]
+    assert df_missing["score"].isna().tolist() == [True, False, True] and df_missing["time_event"].isna()[0]
+
+
+def test_event_filters():
+    from contentai_metadata_flatten.parsers import EventBuilder, event_filters, get_by_type, aws_transcribe
+    from contentai_metadata_flatten import main
+    import logging
+    from pathlib import Path
+    import json
+
+    assert event_filters({"verbose": True}) == {"score_min": None, "tag_types": None, "top_k_per_frame": 0}
+    assert event_filters({"score_min": 0, "tag_types": "tag, face", "top_k_per_frame": "2"}) == \
+        {"score_min": 0.0, "tag_types": {"tag", "face"}, "top_k_per_frame": 2}
+
+    events = EventBuilder({"score_min": 0.5, "tag_types": ["tag", "emotion"], "top_k_per_frame": 2})
+    events.append(time_begin=0, time_end=0, time_event=0, source_event="image", tag_type="tag", tag="low", score=0.25)
+    events.append(time_begin=0, time_end=0, time_event=0, source_event="image", tag_type="shot", tag="shot", score=1.0)
+    events.extend(time_begin=1, time_end=1, time_event=1, source_event="image", tag_type="tag",
+                  tag=["a", "b", "c", "d"], score=[0.6, 0.9, 0.4, 0.7])
+    box_a, box_b = {"box": {"w": 0.1, "h": 0.1, "l": 0.0, "t": 0.0}}, {"box": {"w": 0.2, "h": 0.2, "l": 0.5, "t": 0.5}}
+    events.extend(time_begin=2, time_end=2, time_event=2, source_event="face", tag_type="emotion", tag=["x", "y", "z", "x", "y", "z"],
+                  score=[0.8, 0.9, 0.95, 0.6, 0.55, 0.7], details=[box_a] * 3 + [box_b] * 3)
+    assert len(events) == 9   # score and tag type filters are applied as events are added
+    df = events.to_dataframe()
+    assert df["tag"].tolist() == ["b", "d", "y", "z", "x", "z"]   # top two of each frame (and box), in original order
+    assert df["box_w"].tolist()[2:] == [0.1, 0.1, 0.2, 0.2]
+
+    list_words = [{"type": "pronunciation", "start_time": str(x), "end_time": str(x + 0.5),
+                   "alternatives": [{"confidence": str(y), "content": z}]} for x, y, z in [(1, 0.4, "a"), (2, 0.95, "b"), (3, 0.3, "c")]]
+    path_root = Path(tempfile.mkdtemp())
+    path_root.joinpath("aws_transcribe").mkdir()
+    with path_root.joinpath("aws_transcribe", "data.json").open('wt') as f:
+        json.dump({"results": {"items": list_words, "transcripts": [{"transcript": "a b c"}]}}, f)
+    parser_obj = aws_transcribe.Parser(str(path_root), logger=logging.getLogger())
+    df = parser_obj.parse({"verbose": False, "score_min": 0.45})   # transcript spans all words, not only those kept
+    assert df["tag"].tolist() == ["b", "_transcript_"]
+    assert df["time_begin"].tolist() == [2, 1] and df["time_end"].tolist() == [2.5, 3.5]
+    df = parser_obj.parse({"verbose": False, "tag_types": "transcript"})
+    assert df["tag_type"].tolist() == ["transcript"] and df["time_begin"].tolist() == [1] and df["time_end"].tolist() == [3.5]
+    shutil.rmtree(str(path_root))
+
+    set_typed = set([x["name"] for x in get_by_type(["word"])])
+    assert "gcp_videointelligence_speech_transcription" in set_typed and "yolo3" not in set_typed
+    path_result = tempfile.mkdtemp()
+    list_jobs = main.plan_outputs({"path_result": path_result, "force_overwrite": True, "tag_types": "word"},
+                                  main.parsers.get_by_name("yolo3"), main.generators.get_by_name(), logging.getLogger())
+    assert [x["name"] for x in list_jobs] == [None]   # skipped without any requested type
+    shutil.rmtree(path_result)
+
+
+def test_coalesce_events():
+    from contentai_metadata_flatten.parsers import coalesce_events
+    import pandas as pd
+
+    df = pd.DataFrame({"time_begin": [0, 0.5, 1, 5, 0.5, 2], "time_end": [0, 0.5, 1, 5, 0.5, 4],
+                       "source_event": "image", "tag_type": "tag", "time_event": [0, 0.5, 1, 5, 0.5, 2],
+                       "tag": ["car", "car", "car", "car", "dog", "car"], "score": [0.5, 0.25, 0.75, 1, 0.5, 0.1],
+                       "details": [{"frame": x} for x in range(6)], "extractor": "yolo3"})
+    df_span = coalesce_events(df, 1.0)
+    assert df_span.index.tolist() == [0, 3, 4, 5]   # first detection of each span and the existing span
+    assert df_span["time_end"].tolist() == [1, 5, 0.5, 4] and df_span["score"].tolist() == [0.75, 1, 0.5, 0.1]
+    assert df_span["details"][0] == {"frame": 0}
+    assert coalesce_events(df, 1.0, "mean")["score"].tolist() == [0.5, 1, 0.5, 0.1]
+    assert len(coalesce_events(df, 0.25)) == len(df)
+    with pytest.raises(ValueError):
+        coalesce_events(df, 1.0, "median")
+
+
+def test_decimate_events():
+    from contentai_metadata_flatten.parsers import decimate_events
+    import pandas as pd
+
+    df = pd.DataFrame({"time_begin": [0, 0.04, 0.08, 0.5, 1.2, 0.04, 1.0], "source_event": "face", "tag_type": "face",
+                       "tag": ["Face", "Face", "Face", "Face", "Face", "Smile", "Face"],
+                       "score": [0.5, 0.9, 0.9, None, 0.1, 0.2, None], "extractor": "aws_rekognition_video_faces"})
+    df["time_end"] = df["time_begin"]
+    df_sample = decimate_events(df, 1.0)
+    assert df_sample.index.tolist() == [1, 4, 5]   # first best score per bucket and tag, original order
+    assert decimate_events(df, 0.5).index.tolist() == [1, 3, 4, 5]   # missing score kept only when alone
+    assert len(decimate_events(df, 0.01)) == len(df)
+    with pytest.raises(ValueError):
+        decimate_events(df, 0)
+
+
+def test_structured_details():
+    from contentai_metadata_flatten.parsers import EventBuilder, details_serialize, drop_duplicate_events
+    import json
+    import math
+
+    list_details = ["", "{\"raw\": 1}", {}, {"box": {"w": 0.25, "h": 0.5, "l": 0.125, "t": 0.0}},
+                    {"category": ["a"], "box": {"w": 0.25, "h": 0.5, "l": 0.125, "t": 0.0}, "urls": "x"},
+                    {"box": {"w": 10, "h": 20, "l": 0, "t": 0}, "transcript": "pixels"},   # integers stay residual
+                    {"box": [{"w": 0.1, "h": 0.1, "l": 0.1, "t": 0.1}]}]
+    events = EventBuilder()
+    for details_obj in list_details:
+        events.append(time_begin=1, time_end=1, time_event=1, source_event="image", tag_type="tag",
+                      tag="person", score=0.5, details=details_obj, extractor="yolo3")
+    list_details[2]["modified"] = True   # later changes by a parser are not recorded
+    df = events.to_dataframe()
+    assert df["box_l"].tolist()[3:5] == [0.125, 0.125] and math.isnan(df["box_l"][5])
+    assert df["details"][3] is None
+    assert details_serialize(df) == ["", "{\"raw\": 1}", "{}"] + [json.dumps(x) for x in list_details[3:]]
+    assert len(drop_duplicate_events(df)) == len(df)
+    events_all = EventBuilder()
+    events_all.extend_from(events)
+    events_all.extend_from(events)
+    assert len(drop_duplicate_events(events_all.to_dataframe())) == len(df)
+
+
+def test_incremental_csv():
+    from contentai_metadata_flatten.generators import generate_flattened_csv
+    import logging
+    import pandas as pd
+    from pathlib import Path
+
+    df = pd.DataFrame({"time_begin": [2.0, 0, 1], "time_end": [2.0, 0, 1], "source_event": "image", "tag_type": "tag",
+                       "time_event": [2.0, 0, 1], "tag": ["a", "b, c", "a"], "score": [0.5, None, 1],
+                       "details": "", "extractor": "yolo3"})
+    path_temp = Path(tempfile.mkdtemp())
+    generator_instance = generate_flattened_csv.Generator(str(path_temp), logger=logging.getLogger())
+    path_output = str(path_temp.joinpath("flatten_yolo3.csv.gz"))
+    run_options = {"incremental": True}
+    assert generator_instance.generate(path_output, run_options, df.copy()) == 3
+    num_bytes = path.getsize(path_output)
+    assert generator_instance.generate(path_output, run_options, df.copy()) == 3
+    assert path.getsize(path_output) == num_bytes   # nothing new, nothing written
+
+    df_more = pd.concat([df, df.assign(time_begin=0.5, time_end=0.5, time_event=0.5)], ignore_index=True)
+    assert generator_instance.generate(path_output, run_options, df_more.copy()) == 6
+    assert pd.read_csv(path_output)["time_begin"].tolist() == [0, 1, 2, 0.5, 0.5, 0.5]   # appended only
+    os.remove(path_output + generate_flattened_csv.HASH_SUFFIX)   # rebuilt from the CSV once
+    df_sort = df_more.assign(time_begin=3.0, time_end=3.0, time_event=3.0).iloc[:1]
+    assert generator_instance.generate(path_output, {"incremental": True, "incremental_sort": True}, df_more.copy()) == 6
+    assert generator_instance.generate(path_output, {"incremental": True, "incremental_sort": True}, df_sort.copy()) == 7
+    df_result = pd.read_csv(path_output)
+    assert df_result["time_begin"].tolist() == [0, 0.5, 0.5, 0.5, 1, 2, 3] and df_result["tag"].tolist()[0] == "b, c"
+    df_legacy = pd.read_csv(path_output).assign(extra=1)   # other columns fall back to a full merge
+    assert generator_instance.generate(path_output, run_options, df_legacy) == 14
+    shutil.rmtree(str(path_temp))
+
+
+def test_wb_timed_rows():
+    from contentai_metadata_flatten.generators import generate_wbTimeTaggedMetadata
+    from contentai_metadata_flatten.parsers import EventBuilder
+    import logging
+
+    events = EventBuilder()
+    for time_end, details in [(1, {"box": {"w": 0.5, "h": 0.5, "l": 0.0, "t": 0.0}, "url": "x"}), (2, ""),
+                              (3, "{\"transcript\": \"hi\"}"), (4, {"box": {"w": 0.5, "h": 0.5, "l": 0.0, "t": 0.0}})]:
+        events.append(time_begin=1, time_end=time_end, time_event=1, source_event="image", tag_type="tag",
+                      tag="person", score=0.5, details=details, extractor="yolo3")
+    generator_instance = generate_wbTimeTaggedMetadata.Generator(tempfile.gettempdir(), logger=logging.getLogger())
+    output_set = generator_instance.append_timed({'descriptiveTimespans': [], 'concreteTimespans': [], 'frames': []},
+                                                 events.to_dataframe())
+    frame_data = output_set["frames"][0]["wbtcd:frameData"]
+    assert list(frame_data) == ["dataObject", "dataTypeId", "box", "uri"] and frame_data["dataTypeId"] == "timedObject"
+    assert frame_data["dataObject"] == {"name": "person", "source": "image", "type": "tag", "score": 0.5, "extractor": "yolo3"}
+    assert [x["end"] for x in output_set["descriptiveTimespans"]] == [2, 4]   # box spans are descriptive
+    assert output_set["concreteTimespans"][0]["transcript"] == "hi" and output_set["concreteTimespans"][0]["dataTypeId"] == "timedText"
+
+
+def test_wb_dedupe():
+    from contentai_metadata_flatten.generators import generate_wbTimeTaggedMetadata
+    import hashlib
+    import logging
+
+    def hash_key(obj_new, col_check, raw_str=""):   # md5 string keys of prior versions (reference)
+        raw_str += "_".join([str(obj_new[col_name]) for col_name in col_check if col_name in obj_new])
+        return hashlib.md5(raw_str.encode()).hexdigest()
+
+    generator_instance = generate_wbTimeTaggedMetadata.Generator(tempfile.gettempdir(), logger=logging.getLogger())
+    column_unique = ["name", "source", "extractor"]
+    list_box = [{"w": 0.5, "h": 0.5, "l": 0.0, "t": 0.0}, {"w": 0.5, "h": 0.5, "l": 0.25, "t": 0.0}, None, [{"w": 1, "h": 1}]]
+    for num_box in [3, 4]:   # flat boxes only (column-wise) and with a nested box
+        list_span = []
+        for idx_span in range(40):   # repeats of time, tag, source, and box (missing, None, or a value)
+            new_span = {"start": float(idx_span % 3), "dataObject": {"name": ["a", "b"][idx_span % 2], "source": "image",
+                        "score": idx_span, "extractor": "yolo3"}}
+            if idx_span % 5:
+                new_span["box"] = list_box[idx_span % num_box]
+            list_span.append(new_span)
+        list_span.append({"start": 0.0, "dataObject": {"name": "a", "source": "image"}})   # no extractor
+
+        hash_prior = {}   # reference md5 path
+        list_md5 = []
+        for obj_new in list_span:
+            key_md5 = hash_key(obj_new, ["box"], hash_key(obj_new["dataObject"], column_unique, str(obj_new["start"])))
+            if key_md5 not in hash_prior:
+                hash_prior[key_md5] = 1
+                list_md5.append(obj_new)
+        list_dedupe = generator_instance.dedupe_timed(list_span, [x["start"] for x in list_span], list_span, column_unique, ["box"])
+        assert len(list_md5) < len(list_span) and [id(x) for x in list_dedupe] == [id(x) for x in list_md5]
+
+    list_flat = [{"start": 1.0, "box": x, "dataObject": {}} for x in list_box[:2] + [{"h": 0.5, "w": 0.5, "l": 0.0, "t": 0.0}]]
+    assert len(generator_instance.dedupe_timed(list_flat, [1.0] * 3, list_flat, [], ["box"])) == 2   # same box, other key order
+
+
+def test_parquet_output():
+    from contentai_metadata_flatten import generators
+    from contentai_metadata_flatten.parsers import EventBuilder
+    import importlib.util
+    import logging
+    from pathlib import Path
+
+    has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+    assert len(generators.get_by_name("parquet")) == int(has_pyarrow)   # registered only with its dependency
+    assert "generate_parquet" not in [x["name"] for x in generators.get_by_name() + generators.get_by_type()]   # opt-in
+    pq = pytest.importorskip("pyarrow.parquet")
+    from contentai_metadata_flatten.generators import generate_parquet
+
+    events = EventBuilder()
+    for time_begin, tag_type in [(3, "tag"), (1, "identity"), (2, "tag"), (0, "tag")]:
+        events.append(time_begin=time_begin, time_end=time_begin, time_event=time_begin, source_event="face", tag_type=tag_type,
+                      tag="a/b", score=0.5, details={"box": {"w": 0.5, "h": 0.5, "l": 0.0, "t": 0.0}}, extractor="yolo3")
+    path_temp = Path(tempfile.mkdtemp())
+    generator_instance = generate_parquet.Generator(str(path_temp), logger=logging.getLogger())
+    path_output = str(path_temp.joinpath("flatten_yolo3.parquet"))
+    assert generator_instance.generate(path_output, {"parquet_row_group": 2}, events.to_dataframe()) == 4
+    file_parquet = pq.ParquetFile(path_output)
+    assert file_parquet.num_row_groups == 2 and file_parquet.schema_arrow.field("tag").type.value_type == "string"
+    df_result = file_parquet.read().to_pandas()
+    assert df_result["time_begin"].tolist() == [0, 1, 2, 3] and df_result["details"][0].startswith("{\"box\"")
+
+    assert generator_instance.generate(path_output, {"parquet_partition": "tag_type"}, events.to_dataframe()) == 4
+    assert sorted(x.name for x in Path(path_output).iterdir()) == ["tag_type=identity", "tag_type=tag"]
+    assert pq.read_table(str(Path(path_output).joinpath("tag_type=tag", "part-0.parquet")))["time_begin"].to_pylist() == [0, 2, 3]
+    with pytest.raises(ValueError):
+        generator_instance.generate(path_output, {"parquet_partition": "tag"}, events.to_dataframe())
+    shutil.rmtree(str(path_temp))
+
+
+def test_compression():
+    from contentai_metadata_flatten import compression
+    from contentai_metadata_flatten.generators import generate_flattened_csv
+    import gzip
+    import logging
+    import pandas as pd
+
+    text_raw = "".join([f"{x},tag_{x % 7},{x / 3}\n" for x in range(300000)]).encode('utf-8')
+    path_temp = tempfile.mkdtemp()
+    for codec in compression.available_codecs():
+        path_output = path.join(path_temp, "out.csv" + compression.suffix(codec))
+        for threads in [1, 4]:
+            with compression.open_write(path_output, level=1, threads=threads) as outfile:
+                outfile.write(text_raw)
+            assert compression.read_bytes(path_output) == text_raw
+            with compression.open_read(path_output) as infile:
+                assert infile.read() == text_raw
+    path_output = path.join(path_temp, "out.csv.gz")
+    with compression.open_write(path_output, threads=4) as outfile:   # multiple members, still gzip
+        outfile.write(text_raw * 2)
+    with gzip.open(path_output, 'rb') as infile:
+        assert infile.read() == text_raw * 2
+    with compression.open_write(path_output, threads=2, append=True) as outfile:
+        outfile.write(text_raw[:10])
+    assert compression.read_bytes(path_output) == text_raw * 2 + text_raw[:10]
+    with compression.open_write(path_output, threads=4) as outfile:   # empty output is still a valid gzip file
+        pass
+    assert gzip.decompress(open(path_output, 'rb').read()) == b""
+    with pytest.raises(ValueError):
+        compression.suffix("snappy")
+    assert compression.options({"compression_threads": 0})["threads"] >= 1
+
+    df = pd.DataFrame({"time_begin": [2.0, 0, 1], "time_end": [2.0, 0, 1], "source_event": "image", "tag_type": "tag",
+                       "time_event": [2.0, 0, 1], "tag": ["a", "b, c", "a"], "score": [0.5, None, 1],
+                       "extractor": "yolo3"})
+    generator_instance = generate_flattened_csv.Generator(path_temp, logger=logging.getLogger())
+    path_output = path.join(path_temp, "flatten_yolo3.csv.gz")
+    run_options = {"compression_level": 6, "compression_threads": 2}
+    assert generator_instance.generate(path_output, run_options, df.copy()) == 3
+    assert generator_instance.generate(path_output, run_options, df.copy()) == 3
+    assert pd.read_csv(path_output)["time_begin"].tolist() == [0, 1, 2]
+    shutil.rmtree(path_temp)
+
+
+def test_compact_dataframe():
+    from contentai_metadata_flatten.parsers import compact_dataframe
+    import pandas as pd
+    import numpy as np
+
+    df = pd.DataFrame({"time_begin": [0.0, 1, 2, 3], "time_end": [0.0, 1, 2, 4.5], "source_event": "image", "tag_type": "tag",
+                       "time_event": [0.0, 1, 2, 3], "tag": ["a", "a", "a", "b"], "score": [0.5, 0.25, 1, 0.75],
+                       "details": "", "extractor": "yolo3"})
+    df_raw = df.copy()
+    df = compact_dataframe(df)
+    for col_name in ["source_event", "tag_type", "extractor", "tag"]:
+        assert isinstance(df[col_name].dtype, pd.CategoricalDtype)
+    assert df["score"].dtype == np.float32 and df["time_end"].dtype == np.float64
+    assert df.to_csv(index=False) == df_raw.to_csv(index=False)
+    assert compact_dataframe(df) is df   # idempotent
+
+    df = compact_dataframe(df_raw.assign(tag=["a", "b", "c", "d"], score=[0.1, 0.2, 0.3, 0.4]))
+    assert not isinstance(df["tag"].dtype, pd.CategoricalDtype)   # too many unique values
+    assert df["score"].dtype == np.float64   # not exact as float32
+    assert compact_dataframe(df_raw.iloc[:0].copy()).empty
+    df = compact_dataframe(df_raw.assign(time_end=[0, 1, 2, 4], time_event=[0, 1, 2, None]))
+    assert df["time_end"].dtype == np.int64 and df["time_event"].dtype == np.float64   # integer times keep their text
+
+
+def test_gcp_seconds():
+    from contentai_metadata_flatten.parsers import Flatten
+
+    list_durations = ["0s", "12.5s", "19.285933s", "13189.109266s", "7", {"seconds": "12", "nanos": 500000000},
+                      {"nanos": 1000}, {"seconds": -1, "nanos": -250000000}, 2.25]
+    list_expected = [0.0, 12.5, 19.285933, 13189.109266, 7.0, 12.5, 0.000001, -1.25, 2.25]
+    assert Flatten.gcp_seconds(list_durations).tolist() == list_expected
+    assert len(Flatten.gcp_seconds([])) == 0
+    with pytest.raises(ValueError):
+        Flatten.gcp_seconds(["12.5s", "bad"])
+    with pytest.raises(ValueError):
+        Flatten.gcp_seconds(["12.5s", "1 2s"])
+
+
+def test_timecode_seconds():
+    from contentai_metadata_flatten.parsers import Flatten
+    from pytimeparse import parse as pt_parse
+    import math
+
+    list_times = ["0:00:10", "0:00:10.0000000", "1:02:03.1234567", "0:00:59.9999999", "12:00:00.12",
+                  "-0:00:01.5", "1:24", "1.2 minutes", "not a time"]
+    for str_time in list_times:   # same values and types as pytimeparse
+        assert repr(Flatten.timecode_seconds(str_time)) == repr(pt_parse(str_time))
+    array_seconds = Flatten.timecode_seconds_array(list_times + list_times[:3])
+    assert array_seconds[:8].tolist() == [float(pt_parse(x)) for x in list_times[:8]]
+    assert math.isnan(array_seconds[8]) and array_seconds[9:].tolist() == array_seconds[:3].tolist()
+    assert len(Flatten.timecode_seconds_array([])) == 0
+
+
+def test_pyscenedetect_aggregation():
+    from contentai_metadata_flatten.parsers import pyscenedetect
+    import logging
+    import pandas as pd
+    import math
+
+    df_frames = pd.DataFrame({"Frame Number": [4, 1, 2, 3, 5], "Timecode": "", "content_val": [8.0, 1, 2, 3, 10],
+                              "delta_hue": 1.0, "delta_lum": [0, 0, 1, 1, 0.5], "delta_sat": 0.0})
+    df_scenes = pd.DataFrame({"Scene Number": [1, 2, 3], "Start Frame": [1, 3, 4], "Start Time (seconds)": [0.0, 0.1, 0.1],
+                              "End Frame": [3, 3, 9], "End Time (seconds)": [0.1, 0.1, 0.3]})
+    parser_obj = pyscenedetect.Parser("", logger=logging.getLogger())
+    parser_obj.retrieve_output = lambda name_file, run_options: df_frames.copy() if name_file == "stats.csv" else df_scenes.copy()
+    df = parser_obj.parse({"verbose": False})
+    assert "tag" not in df.columns and df["time_end"].tolist() == [0.1, 0.1, 0.3]
+    assert list(df["details"][0].keys())[:4] == ["content_val_mean", "content_val_min", "content_val_max", "delta_hue_mean"]
+    assert [df["details"][0]["content_val_mean"], df["details"][0]["delta_lum_max"]] == [1.5, 1.0]
+    assert all(math.isnan(x) for x in df["details"][1].values())   # no frames in this scene
+    assert [df["details"][2][x] for x in ["content_val_mean", "content_val_min", "delta_lum_mean"]] == [9.0, 8.0, 0.25]
+
+
+def test_wide_csv_reshape():
+    from contentai_metadata_flatten.parsers import dsai_yt8m
+    import logging
+
+    str_csv = "video_clip,Time_begin,Time_end,Time_event,category0,score0,category1,score1,category3,score3\n" \
+              + "0,0.0,10.0,0.0,Animation,0.4,Game,0.3,Skipped,0.1\n1,10.0,20.0,10.0,Game,0.5,Animation,0.2,Skipped,0.1\n"
+    parser_obj = dsai_yt8m.Parser("", logger=logging.getLogger())
+    parser_obj.get_extractor_results = lambda extractor_name, path, is_json=True: str_csv
+    df = parser_obj.parse({"verbose": False})
+    assert df["tag"].tolist() == ["Animation", "Game", "Game", "Animation"]   # row-major, stops at first missing pair
+    assert df["score"].tolist() == [0.4, 0.3, 0.5, 0.2]
+    assert df["time_begin"].tolist() == [0.0, 0.0, 10.0, 10.0] and (df["source_event"] == "video").all()
+
+
+def test_keyword_matcher():
+    from contentai_metadata_flatten.parsers import KeywordMatcher
+
+    list_keywords = ["New York", "york", "Yorker", "new", "", "ork", "new"]
+    keyword_matcher = KeywordMatcher(list_keywords)
+    assert keyword_matcher.search("I love new york.") == [0, 1, 3, 4, 5, 6]   # overlapping, duplicates, empty keyword
+    assert keyword_matcher.matches("the NEW YORKER") == ["New York", "york", "Yorker", "new", "", "ork", "new"]
+    assert keyword_matcher.search("") == [4]
+    assert KeywordMatcher(list_keywords, ignore_case=False).search("New Yorker") == [0, 2, 4, 5]
+    assert KeywordMatcher(list_keywords, whole_words=True).search("the new yorker") == [2, 3, 4, 6]
+    for text in ["a newer york_town", "Pork New-York"]:   # substring semantics match plain 'in' checks
+        assert keyword_matcher.search(text) == [i for i, x in enumerate(list_keywords) if x.lower() in text.lower()]
+
+
+def test_speech_speaker_turns(caplog):
+    from contentai_metadata_flatten.parsers import gcp_videointelligence_speech_transcription
+    import logging
+    from pathlib import Path
+    import json
+
+    list_words = [{"startTime": "0s", "endTime": "0.5s", "word": "hi", "confidence": 0.5, "speakerTag": 1},
+                  {"startTime": "0.5s", "endTime": "1s", "word": "um", "confidence": 0.1},   # no speaker, turn continues
+                  {"startTime": "0.5s", "endTime": "1s", "word": "there", "confidence": 0.7, "speakerTag": 1},
+                  {"startTime": "1s", "endTime": "1.5s", "word": "yes", "confidence": 0.9, "speakerTag": 2},
+                  {"startTime": "2s", "endTime": "2.5s", "word": "no", "confidence": 0.8, "speakerTag": 2}]   # gap, new turn
+    chunk = {"alternatives": [{"transcript": "hi um there yes no", "confidence": 0.9, "words": list_words}]}
+    path_root = Path(tempfile.mkdtemp())
+    path_root.joinpath("gcp_videointelligence_speech_transcription").mkdir()
+    with path_root.joinpath("gcp_videointelligence_speech_transcription", "data.json").open('wt') as f:
+        json.dump({"annotationResults": [{"speechTranscriptions": [chunk, chunk]}]}, f)   # repeated chunk is dropped
+
+    parser_obj = gcp_videointelligence_speech_transcription.Parser(str(path_root), logger=logging.getLogger())
+    df = parser_obj.parse({"verbose": False})
+    with caplog.at_level(logging.CRITICAL):   # all events filtered out
+        assert parser_obj.parse({"verbose": True, "score_min": 2}) is None
+    assert "No valid events detected" in caplog.text and "alternatives" not in caplog.text
+    shutil.rmtree(str(path_root))
+    assert df["tag"].tolist() == ["hi", "um", "there", "yes", "speaker_1", "no", "speaker_2", "speaker_2", "_transcript_"]
+    df_speaker = df[df["tag_type"] == "identity"]
+    assert df_speaker["time_begin"].tolist() == [0, 1, 2] and df_speaker["time_end"].tolist() == [1, 1.5, 2.5]
+    assert df_speaker["score"].tolist() == [0.6, 0.9, 0.8]
+    assert df["details"].iloc[-1] == {"words": 5, "transcript": "hi um there yes no"}
 
 
 # validate against input and basic parsing?
@@ -30,7 +30,96 @@ from pathlib import Path
 
 PATH_TEST = Path(__file__).parent.joinpath('data', 'results-hbomax')
 
-from contentai_metadata_flatten.main import flatten
+from contentai_metadata_flatten.main import flatten, batch
+
+
+def _write_synthetic(path_root, num_frames=50):
+    """Helper to write small, uncompressed extractor results for a few parsers"""
+    def write_json(name_extractor, name_file, dict_data):
+        path_dir = Path(path_root).joinpath(name_extractor)
+        path_dir.mkdir(parents=True, exist_ok=True)
+        with path_dir.joinpath(name_file).open('wt') as f:
+            json.dump(dict_data, f)
+
+    box = {"left": 0.1, "top": 0.2, "width": 0.3, "height": 0.4}
+    write_json("yolo3", "data.json", [{"milliseconds": i * 500.0, "frameNumber": i, 
+        "results": [{"objects": [{"name": "person", "confidence": 0.9, "boundingBox": box}]}]} for i in range(num_frames)])
+    write_json("dsai_places", "data.json", {"config": {}, 
+        "results": [{"time_event": i * 0.5, "scores": {"motel": 0.3, "bar": 0.2}} for i in range(num_frames)]})
+    write_json("gcp_videointelligence_shot_change", "data.json", {"annotationResults": [{"shotAnnotations": 
+        [{"startTimeOffset": f"{i}s", "endTimeOffset": f"{i}.5s"} for i in range(num_frames)]}]})
+    write_json("aws_transcribe", "data.json", {"results": {"transcripts": [{"transcript": "word " * num_frames}], 
+        "items": [{"type": "pronunciation", "start_time": f"{i}.25", "end_time": f"{i}.75", 
+                   "alternatives": [{"confidence": "0.8", "content": "word"}]} for i in range(num_frames)]}})
+    box = {"Width": 0.2, "Height": 0.2, "Left": 0.1, "Top": 0.1}
+    for idx in range(2):
+        write_json("aws_rekognition_video_labels", f"result{idx}.json", {"Labels": [{"Timestamp": idx * 10000 + i * 100, 
+            "Label": {"Name": f"Train{idx}", "Confidence": 60, "Instances": [{"BoundingBox": box, "Confidence": 62}], 
+            "Parents": [{"Name": "Vehicle"}]}} for i in range(num_frames)]})
+    return path_root
+
+
+def test_workers():
+    path_content = Path(_write_synthetic(tempfile.mkdtemp()))
+    path_serial = Path(tempfile.mkdtemp())
+    path_pool = Path(tempfile.mkdtemp())
+
+    list_serial = flatten(args=["--path_content", str(path_content), "--path_result", str(path_serial)])
+    list_pool = flatten(args=["--path_content", str(path_content), "--path_result", str(path_pool), "--workers", "3"])
+    assert len(list_serial) == 6   # five extractors + one universal
+    assert sorted([Path(x).name for x in list_serial]) == sorted([Path(x).name for x in list_pool])
+    for path_file in path_serial.glob("*.csv.gz"):   # parsing in pool must not change data
+        df_serial = pd.read_csv(path_file)
+        df_pool = pd.read_csv(path_pool.joinpath(path_file.name))
+        assert df_serial.equals(df_pool)
+
+    for path_temp in [path_content, path_serial, path_pool]:
+        shutil.rmtree(str(path_temp))   # cleanup
+
+
+def test_defer_universal():
+    import gzip
+    path_content = Path(_write_synthetic(tempfile.mkdtemp()))
+    path_iter = Path(tempfile.mkdtemp())
+    path_defer = Path(tempfile.mkdtemp())
+
+    list_iter = flatten(args=["--path_content", str(path_content), "--path_result", str(path_iter), 
+                              "--generator", "TimeTagged"])
+    list_defer = flatten(args=["--path_content", str(path_content), "--path_result", str(path_defer), 
+                               "--generator", "TimeTagged", "--defer_universal"])
+    assert len(list_iter) == 1 and len(list_defer) == 1
+    with gzip.open(list_iter[0], 'rt') as f_iter, gzip.open(list_defer[0], 'rt') as f_defer:
+        dict_iter = json.load(f_iter)
+        assert dict_iter == json.load(f_defer)   # single pass must match repeated appends
+    assert len(dict_iter["wbtcd:timespans"]["descriptiveTimespans"]) == 2 * 50   # shots and words of two extractors
+    assert len(dict_iter["wbtcd:timespans"]["concreteTimespans"]) == 1   # transcript
+
+    for path_temp in [path_content, path_iter, path_defer]:
+        shutil.rmtree(str(path_temp))   # cleanup
+
+
+def test_batch():
+    path_assets = Path(tempfile.mkdtemp())
+    path_result = Path(tempfile.mkdtemp())
+    for name_asset in ["asset_a", "asset_b"]:
+        _write_synthetic(str(path_assets.joinpath(name_asset)))
+    path_assets.joinpath("asset_b", "timing.txt").write_text("10\n")
+
+    list_summary = batch(args=[str(path_assets.joinpath("asset_*")), "--path_result", str(path_result), 
+                               "--generator", "csv", "--workers", "2"])
+    assert len(list_summary) == 2
+    assert path_result.joinpath("batch_summary.json").exists()
+    map_summary = {Path(x['path_content']).name: x for x in list_summary}
+    assert map_summary["asset_b"]["time_offset"] == 10
+    assert map_summary["asset_a"]["events"] == map_summary["asset_b"]["events"]
+    assert len(map_summary["asset_a"]["results"]) == 5 and not map_summary["asset_a"]["errors"]
+
+    df_a = pd.read_csv(path_result.joinpath("asset_a", "csv_flatten_yolo3.csv.gz"))
+    df_b = pd.read_csv(path_result.joinpath("asset_b", "csv_flatten_yolo3.csv.gz"))
+    assert ((df_b["time_begin"] - df_a["time_begin"]) == 10).all()   # per-asset timing offset
+
+    for path_temp in [path_assets, path_result]:
+        shutil.rmtree(str(path_temp))   # cleanup
 
 
 def test_programmatic():